@@ -2,8 +2,8 @@ import logging
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
-from fastapi_cache.decorator import cache
 
+from app.core.cache import cached
 from app.core.supabase_client import supabase
 
 logger = logging.getLogger(__name__)
@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/countries", response_model=dict[str, list[str]])
-@cache(namespace="countries", expire=86400)
+@cached("countries", warm=True)
 def get_countries():
     try:
         response = supabase.rpc("get_countries").execute()
@@ -3,14 +3,15 @@ from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
 
-from fastapi_cache.decorator import cache
 
 from app.core.auth import check_request_user_id
+from app.core.cache import cached, skip_caching
+from app.core.reformulation import LEGISLATIVE_SEARCH, LEGISLATIVE_SEARCH_WITH_PROFILE
 from app.core.relevant_legislatives import fetch_relevant_legislative_files, deduplicate_neighbors
 from app.core.supabase_client import supabase
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
+from app.core.speculative_retrieval import speculative_search
 from app.core.vector_search import get_top_k_neighbors
-from app.core.openai_client import openai
 from app.models.legislative_file import (
     LegislativeFilesResponse,
     LegislativeFileResponse,
@@ -24,7 +25,7 @@ router = APIRouter()
 
 
 @router.get("/legislative-files", response_model=LegislativeFilesResponse)
-@cache(namespace="legislative", expire=3600)
+@cached("legislative")
 def get_legislative_files(
     limit: int = Query(500, gt=1),
     query: Optional[str] = Query(None, description="Semantic search query"),
@@ -40,73 +41,23 @@ def get_legislative_files(
                 if resp.data:
                     query = query + "Profile information: " + str(resp.data)
 
-                try:
-                    completion = openai.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": (
-                                    "You are a helpful assistantthat reformulates text for "
-                                    "semantic search. "
-                                    "Your task is to generate a title for a legislative"
-                                    "concerning the user and his query. "
-                                    "For example:\n"
-                                    "User Input: Infrastrucure, User Profile: As the CEO of Transport Logistics," 
-                                    "acompany pioneering"
-                                    "the integration of AI intransportation "
-                                    "I am steering a dynamicgrowth-stage enterprise witha team of"
-                                    "21-50   professionals.\n"
-                                    "Output 1: Infrastructureand Technology Rules"
-                                    "Output 2: Implementaion of the Infrastructure and Technology Package"
-                                ),
-                            },
-                            {"role": "user", "content": query},
-                        ],
-                        temperature=0,
-                        max_tokens=128,
-                    )
-
-                    query = (completion.choices[0].message.content or query).strip()
-
-                except Exception as e:
-                    logger.error(f"An error occurred: {e}")
-            else:      
-                try:
-                    completion = openai.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": (
-                                    "You are a helpful assistantthat reformulates text for "
-                                    "semantic search. "
-                                    "Your task is to generate a title for a legislative"
-                                    "concerning the user and his query. "
-                                    "For example:\n"
-                                    "User Input: Infrastrucure"
-                                    "Output 1: Infrastructureand Technology Rules"
-                                    "Output 2: Implementaion of the Infrastructure and Technology Package"
-                                ),
-                            },
-                            {"role": "user", "content": query},
-                        ],
-                        temperature=0,
-                        max_tokens=128,
-                    )
-    
-                    query = (completion.choices[0].message.content or query).strip()
-    
-                except Exception as e:
-                    logger.error(f"An error occurred: {e}")
-                    
-
-            neighbors = get_top_k_neighbors(
-                query=query,
-                allowed_sources={"legislative_files": "embedding_input"},
-                k=1000,
-                sources=["document_embeddings"],
-            )
+            prompt = LEGISLATIVE_SEARCH_WITH_PROFILE if user_id else LEGISLATIVE_SEARCH
+
+            def search(text: str) -> list[dict]:
+                return get_top_k_neighbors(
+                    query=text,
+                    allowed_sources={"legislative_files": "embedding_input"},
+                    k=1000,
+                    sources=["document_embeddings"],
+                )
+
+            # searches the raw query while the LLM reformulates it, see app/core/speculative_retrieval.py
+            retrieval = speculative_search(prompt, query, search, k=1000, caller="legislative_search")
+            if retrieval.path == "raw":
+                # the reformulation is cached once it finishes, the next identical request searches with it
+                skip_caching()
+            query = retrieval.query
+            neighbors = retrieval.neighbors
 
             if not neighbors:
                 return JSONResponse(status_code=200, content={"data": []})
@@ -114,13 +65,11 @@ def get_legislative_files(
             # Remove duplicates
             neighbors = deduplicate_neighbors(neighbors)
 
-            docs = [n["content_text"] for n in neighbors]
-
-            rerank_resp = co.rerank(
-                model="rerank-v3.5",
+            rerank_resp = rerank_neighbors(
                 query=query,
-                documents=docs,
-                top_n=min(limit, len(docs)),
+                neighbors=neighbors,
+                top_n=min(limit, len(neighbors)),
+                caller="legislative_search",
             )
 
             neighbors_re = []
@@ -138,6 +87,7 @@ def get_legislative_files(
             # Fetch matched rows
             ids = [n["source_id"] for n in neighbors]
             similarity_map = {n["source_id"]: n["similarity"] for n in neighbors}
+            path_map = {n["source_id"]: n["retrieval_path"] for n in neighbors}
 
             query_builder = supabase.table("legislative_files").select("*").in_("id", ids)
             if year:
@@ -156,6 +106,7 @@ def get_legislative_files(
             # Add similarity info
             for r in records:
                 r["similarity"] = similarity_map.get(r["id"])
+                r["retrieval_path"] = path_map.get(r["id"])
 
         else:
             query_builder = supabase.table("legislative_files").select("*")
@@ -221,7 +172,7 @@ def get_legislative_file(
 
 
 @router.get("/legislative-files/suggestions", response_model=LegislativeFileSuggestionResponse)
-@cache(namespace="legislative", expire=3600)
+@cached("legislative")
 def get_legislation_suggestions(
     request: Request,
     query: str = Query(..., min_length=2, description="Fuzzy text to search legislation titles"),
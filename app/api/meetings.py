@@ -1,16 +1,17 @@
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
-from app.core.openai_client import openai
 
-from fastapi_cache.decorator import cache
 
+from app.core.cache import cached, skip_caching
+from app.core.reformulation import MEETING_SEARCH
 from app.core.relevant_meetings import fetch_relevant_meetings
 from app.core.supabase_client import supabase
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
+from app.core.speculative_retrieval import speculative_search
 from app.core.vector_search import get_top_k_neighbors
 from app.models.meeting import Meeting, MeetingSuggestionResponse, LegislativeMeetingsResponse
 
@@ -18,6 +19,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MEETING_COLUMNS = tuple(Meeting.model_fields)  # what semantic searches return per meeting
+RERANK_INPUT_COLUMNS = ("source_table", "source_id", "content_text", "similarity", "fusion_score")
+RANKING_COLUMNS = ("similarity", "retrieval_path")  # set by the search, kept when rows are fetched separately
+
 
 _START = Query(None, description="Start datetime (ISO8601)")
 _END = Query(None, description="End datetime (ISO8601)")
@@ -31,6 +36,10 @@ _COUNTRY = Query(
 )
 
 
+# start/end are widened to this grid, so clients sending "now" share cached responses
+TIME_BUCKET = timedelta(minutes=15)
+
+
 def to_utc_aware(dt: Optional[datetime]) -> Optional[datetime]:
     if dt and dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
@@ -44,6 +53,23 @@ def parse_query_list(param: Optional[list[str]]) -> Optional[list[str]]:
         result.extend([x.strip() for x in item.split(",")])
     return result
 
+
+def to_time_bucket(dt: Optional[datetime], round_up: bool = False) -> Optional[datetime]:
+    if dt is None:
+        return None
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    buckets, rest = divmod(dt - epoch, TIME_BUCKET)
+    if round_up and rest:
+        buckets += 1
+    return epoch + buckets * TIME_BUCKET
+
+
+def canonical_list(values: Optional[list[str]]) -> Optional[list[str]]:
+    if not values:
+        return None
+    return sorted({v for v in values if v}) or None
+
+
 @router.get("/meetings", response_model=dict[str, list[Meeting]])
 def get_meetings(
     request: Request,  # new param: provides caller info
@@ -74,19 +100,62 @@ def get_meetings(
         country,
         source_tables,
     )
-    source_tables = parse_query_list(source_tables)
-    topics = parse_query_list(topics)
-    country = parse_query_list(country)
+    # canonical parameters, equivalent requests share one cache entry
+    return find_meetings(
+        limit=limit,
+        start=to_time_bucket(to_utc_aware(start)),
+        end=to_time_bucket(to_utc_aware(end), round_up=True),
+        query=" ".join(query.split()) if query else None,
+        topics=canonical_list(parse_query_list(topics)),
+        country=canonical_list(parse_query_list(country)),
+        user_id=user_id,
+        source_tables=canonical_list(parse_query_list(source_tables)),
+    )
 
-    try:
-        start = to_utc_aware(start)
-        end = to_utc_aware(end)
 
-        # --- SEMANTIC QUERY CASE ---
-        # --- source table - normalise multi-value params ----------------------------------
-        if source_tables and len(source_tables) == 1 and "," in source_tables[0]:
-            source_tables = [t.strip() for t in source_tables[0].split(",") if t.strip()]
+def rerank_input(neighbor: dict) -> dict:
+    return {key: neighbor[key] for key in RERANK_INPUT_COLUMNS if key in neighbor}
 
+
+def hydrate_meetings(neighbors: list[dict]) -> list[dict]:
+    """
+    The API columns of the ranked neighbors, in their order. Neighbors from search_meetings_semantic carry them
+    already; the rows of the others (from the in-process meeting or lexical index) are fetched in one query.
+    """
+    missing = [n for n in neighbors if "meeting_id" not in n]
+    if missing:
+        match = supabase.rpc(
+            "get_meetings_by_filter",
+            params={
+                "source_tables": [n["source_table"] for n in missing],
+                "source_ids": [n["source_id"] for n in missing],
+                "max_results": len(missing),
+            },
+        ).execute()
+        rows = {(row["source_table"], str(row["source_id"])): row for row in match.data or []}
+        for neighbor in missing:
+            row = rows.get((neighbor["source_table"], str(neighbor["source_id"])))
+            if row is not None:
+                neighbor.update({key: value for key, value in row.items() if key not in RANKING_COLUMNS})
+    return [
+        {key: neighbor.get(key) for key in MEETING_COLUMNS} for neighbor in neighbors if "meeting_id" in neighbor
+    ]
+
+
+@cached("meetings_list", partition_by="user_id")
+def find_meetings(
+    limit: int,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    query: Optional[str],
+    topics: Optional[list[str]],
+    country: Optional[list[str]],
+    user_id: Optional[str],
+    source_tables: Optional[list[str]],
+) -> JSONResponse:
+    """The meetings matching the canonical filters of GET /meetings, cached per user."""
+    try:
+        # --- SEMANTIC QUERY CASE ---
         if query:
             # tell the vector search which tables are allowed -- value can be any string
             if user_id:
@@ -95,95 +164,75 @@ def get_meetings(
                     query = query + "Profile information: " + str(resp.data)
             allowed_sources: dict[str, str] = {t: "embedding_input" for t in source_tables} if source_tables else {}
 
-            try:
-                completion = openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant that reformulates text for semantic search."
-                            "Your task is to generate a meeting summary document based on the user's question. "
-                            + "Use a formal tone, and try to vary the phrasing and details based on the query context. "
-                            + "Keep the summary within three sentences, with a clear title and a brief description.",
-                        },
-                        {"role": "user", "content": query},
-                    ],
-                    temperature=0,
-                    max_tokens=128,
+            def search(text: str) -> list[dict]:
+                return get_top_k_neighbors(
+                    query=text,
+                    k=1000,
+                    sources=["meeting_embeddings"],
+                    allowed_sources=allowed_sources,
+                    allowed_topics=topics,
+                    allowed_countries=country,
+                    start_date=start if start is not None else None,
+                    end_date=end if end is not None else None,
+                    hydrate_meetings=True,
                 )
-                reformulated_query = (completion.choices[0].message.content or query).strip()
-
-            except Exception as e:
-                reformulated_query = query
-                logger.error(f"An error occurred: {e}")
 
-            neighbors = get_top_k_neighbors(
-                query=reformulated_query,
-                k=1000,
-                sources=["meeting_embeddings"],
-                allowed_sources=allowed_sources,
-                allowed_topics=topics,
-                allowed_countries=country,
-                start_date=start if start is not None else None,
-                end_date=end if end is not None else None,
-            )
+            # searches the raw query while the LLM reformulates it, see app/core/speculative_retrieval.py
+            retrieval = speculative_search(MEETING_SEARCH, query, search, k=1000, caller="meetings_search")
+            if retrieval.path == "raw":
+                # the reformulation is cached once it finishes, the next identical request searches with it
+                skip_caching()
+            reformulated_query = retrieval.query
+            neighbors = retrieval.neighbors
 
             if not neighbors:
                 # ---------- 2a)  LOG EMPTY RESPONSE (semantic path, no neighbours) ----------
                 logger.info("Response formed – empty list (no neighbours found)")
                 return JSONResponse(status_code=200, content={"data": []})
 
-            docs = [n["content_text"] for n in neighbors]
-
-            rerank_resp = co.rerank(
-                model="rerank-v3.5",
+            # the reranker only gets ids and texts, the hydrated rows stay here
+            rerank_resp = rerank_neighbors(
                 query=reformulated_query,
-                documents=docs,
-                top_n=min(limit, len(docs)),
+                neighbors=[rerank_input(n) for n in neighbors],
+                top_n=min(limit, len(neighbors)),
+                caller="meetings_search",
             )
 
-            neighbors_re = []
+            ranked = []
             for result in rerank_resp.results:
-                idx = result.index
-                new_score = result.relevance_score
-                neighbors[idx]["similarity"] = new_score
-                if new_score > 0.05:
-                    neighbors_re.append(neighbors[idx])
-
-            neighbors = neighbors_re
-
-            map_table_and_id_to_similarity = {
-                f"{n['source_table']}_{n['source_id']}": n["similarity"] for n in neighbors
-            }
-            source_ids = [n["source_id"] for n in neighbors]
-            neighbor_tables = [n["source_table"] for n in neighbors]
-
-            if topics and len(topics) == 1 and "," in topics[0]:
-                topics = [t.strip() for t in topics[0].split(",") if t.strip()]
-
-            params = {
-                "source_tables": neighbor_tables,
-                "source_ids": source_ids,
-                "max_results": limit,
-            }
-            match = supabase.rpc("get_meetings_by_filter", params=params).execute()
-
-            results = []
-            if match.data:
-                for record in match.data:
-                    record["similarity"] = map_table_and_id_to_similarity[
-                        f"{record['source_table']}_{record['source_id']}"
-                    ]
-
-                    results.append(record)
+                if result.relevance_score > 0.05:
+                    neighbor = neighbors[result.index]
+                    neighbor["similarity"] = result.relevance_score
+                    ranked.append(neighbor)
+
+            results = hydrate_meetings(ranked[:limit])
 
             # ---------- 2b)  LOG NON-EMPTY / EMPTY RESPONSE (semantic path) ----------
             logger.info(
-                "Response formed – %d result(s) from semantic query",
+                "Response formed – %d result(s) from semantic query (%s)",
                 len(results[:limit]),
+                retrieval.path,
             )
             return JSONResponse(status_code=200, content={"data": results[:limit]})
 
+        # --- USER RELEVANT MEETINGS CASE ---
+        if user_id:
+            # the filters are applied in the database by search_meetings_for_profile
+            relevant = fetch_relevant_meetings(
+                user_id=user_id,
+                k=100,
+                consider_frequency=False,
+                source_tables=source_tables,
+                start=start,
+                end=end,
+                countries=country,
+                topics=topics,
+            )
+            data = []
+            for m in relevant.meetings:
+                data.append(m.model_dump(mode="json"))
+            return JSONResponse(status_code=200, content={"data": data})
+
         # --- DEFAULT QUERY CASE ---
         db_query = supabase.table("v_meetings").select("*")
 
@@ -207,20 +256,8 @@ def get_meetings(
 
         # --- TOPIC FILTERING ---
         if topics:
-            if len(topics) == 1 and "," in topics[0]:
-                topics = [t.strip() for t in topics[0].split(",") if t.strip()]
             db_query = db_query.in_("topic", topics)
 
-            # --- USER RELEVANT MEETINGS CASE ---
-        if user_id:
-            relevant = fetch_relevant_meetings(
-                user_id=user_id, k=100, query_to_compare=db_query, consider_frequency=False
-            )
-            data = []
-            for m in relevant.meetings:
-                data.append(m.model_dump(mode="json"))
-            return JSONResponse(status_code=200, content={"data": data})
-
         res = db_query.order("meeting_start_datetime", desc=True).limit(limit).execute()
         data = res.data
 
@@ -236,7 +273,7 @@ def get_meetings(
 
 
 @router.get("/meetings/suggestions", response_model=MeetingSuggestionResponse)
-@cache(namespace="meetings", expire=3600)
+@cached("meetings")
 def get_meeting_suggestions(
     request: Request,
     query: str = Query(..., min_length=2, description="Fuzzy text to search meeting titles"),
@@ -256,7 +293,7 @@ def get_meeting_suggestions(
 
 
 @router.get("/legislative-files/meetings", response_model=LegislativeMeetingsResponse)
-@cache(namespace="meetings", expire=3600)  # type: ignore[arg-type]
+@cached("meetings")
 def get_meetings_by_legislative_id(
     legislative_id: str = Query(..., description="Legislative procedure reference ID to filter meetings"),
     limit: int = Query(500, gt=0, le=1000, description="Maximum number of meetings to return"),
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+
+from app.core.cache import response_cache
+from app.core.rate_limits import get_rate_limit_metrics
+from app.core.rerank import get_rerank_metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/rate-limits")
+def get_rate_limits():
+    return get_rate_limit_metrics()
+
+
+@router.get("/cache")
+def get_cache_metrics():
+    return response_cache.metrics()
+
+
+@router.get("/rerank")
+def get_rerank_cost_metrics():
+    return get_rerank_metrics()
@@ -4,7 +4,8 @@ from fastapi import APIRouter, HTTPException, status, Request
 from fastapi.responses import JSONResponse
 
 from app.core.auth import check_request_user_id, get_name_fields
-from app.core.openai_client import EMBED_MODEL, openai
+from app.core.change_events import publish_change
+from app.core import openai_client
 from app.core.supabase_client import supabase
 from app.models.profile import ProfileCreate, ProfileUpdate, ProfileReturn
 
@@ -46,8 +47,7 @@ async def create_embeddings(user_id: str, embedding_input: str):
     """
     try:
         logger.info("Requesting embedding from OpenAI for profile %s", user_id)
-        resp = openai.embeddings.create(input=[embedding_input], model=EMBED_MODEL)
-        embedding = resp.data[0].embedding
+        embedding = openai_client.create_embeddings([embedding_input], caller="profile")[0]
         logger.info("Received embedding for profile %s", user_id)
     except Exception as e:
         logger.error("Embedding generation failed for profile %s: %s", user_id, e)
@@ -97,7 +97,7 @@ def generate_user_interest_embedding_input(profile, topics):
         - focus on their institution, expertise, and priorities.
         """
 
-    response = openai.responses.create(model="gpt-4o", input=prompt)
+    response = openai_client.create_response(caller="profile", model="gpt-4o", input=prompt)
     return response.output_text
 
 
@@ -240,4 +240,6 @@ async def update_user_profile(request: Request, user_id: str, profile: ProfileUp
         if len(result.data) == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
 
+    # personalized responses cached for this user are outdated now
+    publish_change("profiles", [user_id])
     return JSONResponse(status_code=status.HTTP_201_CREATED, content=get_profile(user_id))
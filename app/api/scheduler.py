@@ -1,14 +1,115 @@
-from fastapi import APIRouter, Response, status
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
-from app.core.scheduling import scheduler
+import requests
+from fastapi import APIRouter, Query, Request, Response, status
+
+from app.core.leader import current_lease
+from app.core.run_metrics import summarize_runs
+from app.core.supabase_client import supabase
+
+if TYPE_CHECKING:
+    from app.core.scheduling import JobScheduler
 
 router = APIRouter(prefix="/scheduler")
 
+FORWARDED_HEADER = "X-Scheduler-Forwarded"
+FORWARD_TIMEOUT_SECONDS = 10
+RUNS_PAGE_SIZE = 1000
+
+
+def _local_scheduler(request: Request) -> "JobScheduler | None":
+    # set by the entry point that runs the scheduler in this process, API-only instances have none
+    return getattr(request.app.state, "scheduler", None)
+
+
+def _forward_to_leader(request: Request, response: Response, path: str):
+    """Hands the request over to the scheduler leader (once, to avoid loops while leadership moves)."""
+    local = _local_scheduler(request)
+    if local is not None:
+        address = local.leader_address
+    else:
+        try:
+            lease = current_lease()
+        except Exception as e:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+            return {"error": f"Could not look up the scheduler leader: {e}"}
+        address = lease.get("address") if lease else None
+
+    if request.headers.get(FORWARDED_HEADER) or not address:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"error": "This instance does not run the scheduler and the leader is unknown."}
+
+    headers = {FORWARDED_HEADER: "1"}
+    if request.headers.get("Authorization"):
+        headers["Authorization"] = request.headers["Authorization"]
+    try:
+        forwarded = requests.request(
+            request.method, f"{address.rstrip('/')}{path}", headers=headers, timeout=FORWARD_TIMEOUT_SECONDS
+        )
+    except requests.RequestException as e:
+        response.status_code = status.HTTP_502_BAD_GATEWAY
+        return {"error": f"Could not reach the scheduler leader: {e}"}
+    try:
+        body = forwarded.json()
+    except ValueError:
+        # e.g. an HTML error page of a proxy in front of the leader
+        return Response(
+            content=forwarded.text,
+            status_code=forwarded.status_code,
+            media_type=forwarded.headers.get("Content-Type", "text/plain"),
+        )
+    response.status_code = forwarded.status_code
+    return body
+
+
+@router.get("")
+def get_scheduler_state(request: Request, response: Response):
+    """Job DAG with the status of every job (idle, waiting, queued, running) and the executor's capacity."""
+    local = _local_scheduler(request)
+    if local is None or not local.is_leader:
+        return _forward_to_leader(request, response, "/scheduler")
+    return local.state()
+
+
+@router.get("/metrics")
+def get_job_metrics(days: int = Query(14, ge=1, le=90)):
+    """
+    Duration percentiles, daily throughput (rows written per second) and the latest run of every job,
+    flagged as slow if it took markedly longer than the job's recent successful runs.
+    Read from scheduled_job_runs, so any instance can answer.
+    """
+    since = (datetime.now() - timedelta(days=days)).isoformat()
+    runs: list[dict] = []
+    while True:
+        page = (
+            supabase.table("scheduled_job_runs")
+            .select("name, started_at, duration_seconds, rows_written, exit_reason")
+            .gte("started_at", since)
+            .order("started_at")
+            .range(len(runs), len(runs) + RUNS_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        runs.extend(page)
+        if len(page) < RUNS_PAGE_SIZE:
+            break
+    jobs = summarize_runs(runs)
+    return {"days": days, "slow_jobs": sorted(name for name, job in jobs.items() if job["slow"]), "jobs": jobs}
+
 
 @router.post("/run/{job_name}")
-def run_task(job_name: str, response: Response):
+def run_task(job_name: str, request: Request, response: Response):
+    local = _local_scheduler(request)
+    if local is None or not local.is_leader:
+        # only the leader runs jobs
+        return _forward_to_leader(request, response, f"/scheduler/run/{job_name}")
+
     try:
-        scheduler.run_job(job_name)
+        queued = local.run_job(job_name)
     except ValueError as e:
         response.status_code = status.HTTP_400_BAD_REQUEST
         return {"error": str(e)}
+    if not queued:
+        response.status_code = status.HTTP_409_CONFLICT
+        return {"error": f"Job '{job_name}' is already queued or running."}
+    return {"queued": job_name}
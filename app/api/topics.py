@@ -2,8 +2,8 @@ import logging
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
-from fastapi_cache.decorator import cache
 
+from app.core.cache import cached
 from app.core.extract_topics import TOPICS_TABLE
 from app.core.supabase_client import supabase
 from app.models.topic import Topic
@@ -13,7 +13,7 @@ router = APIRouter()
 
 
 @router.get("/topics", response_model=dict[str, list[Topic]])
-@cache(namespace="topics", expire=86400)
+@cached("topics", warm=True)
 def get_topics():
     try:
         response = supabase.table(TOPICS_TABLE).select("*").execute()
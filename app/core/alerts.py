@@ -2,9 +2,10 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional
 
-from app.core.openai_client import EMBED_MODEL, openai
+from app.core.openai_client import create_chat_completion, create_embeddings
+from app.core.rate_limits import Priority
 from app.core.supabase_client import supabase
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
 from app.core.vector_search import get_top_k_neighbors
 
 
@@ -53,15 +54,15 @@ def build_embedding(text: str) -> list[float]:
     date_ctx = _utc_now().strftime("%Y‑%m‑%d")
     prompt = f"{text}\nCurrent date: {date_ctx}"
 
-    resp = openai.embeddings.create(input=prompt, model=EMBED_MODEL)
-    emb: list[float] = resp.data[0].embedding  # type: ignore[attr-defined]
+    emb: list[float] = create_embeddings([prompt], caller="alerts")[0]
     return emb
 
 
 def generate_alert_title(description: str) -> str:
     prompt = f"Create a catchy title for this EU policy alert description (max 8 words):\n\n{description}"
     try:
-        resp = openai.chat.completions.create(
+        resp = create_chat_completion(
+            caller="alerts",
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
         )
@@ -133,11 +134,14 @@ def mark_alert_ran(alert_id: str, *, ran_at: datetime | None = None) -> None:
 
 
 # ================ logic to retrieve relevant meetings ================
-def find_relevant_meetings_for_alert(alert: dict, *, k: int = 50) -> list[dict]:
+def find_relevant_meetings_for_alert(
+    alert: dict, *, k: int = 50, priority: Priority = Priority.INTERACTIVE
+) -> list[dict]:
     """Run a vector search for meetings that match *alert* and pass its threshold.
 
     Duplicates that were already sent via *alert_notifications* are filtered
     out so a given user only ever receives a meeting once per alert.
+    The scheduled alert job passes ``Priority.BATCH`` for the rerank call.
     """
     # Patch: match_filtered_meetings requires content_columns and src_tables as args!
     neighbors = get_top_k_neighbors(
@@ -153,12 +157,12 @@ def find_relevant_meetings_for_alert(alert: dict, *, k: int = 50) -> list[dict]:
         return []
 
     # Apply threshold early to reduce DB hits later.
-    docs = [n["content_text"] for n in neighbors]
-    rerank_resp = co.rerank(
-        model="rerank-v3.5",
+    rerank_resp = rerank_neighbors(
         query=alert["description"],
-        documents=docs,
-        top_n=min(10, len(docs)),
+        neighbors=neighbors,
+        top_n=min(10, len(neighbors)),
+        caller="alerts",
+        priority=priority,
     )
     neighbors_re = []
     for result in rerank_resp.results:
@@ -196,7 +200,7 @@ def process_alert(alert: dict) -> list[dict]:
     """Wrapper that returns *new* meeting items for an alert and records that they were sent.
     After first trigger, alert becomes inactive (single-use).
     """
-    meetings = find_relevant_meetings_for_alert(alert)
+    meetings = find_relevant_meetings_for_alert(alert, priority=Priority.BATCH)
     if not meetings:
         return []
 
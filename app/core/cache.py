@@ -0,0 +1,465 @@
+"""Response cache shared by all API processes.
+
+``FastAPICache`` with its ``InMemoryBackend`` kept a cold copy per uvicorn worker and let entries expire
+everywhere at once, so every worker recomputed them at the same moment. ``ResponseCache`` stores entries in Redis
+when ``REDIS_URL`` is set (in process memory otherwise) and
+
+- recomputes a missing entry once (single-flight): within a process concurrent callers wait for the first one,
+  across processes a short lock in the backend lets the others wait for its result;
+- keeps entries for another TTL after they turned stale and serves them while one caller refreshes them in the
+  background (stale-while-revalidate);
+- has a TTL per namespace (``NAMESPACE_TTLS``, overridable with ``CACHE_TTL_<NAMESPACE>``);
+- counts hits, stale hits, misses, refreshes and backend errors per namespace, see ``/metrics/cache``.
+
+Endpoints opt in with ``@cached(namespace)``; ``warm=True`` endpoints without parameters are computed on startup.
+An endpoint calls ``skip_caching()`` for a response that should not be stored, e.g. one built on a fallback path.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "openeu-cache"
+DEFAULT_TTL_SECONDS = 3600
+NAMESPACE_TTLS = {
+    "countries": 86400,
+    "topics": 86400,
+    "legislative": 3600,
+    "meetings": 3600,
+}
+LOCK_SECONDS = 30  # max. time other processes wait for the one recomputing an entry
+LOCK_POLL_SECONDS = 0.1
+LATENCY_SAMPLES = 1000  # recent request latencies kept per namespace and outcome
+
+
+# set by skip_caching() while a response is computed
+_skip_store: ContextVar[bool] = ContextVar("skip_cache_store", default=False)
+
+
+def skip_caching() -> None:
+    """Keeps the response being computed out of the cache, e.g. a degraded one a later request can improve on."""
+    _skip_store.set(True)
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        """Sets key only if it does not exist; returns whether it was set."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def clear(self, prefix: str) -> None:
+        """Deletes all keys starting with prefix."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self):
+        self._entries: dict[str, tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+
+    def add(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Any server speaking the Redis protocol (Redis, Valkey, KeyDB) or a fakeredis client for tests."""
+
+    def __init__(self, url: str | None = None, client: Any = None):
+        if client is None:
+            if url is None:
+                raise ValueError("RedisCacheBackend needs a url or a client")
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self.client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self.client.set(key, value, ex=ttl_seconds)
+
+    def add(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        return bool(self.client.set(key, value, ex=ttl_seconds, nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def clear(self, prefix: str) -> None:
+        keys = list(self.client.scan_iter(match=f"{prefix}*", count=500))
+        for start in range(0, len(keys), 500):
+            self.client.delete(*keys[start : start + 500])
+
+
+@dataclass
+class NamespaceStats:
+    """Updated by the request threads and the refresh workers, only through increment and observe."""
+
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    errors: int = 0
+    hit_seconds: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+    miss_seconds: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def observe(self, samples: deque, seconds: float):
+        with self._lock:
+            samples.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            requests = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "errors": self.errors,
+                "hit_ratio": (self.hits + self.stale_hits) / requests if requests else None,
+                "hit_latency_ms": _latency_percentiles(self.hit_seconds),
+                "miss_latency_ms": _latency_percentiles(self.miss_seconds),
+            }
+
+
+def _latency_percentiles(samples: deque) -> dict | None:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        "p50": 1000 * ordered[len(ordered) // 2],
+        "p95": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+
+def _encode(result: Any) -> dict:
+    if isinstance(result, Response):
+        return {
+            "body": result.body.decode(),
+            "status_code": result.status_code,
+            "media_type": result.media_type,
+        }
+    return {"value": jsonable_encoder(result)}
+
+
+def _decode(entry: dict) -> Any:
+    if "body" in entry:
+        return Response(content=entry["body"], status_code=entry["status_code"], media_type=entry["media_type"])
+    return entry["value"]
+
+
+def _prefix(namespace: str, partition: str | None = None) -> str:
+    return f"{KEY_PREFIX}:{namespace}:" if partition is None else f"{KEY_PREFIX}:{namespace}:@{partition}:"
+
+
+def _is_cacheable(result: Any) -> bool:
+    return not isinstance(result, Response) or result.status_code == 200
+
+
+class ResponseCache:
+    """
+    :param backend: Where entries are stored; chosen from REDIS_URL on first use if None.
+    :param refresh_workers: Threads recomputing stale entries in the background.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, refresh_workers: int = 2):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        # computations callers wait for; background refreshes are tracked apart, nobody waits for their result
+        self._inflight: dict[str, Future] = {}
+        self._refreshing: set[str] = set()
+        self._inflight_lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="CacheRefresh")
+        self._stats: dict[str, NamespaceStats] = defaultdict(NamespaceStats)
+        self._stats_lock = threading.Lock()
+        self._ttls: dict[str, int] = {}
+        self._warmers: list[tuple[str, Callable[[], Any]]] = []
+
+    @property
+    def backend(self) -> CacheBackend:
+        with self._backend_lock:
+            if self._backend is None:
+                url = Settings().get_redis_url()
+                self._backend = RedisCacheBackend(url) if url else InMemoryCacheBackend()
+                logger.info(f"Response cache uses {self._backend.__class__.__name__}")
+            return self._backend
+
+    def ttl_seconds(self, namespace: str) -> int:
+        if namespace not in self._ttls:
+            configured = Settings().get_cache_ttl_seconds(namespace)
+            self._ttls[namespace] = configured if configured is not None else NAMESPACE_TTLS.get(
+                namespace, DEFAULT_TTL_SECONDS
+            )
+        return self._ttls[namespace]
+
+    @staticmethod
+    def key(namespace: str, func: Callable, arguments: dict[str, Any], partition: str | None = None) -> str:
+        """
+        Canonical key: argument order and the request/response objects FastAPI injects don't matter.
+        :param partition: Groups the key with others that are cleared together, e.g. the responses of one user.
+        """
+        relevant = {
+            name: value for name, value in arguments.items() if not isinstance(value, Request | Response)
+        }
+        canonical = json.dumps(jsonable_encoder(relevant), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(canonical.encode()).hexdigest()[:32]
+        prefix = _prefix(namespace, partition)
+        return f"{prefix}{func.__module__}.{func.__qualname__}:{digest}"
+
+    def _namespace_stats(self, namespace: str) -> NamespaceStats:
+        with self._stats_lock:
+            return self._stats[namespace]
+
+    def get_or_compute(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        stats = self._namespace_stats(namespace)
+        started = time.monotonic()
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            # fail open, a broken cache must not take the endpoints down
+            logger.warning(f"Cache backend unavailable, computing '{key}' directly: {e}")
+            stats.increment("errors")
+            return compute()
+
+        if raw is not None:
+            entry = json.loads(raw)
+            if entry["fresh_until"] > time.time():
+                stats.increment("hits")
+            else:
+                stats.increment("stale_hits")
+                self._refresh_in_background(namespace, key, compute)
+            result = _decode(entry)
+            stats.observe(stats.hit_seconds, time.monotonic() - started)
+            return result
+
+        stats.increment("misses")
+        result = self._single_flight(namespace, key, compute)
+        stats.observe(stats.miss_seconds, time.monotonic() - started)
+        return result
+
+    def _single_flight(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        with self._inflight_lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                future: Future = Future()
+                self._inflight[key] = future
+        if pending is not None:
+            return pending.result()
+
+        try:
+            result = self._compute_once(namespace, key, compute)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _compute_once(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Computes and stores the entry, unless another process does so already; then waits for its result."""
+        lock_key = f"{key}:lock"
+        try:
+            locked = self.backend.add(lock_key, b"1", LOCK_SECONDS)
+        except Exception:
+            locked = True  # the backend is down, compute without storing
+        if not locked:
+            deadline = time.monotonic() + LOCK_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_SECONDS)
+                try:
+                    raw = self.backend.get(key)
+                except Exception:
+                    break
+                if raw is not None:
+                    return _decode(json.loads(raw))
+            # the other process died or is too slow, compute ourselves
+        try:
+            return self._compute_and_store(namespace, key, compute)
+        finally:
+            if locked:
+                try:
+                    self.backend.delete(lock_key)
+                except Exception as e:
+                    logger.debug(f"Failed to release cache lock '{lock_key}': {e}")
+
+    def _compute_and_store(self, namespace: str, key: str, compute: Callable[[], Any]) -> Any:
+        token = _skip_store.set(False)
+        try:
+            result = compute()
+            skip = _skip_store.get()
+        finally:
+            _skip_store.reset(token)
+        if skip or not _is_cacheable(result):
+            return result
+        ttl = self.ttl_seconds(namespace)
+        entry = {"fresh_until": time.time() + ttl, **_encode(result)}
+        try:
+            # kept for another TTL, in which it is served stale while being refreshed
+            self.backend.set(key, json.dumps(entry).encode(), 2 * ttl)
+        except Exception as e:
+            logger.warning(f"Failed to store cache entry '{key}': {e}")
+            self._namespace_stats(namespace).increment("errors")
+        return result
+
+    def _refresh_in_background(self, namespace: str, key: str, compute: Callable[[], Any]):
+        with self._inflight_lock:
+            if key in self._refreshing or key in self._inflight:
+                return
+            self._refreshing.add(key)
+        try:
+            locked = self.backend.add(f"{key}:lock", b"1", LOCK_SECONDS)
+        except Exception:
+            locked = False
+        if not locked:
+            # another process refreshes it
+            with self._inflight_lock:
+                self._refreshing.discard(key)
+            return
+
+        def refresh():
+            stats = self._namespace_stats(namespace)
+            try:
+                self._compute_and_store(namespace, key, compute)
+                stats.increment("refreshes")
+            except Exception as e:
+                logger.warning(f"Failed to refresh cache entry '{key}': {e}")
+                stats.increment("errors")
+            finally:
+                with self._inflight_lock:
+                    self._refreshing.discard(key)
+                try:
+                    self.backend.delete(f"{key}:lock")
+                except Exception as e:
+                    logger.debug(f"Failed to release cache lock for '{key}': {e}")
+
+        self._refresher.submit(refresh)
+
+    def clear(self, namespace: str | None = None, partition: str | None = None):
+        """Drops all entries, those of one namespace, or those of one partition of a namespace."""
+        self.backend.clear(_prefix(namespace, partition) if namespace else f"{KEY_PREFIX}:")
+
+    def claim_invalidation(self, event_id: str) -> bool:
+        """
+        Whether this process should apply an invalidation event: every process clears its own in-memory cache,
+        but a shared backend is cleared by the first process that receives the event.
+        """
+        if not isinstance(self.backend, RedisCacheBackend):
+            return True
+        try:
+            return self.backend.add(f"{KEY_PREFIX}-invalidations:{event_id}", b"1", 600)
+        except Exception:
+            return True
+
+    def register_warmer(self, namespace: str, func: Callable[[], Any]):
+        self._warmers.append((namespace, func))
+
+    def warm_up(self):
+        """Computes the entries of all warm=True endpoints that are not cached yet."""
+        for namespace, func in self._warmers:
+            try:
+                func()
+            except Exception as e:
+                logger.warning(f"Failed to warm up cache namespace '{namespace}': {e}")
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            namespaces = list(self._stats.items())
+        return {
+            "backend": self.backend.__class__.__name__,
+            "namespaces": {
+                namespace: {"ttl_seconds": self.ttl_seconds(namespace), **stats.snapshot()}
+                for namespace, stats in namespaces
+            },
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cached(namespace: str, warm: bool = False, partition_by: str | None = None):
+    """
+    Caches a (sync) endpoint in the response cache.
+    :param namespace: Group of entries sharing a TTL and cleared together.
+    :param warm: Compute the entry on startup; only for endpoints without parameters.
+    :param partition_by: Parameter whose value partitions the namespace, e.g. user_id for personalized responses
+        that are cleared when the user's profile changes.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind_partial(*args, **kwargs).arguments
+            partition = arguments.get(partition_by) if partition_by else None
+            key = response_cache.key(namespace, func, arguments, None if partition is None else str(partition))
+            return response_cache.get_or_compute(namespace, key, lambda: func(*args, **kwargs))
+
+        if warm:
+            response_cache.register_warmer(namespace, wrapper)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,200 @@
+"""Change events from the scrapers to the API processes.
+
+Scrapers publish a ``ChangeEvent`` (table, ids, scraped_at) whenever they flushed a batch of stored rows, which
+covers the embeddings and topics they store inline; the enrichment jobs publish one per batch of meeting embeddings
+or topic assignments. Every API process listens for them and drops the cached responses that were computed from
+that table, so the response cache can use long TTLs without serving stale data.
+
+- With ``REDIS_URL`` set, events go through a Redis pub/sub channel and reach every API process and replica,
+  including those of jobs running in worker processes or in worker.py.
+- Without it they are delivered to the listeners of the publishing process only: enough when the API, the
+  scheduler and the thread jobs share a process, process jobs then rely on the TTLs.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "openeu:change-events"
+RECONNECT_SECONDS = 5
+
+# tables that end up in v_meetings, see supabase/schemas/28_v_meeting.sql
+MEETING_TABLES = [
+    "austrian_parliament_meetings",
+    "belgian_parliament_meetings",
+    "ec_res_inno_meetings",
+    "ep_meetings",
+    "ipex_events",
+    "mec_prep_bodies_meeting",
+    "mec_summit_ministerial_meeting",
+    "mep_meetings",
+    "nl_twka_meetings",
+    "polish_presidency_meeting",
+    "spanish_commission_meetings",
+    "weekly_agenda",
+]
+
+# tables with rows per meeting of any meeting table, their events carry meeting_id(source_table, source_id) ids
+MEETING_ENRICHMENT_TABLES = ["meeting_embeddings", "meeting_topic_assignments"]
+
+# cache namespaces whose responses are computed from a table
+TABLE_NAMESPACES: dict[str, list[str]] = {
+    **{table: ["meetings", "meetings_list", "countries"] for table in MEETING_TABLES},
+    "meeting_topic_assignments": ["meetings", "meetings_list"],
+    "meeting_embeddings": ["meetings", "meetings_list"],
+    "meeting_topics": ["topics", "meetings", "meetings_list"],
+    "legislative_files": ["legislative"],
+    "legislative_procedure_files": ["legislative"],
+}
+
+# namespaces partitioned by the ids of a table's rows, only the partitions of the changed rows are cleared
+TABLE_PARTITIONS: dict[str, list[str]] = {
+    "profiles": ["meetings_list"],
+    "user_recommendations": ["meetings_list"],  # ids are profile ids
+}
+
+
+@dataclass
+class ChangeEvent:
+    table: str
+    ids: list[str]
+    scraped_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+Listener = Callable[[ChangeEvent], None]
+
+
+class ChangeBus:
+    def __init__(self):
+        self._listeners: list[Listener] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _deliver(self, event: ChangeEvent):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Change listener failed for {event.table}: {e}")
+
+    def publish(self, event: ChangeEvent):
+        self._deliver(event)
+
+    def start(self):
+        """Starts receiving events from other processes, if the bus can."""
+
+
+class RedisChangeBus(ChangeBus):
+    def __init__(self, url: str):
+        super().__init__()
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_connect_timeout=1)
+        self._thread: threading.Thread | None = None
+
+    def publish(self, event: ChangeEvent):
+        # delivered to this process's listeners through the subscription, too
+        try:
+            self.client.publish(CHANNEL, json.dumps(asdict(event)))
+        except Exception as e:
+            logger.error(f"Failed to publish change of {event.table}, delivering locally only: {e}")
+            self._deliver(event)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._listen, daemon=True, name="ChangeEvents")
+        self._thread.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    self._deliver(ChangeEvent(**json.loads(message["data"])))
+            except Exception as e:
+                logger.warning(f"Change event subscription lost, reconnecting: {e}")
+                time.sleep(RECONNECT_SECONDS)
+
+
+_bus: ChangeBus | None = None
+_bus_lock = threading.Lock()
+
+
+def get_bus() -> ChangeBus:
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            url = Settings().get_redis_url()
+            _bus = RedisChangeBus(url) if url else ChangeBus()
+        return _bus
+
+
+def publish_change(table: str, ids: list) -> None:
+    """Publishes that rows of table were inserted or updated; never raises, scrapers must not fail on it."""
+    if not ids:
+        return
+    try:
+        get_bus().publish(ChangeEvent(table=table, ids=[str(row_id) for row_id in ids]))
+    except Exception as e:
+        logger.error(f"Failed to publish change of {table}: {e}")
+
+
+def meeting_id(source_table: str, source_id: str) -> str:
+    """Event id of a meeting in the events of MEETING_ENRICHMENT_TABLES."""
+    return f"{source_table}:{source_id}"
+
+
+def changed_meetings(event: ChangeEvent) -> dict[str, list[str]]:
+    """The source ids per meeting table of the meetings an event changed, empty for other tables."""
+    if event.table in MEETING_TABLES:
+        return {event.table: list(event.ids)}
+    if event.table not in MEETING_ENRICHMENT_TABLES:
+        return {}
+    changed: dict[str, list[str]] = {}
+    for event_id in event.ids:
+        source_table, _, source_id = event_id.partition(":")
+        if source_table in MEETING_TABLES and source_id:
+            changed.setdefault(source_table, []).append(source_id)
+    return changed
+
+
+def invalidate_cached_responses(event: ChangeEvent) -> None:
+    # imported here: scrapers publish events but don't need the API's cache
+    from app.core.cache import response_cache
+
+    namespaces = TABLE_NAMESPACES.get(event.table, [])
+    partitioned = TABLE_PARTITIONS.get(event.table, [])
+    if not (namespaces or partitioned) or not response_cache.claim_invalidation(event.id):
+        return
+    for namespace in namespaces:
+        response_cache.clear(namespace)
+    for namespace in partitioned:
+        for row_id in event.ids:
+            response_cache.clear(namespace, row_id)
+    logger.info(
+        f"Invalidated cached {namespaces + partitioned} after {len(event.ids)} changed rows in {event.table}"
+    )
+
+
+def start_cache_invalidation() -> None:
+    """Lets this process drop cached responses when scrapers change their tables, called on API startup."""
+    bus = get_bus()
+    bus.subscribe(invalidate_cached_responses)
+    bus.start()
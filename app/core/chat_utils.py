@@ -4,13 +4,11 @@ from datetime import datetime, timezone
 
 from fastapi import HTTPException
 from openai.types.chat import ChatCompletionAssistantMessageParam, ChatCompletionUserMessageParam
-from openai import OpenAI
+from app.core.openai_client import create_chat_completion
 from app.core.supabase_client import supabase
 from app.core.table_metadata import get_table_description
 from app.core.vector_search import get_top_k_neighbors
 
-client = OpenAI()
-
 
 def build_system_prompt(messages: list[dict[str, str | int]], prompt: str, user_profile: str = "",
                         context_text: str = "") -> str:
@@ -96,7 +94,9 @@ def get_response(prompt: str, session_id: str, user_id: str, context_text: str =
         )
 
         user_profile = get_profile_embedding_input(user_id) if user_id != "" else ""
-        response = client.chat.completions.create(
+        # the rate limiter covers opening the stream, not reading it
+        response = create_chat_completion(
+            caller="chat",
             model="gpt-4.1-mini",
             messages=[
                 ChatCompletionAssistantMessageParam(
@@ -2,6 +2,20 @@ from app.core.config import Settings
 import cohere
 from cohere import ClientV2
 
+from app.core.rate_limits import Priority, estimate_tokens, limited_call
+
+RERANK_MODEL = "rerank-v3.5"
 
 settings = Settings()
 co: ClientV2 = cohere.ClientV2(api_key=settings.get_cohere_api_key())
+
+
+def rerank(query: str, documents: list[str], top_n: int, caller: str, priority: Priority = Priority.INTERACTIVE):
+    """co.rerank with RERANK_MODEL within the shared rate limits."""
+
+    def call():
+        return co.rerank(model=RERANK_MODEL, query=query, documents=documents, top_n=top_n), None
+
+    return limited_call(
+        call, model=RERANK_MODEL, caller=caller, priority=priority, tokens=estimate_tokens([query, *documents])
+    )
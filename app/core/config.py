@@ -133,3 +133,181 @@ class Settings:
         if value is None:
             value = ""
         return value
+
+    def is_model_server_enabled(self) -> bool:
+        """
+        Whether the scheduler starts a shared model server process for its jobs (enabled by default).
+        """
+        value = os.getenv("MODEL_SERVER_ENABLED")
+        if value is None:
+            return True
+        return value.lower() == "true"
+
+    def get_job_max_threads(self) -> int:
+        value = os.getenv("JOB_MAX_THREADS")
+        if value is None:
+            return 4
+        return int(value)
+
+    def get_job_max_processes(self) -> int:
+        value = os.getenv("JOB_MAX_PROCESSES")
+        if value is None:
+            return 2
+        return int(value)
+
+    def get_job_class_limit(self, resource_class: str) -> int | None:
+        """
+        Max. number of concurrently running scheduled jobs of a resource class, e.g. JOB_LIMIT_BROWSER=1.
+        None means the executor's default for that class is used.
+        """
+        value = os.getenv(f"JOB_LIMIT_{resource_class.upper()}")
+        if value is None:
+            return None
+        return int(value)
+
+    def is_scheduler_leader_election_enabled(self) -> bool:
+        """
+        Whether scheduler instances elect a leader that alone runs jobs (enabled by default).
+        Disable it to run jobs on every instance, e.g. locally without the scheduler_leases table.
+        """
+        value = os.getenv("SCHEDULER_LEADER_ELECTION")
+        if value is None:
+            return True
+        return value.lower() == "true"
+
+    def get_scheduler_instance_id(self) -> str | None:
+        return os.getenv("SCHEDULER_INSTANCE_ID")
+
+    def get_scheduler_advertise_url(self) -> str | None:
+        """
+        Base URL under which other replicas reach this instance, manual job runs are forwarded to the leader's.
+        """
+        return os.getenv("SCHEDULER_ADVERTISE_URL")
+
+    def get_scheduler_lease_ttl_seconds(self) -> int:
+        value = os.getenv("SCHEDULER_LEASE_TTL_SECONDS")
+        if value is None:
+            return 60
+        return int(value)
+
+    def should_run_scheduler(self) -> bool:
+        """
+        Whether main.py runs the job scheduler in the API process (default). Set RUN_SCHEDULER=false for
+        API-only instances when the jobs run in worker.py.
+        """
+        value = os.getenv("RUN_SCHEDULER")
+        if value is None:
+            return True
+        return value.lower() == "true"
+
+    def get_job_worker_max_jobs(self) -> int:
+        """
+        Number of jobs a warm worker process runs before it is replaced by a fresh one.
+        """
+        value = os.getenv("JOB_WORKER_MAX_JOBS")
+        if value is None:
+            return 20
+        return int(value)
+
+    def get_job_worker_max_rss_mb(self) -> float:
+        """
+        Peak memory of a warm worker process after which it is replaced by a fresh one.
+        """
+        value = os.getenv("JOB_WORKER_MAX_RSS_MB")
+        if value is None:
+            return 1536
+        return float(value)
+
+    def get_job_catch_up_hours(self) -> float:
+        """
+        How far back a scheduled slot that was missed (e.g. during a restart) is still run on start; 0 disables it.
+        """
+        value = os.getenv("JOB_CATCH_UP_HOURS")
+        if value is None:
+            return 24
+        return float(value)
+
+    def get_redis_url(self) -> str | None:
+        """
+        Redis server shared by all API instances for the response cache and by all processes for the model rate
+        limits, e.g. redis://redis:6379/0. None keeps both in the memory of each process.
+        """
+        return os.getenv("REDIS_URL")
+
+    def get_cache_ttl_seconds(self, namespace: str) -> int | None:
+        """
+        Seconds a cached response of a namespace is fresh, e.g. CACHE_TTL_TOPICS=3600.
+        None means the cache's default for that namespace is used.
+        """
+        value = os.getenv(f"CACHE_TTL_{namespace.upper()}")
+        if value is None:
+            return None
+        return int(value)
+
+    def get_reformulation_budget_seconds(self) -> float:
+        """
+        How long semantic searches wait for the LLM query reformulation before they answer with the candidates
+        of the raw query, which are searched for in the meantime; 0 always waits.
+        """
+        value = os.getenv("REFORMULATION_BUDGET_SECONDS")
+        if value is None:
+            return 1.5
+        return float(value)
+
+    def get_meeting_index_enabled(self) -> bool:
+        """
+        Whether the API keeps meeting_embeddings in memory and runs meeting vector searches locally instead of
+        calling match_filtered_meetings; takes ~6 KB of memory per meeting and process.
+        """
+        value = os.getenv("MEETING_INDEX_ENABLED")
+        if value is None:
+            return False
+        return value.lower() == "true"
+
+    def get_meeting_index_quantization(self) -> str:
+        """
+        How the meeting index stores embeddings: "float32" (exact, default), "int8" or "binary" codes that are
+        searched coarsely and rescored on float16 copies; see scripts/quantization_report.py for their recall.
+        """
+        value = os.getenv("MEETING_INDEX_QUANTIZATION")
+        if value is None:
+            return "float32"
+        return value.lower()
+
+    def get_lexical_index_enabled(self) -> bool:
+        """
+        Whether the API keeps BM25 indexes of the meeting and legislative file texts in memory and fuses their
+        matches into the vector search results of text queries.
+        """
+        value = os.getenv("LEXICAL_INDEX_ENABLED")
+        if value is None:
+            return False
+        return value.lower() == "true"
+
+    def get_rerank_backend(self) -> str:
+        """
+        Which reranker scores search candidates: "remote" (Cohere, default), "local" (a cross-encoder on the CPU)
+        or "hybrid" (the cross-encoder pre-filters, Cohere rescores the best RERANK_REMOTE_TOP_N).
+        """
+        value = os.getenv("RERANK_BACKEND")
+        if value is None:
+            return "remote"
+        return value.lower()
+
+    def get_rerank_local_model(self) -> str:
+        """
+        sentence-transformers cross-encoder of the local and hybrid rerank backends.
+        """
+        value = os.getenv("RERANK_LOCAL_MODEL")
+        if value is None:
+            return "cross-encoder/ms-marco-MiniLM-L-6-v2"
+        return value
+
+    def get_rerank_remote_top_n(self) -> int:
+        """
+        Documents the hybrid rerank backend sends to Cohere after the local pre-filter.
+        """
+        value = os.getenv("RERANK_REMOTE_TOP_N")
+        if value is None:
+            return 100
+        return int(value)
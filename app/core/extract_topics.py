@@ -1,10 +1,9 @@
 import logging
 
 import numpy as np
-from keybert import KeyBERT
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
+from app.core.change_events import meeting_id, publish_change
+from app.core.model_server import get_model_client
 from app.core.supabase_client import supabase
 from app.models.meeting import MeetingTopicAssignment
 
@@ -63,6 +62,39 @@ def fetch_and_prepare_meetings() -> list[MeetingTopicAssignment]:
     return all_meetings
 
 
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise cosine similarity of the rows of a and b, like sklearn's, without importing sklearn.
+    """
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a @ b.T
+
+
+def fetch_meetings_without_topic(batch_size: int = BATCH_SIZE) -> list[MeetingTopicAssignment]:
+    """
+    Fetches all meetings from v_meetings that have no topic assignment yet.
+    """
+    offset = 0
+    meetings: list[MeetingTopicAssignment] = []
+    while True:
+        resp = (
+            supabase.table("v_meetings")
+            .select("source_id, source_table, title, description")
+            .is_("topic", "null")
+            .order("source_table")
+            .order("source_id")
+            .range(offset, offset + batch_size - 1)
+            .execute()
+        )
+        meetings.extend(MeetingTopicAssignment(**item) for item in resp.data or [])
+        if not resp.data or len(resp.data) < batch_size:
+            return meetings
+        offset += batch_size
+
+
 def add_other_topic() -> int | None:
     """
     Ensures the 'Other' topic exists in the topics table and returns its id.
@@ -81,12 +113,42 @@ class TopicExtractor:
     _keybert_model = None
 
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        self.model_name = model_name
+        # prefer the shared model server, so job processes don't load their own copy of the model
+        self.model_client = get_model_client()
+        if self.model_client is None:
+            self._load_local_model()
+
+    def _load_local_model(self):
         if TopicExtractor._sentence_model is None:
-            TopicExtractor._sentence_model = SentenceTransformer(model_name)
-        if TopicExtractor._keybert_model is None:
-            TopicExtractor._keybert_model = KeyBERT(model_name)
+            # imported here: torch and sentence-transformers take seconds to import and most importers never encode
+            from sentence_transformers import SentenceTransformer
+
+            TopicExtractor._sentence_model = SentenceTransformer(self.model_name)
         self.model = TopicExtractor._sentence_model
-        self.kw_model = TopicExtractor._keybert_model
+
+    @property
+    def kw_model(self):
+        # only needed for keyword extraction, which is currently disabled
+        if TopicExtractor._keybert_model is None:
+            from keybert import KeyBERT
+
+            self._load_local_model()
+            TopicExtractor._keybert_model = KeyBERT(self.model)
+        return TopicExtractor._keybert_model
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Returns normalized sentence embeddings for texts, computed by the model server if available.
+        """
+        if self.model_client is not None:
+            try:
+                return self.model_client.encode(self.model_name, texts, True)
+            except Exception as e:
+                logger.warning(f"Model server encode failed, falling back to local model: {e}")
+                self.model_client = None
+                self._load_local_model()
+        return self.model.encode(texts, normalize_embeddings=True)
 
     '''
     def extract_keywords_from_texts(self, all_texts: list[tuple[str, str]], top_n_keywords: int) -> list[str]:
@@ -163,9 +225,9 @@ class TopicExtractor:
         topic_ids = [t["id"] for t in topics]
         other_id = next((t["id"] for t in topics if t["topic"] == OTHER_TOPIC), None)
 
-        topic_embeddings = self.model.encode(topic_keywords, normalize_embeddings=True)
         meeting_text = f"{meeting.title or ''}. {meeting.description or ''}".strip()
-        meeting_emb = self.model.encode([meeting_text], normalize_embeddings=True)
+        embeddings = self.encode(topic_keywords + [meeting_text])
+        topic_embeddings, meeting_emb = embeddings[:-1], embeddings[-1:]
         sims = cosine_similarity(meeting_emb, topic_embeddings)[0]
         best_idx = int(np.argmax(sims))
         best_score = float(sims[best_idx])
@@ -185,6 +247,44 @@ class TopicExtractor:
         except Exception as e:
             logger.error(f"Error storing meeting-topic assignments: {e}")
 
+    def assign_meetings_to_topics(self, meetings: list[MeetingTopicAssignment], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Bulk variant of assign_meeting_to_topic: loads and encodes the topics once, encodes the meetings
+        in batches and upserts one batch of assignments per request. Returns the number of stored assignments.
+        """
+        resp = supabase.table(TOPICS_TABLE).select("id,topic").execute()
+        topics = resp.data
+        if not topics or not meetings:
+            return 0
+
+        topic_ids = [t["id"] for t in topics]
+        other_id = next((t["id"] for t in topics if t["topic"] == OTHER_TOPIC), None)
+        topic_embeddings = self.encode([t["topic"].lower().strip() for t in topics])
+
+        stored = 0
+        for i in range(0, len(meetings), batch_size):
+            batch = meetings[i : i + batch_size]
+            meeting_embeddings = self.encode([f"{m.title or ''}. {m.description or ''}".strip() for m in batch])
+            sims = cosine_similarity(meeting_embeddings, topic_embeddings)
+            rows = []
+            for meeting, meeting_sims in zip(batch, sims, strict=True):
+                best_idx = int(np.argmax(meeting_sims))
+                topic_id = topic_ids[best_idx] if meeting_sims[best_idx] >= SIMILARITY_THRESHOLD else other_id
+                if topic_id is None:
+                    continue
+                rows.append(
+                    {"source_id": meeting.source_id, "source_table": meeting.source_table, "topic_id": topic_id}
+                )
+            if not rows:
+                continue
+            try:
+                supabase.table(ASSIGNMENTS_TABLE).upsert(rows, on_conflict="source_id,source_table").execute()
+                stored += len(rows)
+                publish_change(ASSIGNMENTS_TABLE, [meeting_id(row["source_table"], row["source_id"]) for row in rows])
+            except Exception as e:
+                logger.error(f"Error storing meeting-topic assignments: {e}")
+        return stored
+
     def reassign_all_meetings(self):
         """
         Orchestrates the process of assigning all meetings to predefined topics.
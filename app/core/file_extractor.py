@@ -1,5 +1,3 @@
-from langchain_community.document_loaders import PyPDFLoader
-from docx import Document
 import os
 
 
@@ -15,6 +13,8 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     Raises:
         Exception: If extraction fails.
     """
+    from langchain_community.document_loaders import PyPDFLoader
+
     try:
         loader = PyPDFLoader(pdf_path)
         docs = loader.load()
@@ -35,6 +35,8 @@ def extract_text_from_docx(docx_path: str) -> str:
     Raises:
         Exception: If extraction fails.
     """
+    from docx import Document
+
     try:
         doc = Document(docx_path)
         return "\n".join([para.text for para in doc.paragraphs])
@@ -0,0 +1,165 @@
+"""Bounded executor for scheduled jobs.
+
+``schedule`` only decides *when* a job becomes due; the executor decides when it actually starts. Due jobs are put
+into a priority queue and started as soon as there is capacity:
+
+- at most ``max_threads`` thread jobs and ``max_processes`` process jobs run at the same time,
+- every job belongs to a resource class (browser, scrapy, api, mail) with its own concurrency cap,
+- a job that is already queued or running is not queued a second time, so jobs never overlap themselves.
+
+Jobs whose class is saturated do not block jobs of other classes behind them in the queue.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime
+from enum import Enum, IntEnum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.core.scheduling import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceClass(Enum):
+    BROWSER = "browser"  # Playwright / crawl4ai, heavy on memory
+    SCRAPY = "scrapy"
+    API = "api"  # plain HTTP APIs, OpenAI, Supabase
+    MAIL = "mail"
+
+
+class JobPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+DEFAULT_MAX_THREADS = 4
+DEFAULT_MAX_PROCESSES = 2
+DEFAULT_CLASS_LIMITS: dict[ResourceClass, int] = {
+    ResourceClass.BROWSER: 1,
+    ResourceClass.SCRAPY: 2,
+    ResourceClass.API: 3,
+    ResourceClass.MAIL: 1,
+}
+
+
+class JobExecutor:
+    """
+    Runs submitted jobs on a bounded set of worker threads.
+
+    :param max_threads: Max. number of jobs running in a thread of this process at the same time.
+    :param max_processes: Max. number of jobs running in their own process at the same time.
+    :param class_limits: Max. number of concurrently running jobs per resource class.
+    :param on_finished: Called with every job after it finished and released its capacity.
+    """
+
+    def __init__(
+        self,
+        max_threads: int = DEFAULT_MAX_THREADS,
+        max_processes: int = DEFAULT_MAX_PROCESSES,
+        class_limits: dict[ResourceClass, int] | None = None,
+        on_finished: Callable[["ScheduledJob"], None] | None = None,
+    ):
+        self.on_finished = on_finished
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.class_limits = {**DEFAULT_CLASS_LIMITS, **(class_limits or {})}
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int, ScheduledJob]] = []
+        self._seq = itertools.count()
+        self._queued: dict[str, datetime] = {}
+        self._running: dict[str, datetime] = {}
+        self._class_running: Counter[ResourceClass] = Counter()
+        self._threads_running = 0
+        self._processes_running = 0
+        self._dispatcher: threading.Thread | None = None
+
+    def submit(self, job: "ScheduledJob") -> bool:
+        """Queue job. Returns False if it is already queued or running."""
+        with self._cond:
+            if job.name in self._queued or job.name in self._running:
+                logger.warning(f"Job '{job.name}' is already queued or running, skipping this run")
+                return False
+            heapq.heappush(self._queue, (int(job.priority), next(self._seq), job))
+            self._queued[job.name] = datetime.now()
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name="JobExecutor")
+                self._dispatcher.start()
+            self._cond.notify_all()
+        return True
+
+    def is_busy(self, name: str) -> bool:
+        with self._cond:
+            return name in self._queued or name in self._running
+
+    def _has_capacity(self, job: "ScheduledJob") -> bool:
+        if self._class_running[job.resource_class] >= self.class_limits.get(job.resource_class, 1):
+            return False
+        if job.run_in_process:
+            return self._processes_running < self.max_processes
+        return self._threads_running < self.max_threads
+
+    def _take_next(self) -> "ScheduledJob | None":
+        """Pops the highest-priority job that fits the free capacity. Caller must hold the lock."""
+        for entry in sorted(self._queue):
+            job = entry[2]
+            if self._has_capacity(job):
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                del self._queued[job.name]
+                self._running[job.name] = datetime.now()
+                self._class_running[job.resource_class] += 1
+                if job.run_in_process:
+                    self._processes_running += 1
+                else:
+                    self._threads_running += 1
+                return job
+        return None
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                job = self._take_next()
+                while job is None:
+                    self._cond.wait()
+                    job = self._take_next()
+            threading.Thread(target=self._run, args=(job,), daemon=True, name=f"job-{job.name}").start()
+
+    def _run(self, job: "ScheduledJob"):
+        try:
+            job.execute()
+        except Exception as e:
+            logger.error(f"Executor failed to run job '{job.name}': {e}")
+        finally:
+            with self._cond:
+                del self._running[job.name]
+                self._class_running[job.resource_class] -= 1
+                if job.run_in_process:
+                    self._processes_running -= 1
+                else:
+                    self._threads_running -= 1
+                self._cond.notify_all()
+            if self.on_finished is not None:
+                try:
+                    self.on_finished(job)
+                except Exception as e:
+                    logger.error(f"Completion callback failed for job '{job.name}': {e}")
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "running": {name: started.isoformat() for name, started in self._running.items()},
+                "queued": [entry[2].name for entry in sorted(self._queue)],
+                "threads": {"running": self._threads_running, "limit": self.max_threads},
+                "processes": {"running": self._processes_running, "limit": self.max_processes},
+                "classes": {
+                    resource_class.value: {"running": self._class_running[resource_class], "limit": limit}
+                    for resource_class, limit in self.class_limits.items()
+                },
+            }
@@ -10,6 +10,21 @@ from app.core.alerts import (
 )
 from app.core.mail.alert_email import SmartAlertMailer
 from app.core.mail.newsletter import Newsletter
+from app.core.extract_topics import TopicExtractor, fetch_meetings_without_topic
+from app.core.job_executor import JobPriority, ResourceClass
+from app.core.process_jobs import (
+    LOOKAHEAD_DAYS,
+    clean_up_meetings,
+    scrape_ec_res_inno_meetings,
+    scrape_legislative_observatory,
+    scrape_mep_meetings,
+    scrape_netherlands_twka_meetings,
+    scrape_polish_presidency_meetings,
+    scrape_spanish_commission_meetings,
+    scrape_weekly_agenda,
+    update_user_recommendations,
+)
+from app.core.reformulation import prune_reformulations
 from app.core.scheduling import scheduler
 from app.core.supabase_client import supabase
 from app.data_sources.apis.austrian_parliament import run_scraper
@@ -18,24 +33,32 @@ from app.data_sources.scraper_base import ScraperResult
 from app.data_sources.scrapers.belgian_parliament_scraper import run_scraper as run_belgian_parliament_scraper
 from app.data_sources.scrapers.bundestag_drucksachen_scraper import BundestagDrucksachenScraper
 from app.data_sources.scrapers.bundestag_plenarprotocol_scaper import BundestagPlenarprotokolleScraper
-from app.data_sources.scrapers.ec_res_inno_meetings_scraper import EcResInnoMeetingsScraper
 from app.data_sources.scrapers.ipex_calender_scraper import run_scraper as run_ipex_calendar_scraper
 from app.data_sources.scrapers.lawtracker_topic_scraper import LawTrackerSpider
-from app.data_sources.scrapers.legislative_observatory_scraper import LegislativeObservatoryScraper
 from app.data_sources.scrapers.mec_prep_bodies_meetings_scraper import MECPrepBodiesMeetingsScraper
 from app.data_sources.scrapers.mec_sum_minist_meetings_scraper import MECSumMinistMeetingsScraper
 from app.data_sources.scrapers.meeting_calendar_scraper import EPMeetingCalendarScraper
-from app.data_sources.scrapers.mep_meetings_scraper import MEPMeetingsScraper
-from app.data_sources.scrapers.polish_presidency_meetings_scraper import PolishPresidencyMeetingsScraper
-from app.data_sources.scrapers.spanish_commission_scraper import SpanishCommissionScraper
 from app.data_sources.scrapers.tweets import TweetScraper
-from app.data_sources.scrapers.weekly_agenda_scraper import WeeklyAgendaScraper
-from app.data_sources.scrapers.nl_twka_meetings_scraper import NetherlandsTwkaMeetingsScraper
 from scripts.embedding_cleanup import embedding_cleanup
-from scripts.meeting_cleanup import embedd_missing_entries
 
 
-LOOKAHEAD_DAYS = 7  # Number of days in future to scrape data for
+NIGHTLY_SLOT = "02:00"  # all nightly scrapers become due at once and are queued by the scheduler's executor
+# meeting scrapers trigger embedding and topic assignment of their new rows, jobs reading meetings wait for those
+MEETING_SCRAPERS = [
+    "scrape_meeting_calendar",
+    "scrape_mep_meetings",
+    "scrape_ipex_calendar",
+    "scrape_mec_sum_minist_meetings",
+    "scrape_mec_prep_bodies_meetings",
+    "scrape_weekly_agenda",
+    "scrape_belgian_parliament_meetings",
+    "scrape_austrian_parliament_meetings",
+    "scrape_ec_res_inno_meetings",
+    "scrape_polish_presidency_meetings",
+    "scrape_spanish_commission_meetings",
+    "scrape_netherlands_twka_meetings",
+]
+MEETING_ENRICHMENT = ["embed_meetings", "assign_meeting_topics"]
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -76,13 +99,6 @@ def send_smart_alerts(stop_event: multiprocessing.synchronize.Event):
     )
 
 
-def scrape_netherlands_twka_meetings(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
-    scraper = NetherlandsTwkaMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
-    return scraper.scrape()
-
-
 def scrape_eu_laws_by_topic(stop_event: multiprocessing.synchronize.Event):
     lawtracker = LawTrackerSpider(stop_event=stop_event)
     return lawtracker.scrape()
@@ -101,13 +117,6 @@ def scrape_meeting_calendar(stop_event: multiprocessing.synchronize.Event):
     return ep_meeting_scraper.scrape()
 
 
-def scrape_mep_meetings(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
-    scraper = MEPMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
-    return scraper.scrape()
-
-
 def scrape_mec_sum_minist_meetings(stop_event: multiprocessing.synchronize.Event):
     today = datetime.now().date()
     end_date = today + timedelta(
@@ -158,39 +167,12 @@ def scrape_mec_prep_bodies_meetings(stop_event: multiprocessing.synchronize.Even
     return scraper.scrape()
 
 
-def scrape_weekly_agenda(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
-    scraper = WeeklyAgendaScraper(start_date=today, end_date=end_date, stop_event=stop_event)
-    return scraper.scrape()
-
-
 def scrape_austrian_parliament_meetings(stop_event: multiprocessing.synchronize.Event):
     today = datetime.now().date()
     end_date = today + timedelta(days=LOOKAHEAD_DAYS)
     return run_scraper(start_date=today, end_date=end_date, stop_event=stop_event)
 
 
-def scrape_polish_presidency_meetings(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
-    scraper = PolishPresidencyMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
-    return scraper.scrape()
-
-
-def scrape_ec_res_inno_meetings(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    end_date = today + timedelta(days=365)
-    scraper = EcResInnoMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
-    return scraper.scrape()
-
-
-def scrape_spanish_commission_meetings(stop_event: multiprocessing.synchronize.Event):
-    today = datetime.now().date()
-    scraper = SpanishCommissionScraper(date=today, stop_event=stop_event)
-    return scraper.scrape()
-
-
 def scrape_bundestag_plenary_protocols(stop_event: multiprocessing.synchronize.Event):
     today = datetime.now().date()
     end_date = today + timedelta(days=LOOKAHEAD_DAYS)
@@ -211,11 +193,6 @@ def scrape_tweets(stop_event: multiprocessing.synchronize.Event):
     return scraper.scrape()
 
 
-def scrape_legislative_observatory(stop_event: multiprocessing.synchronize.Event):
-    scraper = LegislativeObservatoryScraper(stop_event=stop_event)
-    return scraper.scrape()
-
-
 def clean_up_embeddings(stop_event: multiprocessing.synchronize.Event):
     embedding_cleanup(stop_event=stop_event)
 
@@ -225,81 +202,164 @@ def fetch_and_store_current_meps(_: multiprocessing.synchronize.Event):
     scrape_meps()
     
     
-def clean_up_meetings(stop_event: multiprocessing.synchronize.Event):
-    embedd_missing_entries()
+def prune_query_reformulations(_: multiprocessing.synchronize.Event):
+    prune_reformulations()
+
+
+def assign_missing_meeting_topics(stop_event: multiprocessing.synchronize.Event):
+    meetings = fetch_meetings_without_topic()
+    logger.info(f"Assigning topics to {len(meetings)} meeting(s)")
+    if stop_event.is_set() or not meetings:
+        return ScraperResult(success=not stop_event.is_set())
+    assigned = TopicExtractor().assign_meetings_to_topics(meetings)
+    return ScraperResult(success=True, lines_added=assigned)
 
 
 def setup_scheduled_jobs():
+    # Nightly jobs share one slot; the scheduler's executor starts them as capacity of their resource class frees up.
     scheduler.register(
-        "fetch_and_store_current_meps", fetch_and_store_current_meps, schedule.every().monday.at("02:00")
+        "fetch_and_store_current_meps", fetch_and_store_current_meps, schedule.every().monday.at(NIGHTLY_SLOT)
     )
+    scheduler.register("scrape_meeting_calendar", scrape_meeting_calendar, schedule.every().day.at(NIGHTLY_SLOT))
     scheduler.register(
-        "scrape_meeting_calendar",
-        scrape_meeting_calendar,
-        schedule.every().day.at("02:10"),
-    )
-    scheduler.register(
-        "scrape_mep_meetings", scrape_mep_meetings, schedule.every().day.at("02:20"), run_in_process=True
+        "scrape_mep_meetings",
+        scrape_mep_meetings,
+        schedule.every().day.at(NIGHTLY_SLOT),
+        run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
-    scheduler.register("scrape_ipex_calendar", scrape_ipex_calendar, schedule.every().day.at("02:30"))
+    scheduler.register("scrape_ipex_calendar", scrape_ipex_calendar, schedule.every().day.at(NIGHTLY_SLOT))
     scheduler.register(
-        "scrape_mec_sum_minist_meetings", scrape_mec_sum_minist_meetings, schedule.every().day.at("02:40")
+        "scrape_mec_sum_minist_meetings",
+        scrape_mec_sum_minist_meetings,
+        schedule.every().day.at(NIGHTLY_SLOT),
+        resource_class=ResourceClass.BROWSER,
     )
     scheduler.register(
-        "scrape_mec_prep_bodies_meetings", scrape_mec_prep_bodies_meetings, schedule.every().day.at("02:50")
+        "scrape_mec_prep_bodies_meetings",
+        scrape_mec_prep_bodies_meetings,
+        schedule.every().day.at(NIGHTLY_SLOT),
+        resource_class=ResourceClass.BROWSER,
     )
     scheduler.register(
-        "scrape_weekly_agenda", scrape_weekly_agenda, schedule.every().monday.at("03:00"), run_in_process=True
+        "scrape_weekly_agenda",
+        scrape_weekly_agenda,
+        schedule.every().monday.at(NIGHTLY_SLOT),
+        run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
     scheduler.register(
-        "scrape_belgian_parliament_meetings", scrape_belgian_parliament_meetings, schedule.every().day.at("03:10")
+        "scrape_belgian_parliament_meetings",
+        scrape_belgian_parliament_meetings,
+        schedule.every().day.at(NIGHTLY_SLOT),
+        resource_class=ResourceClass.BROWSER,
     )
     scheduler.register(
         "scrape_austrian_parliament_meetings",
         scrape_austrian_parliament_meetings,
-        schedule.every().day.at("03:20"),
+        schedule.every().day.at(NIGHTLY_SLOT),
     )
     scheduler.register(
         "scrape_ec_res_inno_meetings",
         scrape_ec_res_inno_meetings,
-        schedule.every().day.at("03:30"),
+        schedule.every().day.at(NIGHTLY_SLOT),
         run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
     scheduler.register(
         "scrape_polish_presidency_meetings",
         scrape_polish_presidency_meetings,
-        schedule.every().day.at("03:40"),
+        schedule.every().day.at(NIGHTLY_SLOT),
         run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
     scheduler.register(
         "scrape_spanish_commission_meetings",
         scrape_spanish_commission_meetings,
-        schedule.every().day.at("03:50"),
+        schedule.every().day.at(NIGHTLY_SLOT),
         run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
-    scheduler.register("scrape_bundestag_drucksachen", scrape_bundestag_drucksachen, schedule.every().day.at("04:00"))
     scheduler.register(
-        "scrape_bundestag_plenary_protocols", scrape_bundestag_plenary_protocols, schedule.every().day.at("04:10")
+        "scrape_bundestag_drucksachen", scrape_bundestag_drucksachen, schedule.every().day.at(NIGHTLY_SLOT)
+    )
+    scheduler.register(
+        "scrape_bundestag_plenary_protocols", scrape_bundestag_plenary_protocols, schedule.every().day.at(NIGHTLY_SLOT)
     )
     scheduler.register(
         "scrape_legislative_observatory",
         scrape_legislative_observatory,
-        schedule.every().monday.at("04:20"),
+        schedule.every().monday.at(NIGHTLY_SLOT),
         run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
     )
-    scheduler.register("send_daily_newsletter", send_daily_newsletter, schedule.every().day.at("08:00"))
-    scheduler.register("send_weekly_newsletter", send_weekly_newsletter, schedule.every().monday.at("08:00"))
-    scheduler.register("clean_up_embeddings", clean_up_embeddings, schedule.every().day.at("04:40"))
-    scheduler.register("scrape_tweets", scrape_tweets, schedule.every().day.at("04:50"))
-    scheduler.register(
-        "send_smart_alerts",
-        send_smart_alerts,
-        schedule.every().hour.at(":15"),  # hourly
-    )
-    scheduler.register("embed_meetings", clean_up_meetings, schedule.every().day.at("01:00"), run_in_process=True)
+    scheduler.register("scrape_tweets", scrape_tweets, schedule.every().day.at(NIGHTLY_SLOT))
     scheduler.register(
         "scrape_netherlands_twka_meetings",
         scrape_netherlands_twka_meetings,
-        schedule.every().day.at("05:00"),
+        schedule.every().day.at(NIGHTLY_SLOT),
+        run_in_process=True,
+        resource_class=ResourceClass.SCRAPY,
+    )
+
+    # ─── jobs triggered by the meeting scrapers ───
+    scheduler.register(
+        "embed_meetings",
+        clean_up_meetings,
+        schedule.every().day.at("01:00"),  # backfills rows missed by failed triggered runs
+        run_in_process=True,
+        triggered_by=MEETING_SCRAPERS,
+    )
+    scheduler.register(
+        "assign_meeting_topics",
+        assign_missing_meeting_topics,
+        triggered_by=MEETING_SCRAPERS,
+    )
+    # scores new meetings once they have topics, and rebuilds changed profiles every half hour
+    scheduler.register(
+        "update_recommendations",
+        update_user_recommendations,
+        schedule.every(30).minutes,
         run_in_process=True,
+        depends_on=MEETING_ENRICHMENT,
+        triggered_by=MEETING_ENRICHMENT,
+    )
+    scheduler.register(
+        "clean_up_embeddings",
+        clean_up_embeddings,
+        schedule.every().day.at("04:40"),
+        priority=JobPriority.LOW,
+        depends_on=["embed_meetings"],
+    )
+    scheduler.register(
+        "prune_query_reformulations",
+        prune_query_reformulations,
+        schedule.every().day.at("04:50"),
+        priority=JobPriority.LOW,
+    )
+
+    # ─── jobs reading meetings, they wait until pending embeddings and topics are stored ───
+    scheduler.register(
+        "send_daily_newsletter",
+        send_daily_newsletter,
+        schedule.every().day.at("08:00"),
+        resource_class=ResourceClass.MAIL,
+        priority=JobPriority.HIGH,
+        depends_on=[*MEETING_ENRICHMENT, "update_recommendations"],
+    )
+    scheduler.register(
+        "send_weekly_newsletter",
+        send_weekly_newsletter,
+        schedule.every().monday.at("08:00"),
+        resource_class=ResourceClass.MAIL,
+        priority=JobPriority.HIGH,
+        depends_on=[*MEETING_ENRICHMENT, "update_recommendations"],
+    )
+    scheduler.register(
+        "send_smart_alerts",
+        send_smart_alerts,
+        schedule.every().hour.at(":15"),  # hourly
+        resource_class=ResourceClass.MAIL,
+        priority=JobPriority.HIGH,
+        depends_on=MEETING_ENRICHMENT,
     )
@@ -0,0 +1,143 @@
+"""Leader election for the job scheduler.
+
+Every API replica (and every uvicorn worker) starts a ``JobScheduler``, but only the one holding the scheduler
+lease may run jobs. The lease is a row in ``scheduler_leases`` that is taken over or renewed atomically by the
+``acquire_scheduler_lease`` RPC; it expires after ``ttl_seconds`` unless the holder renews it, so another replica
+takes over when the leader dies. The leader also advertises its address, other replicas forward manual job runs
+to it.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from app.core.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "job_scheduler"
+LEASES_TABLE = "scheduler_leases"
+
+
+def current_lease() -> dict | None:
+    """The unexpired scheduler lease, for instances that don't run a scheduler themselves."""
+    response = (
+        supabase.table(LEASES_TABLE)
+        .select("holder, address, expires_at")
+        .eq("name", LEASE_NAME)
+        .gt("expires_at", datetime.now(UTC).isoformat())
+        .limit(1)
+        .execute()
+    )
+    return response.data[0] if response.data else None
+
+
+class LeaderElector:
+    """
+    Acquires and renews the scheduler lease in a background thread.
+
+    :param holder: Unique id of this scheduler instance.
+    :param address: Base URL under which this instance's API is reachable by other replicas, if any.
+    :param ttl_seconds: Lifetime of the lease; it is renewed every third of it.
+    :param on_elected: Called when this instance became the leader.
+    :param on_demoted: Called when this instance lost the lease.
+    """
+
+    def __init__(
+        self,
+        holder: str | None = None,
+        address: str | None = None,
+        ttl_seconds: int = 60,
+        on_elected: Callable[[], None] | None = None,
+        on_demoted: Callable[[], None] | None = None,
+    ):
+        self.holder = holder or f"{socket.gethostname()}-{os.getpid()}"
+        self.address = address
+        self.ttl_seconds = ttl_seconds
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        self.leader: str | None = None
+        self.leader_address: str | None = None
+        self._valid_until = 0.0  # monotonic time until which our own lease is known to be valid
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="LeaderElector")
+        self._thread.start()
+
+    def stop(self):
+        """Stops renewing and releases the lease, so another replica can take over right away."""
+        self._stop_event.set()
+        if self.is_leader:
+            try:
+                params = {"lease_name": LEASE_NAME, "lease_holder": self.holder}
+                supabase.rpc("release_scheduler_lease", params).execute()
+            except Exception as e:
+                logger.warning(f"Failed to release scheduler lease: {e}")
+            self._set_leader(False)
+
+    def _run(self):
+        while True:
+            self.try_acquire()
+            if self._stop_event.wait(self.ttl_seconds / 3):
+                return
+
+    def try_acquire(self) -> bool:
+        requested_at = time.monotonic()
+        try:
+            response = supabase.rpc(
+                "acquire_scheduler_lease",
+                {
+                    "lease_name": LEASE_NAME,
+                    "lease_holder": self.holder,
+                    "lease_address": self.address,
+                    "ttl_seconds": self.ttl_seconds,
+                },
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to acquire scheduler lease: {e}")
+            # keep leading only as long as the lease we hold is certainly valid
+            self._set_leader(self.is_leader and time.monotonic() < self._valid_until)
+            return self.is_leader
+
+        lease = response.data[0] if response.data else {}
+        self.leader = lease.get("holder")
+        self.leader_address = lease.get("address")
+        is_leader = self.leader == self.holder
+        if is_leader:
+            self._valid_until = requested_at + self.ttl_seconds
+        self._set_leader(is_leader)
+        return is_leader
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader == self.is_leader:
+            return
+        self.is_leader = is_leader
+        if is_leader:
+            logger.info(f"Scheduler instance '{self.holder}' became the leader")
+            callback = self.on_elected
+        else:
+            logger.warning(f"Scheduler instance '{self.holder}' is no longer the leader (leader: {self.leader})")
+            callback = self.on_demoted
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Leader election callback failed: {e}")
+
+    def snapshot(self) -> dict:
+        return {
+            "instance": self.holder,
+            "is_leader": self.is_leader,
+            "leader": self.leader,
+            "leader_address": self.leader_address,
+        }
@@ -12,7 +12,7 @@ from scripts.embedding_generator import EmbeddingGenerator
 from app.core.chat_utils import get_response
 from app.core.table_metadata import get_table_description
 from app.core.vector_search import get_top_k_neighbors
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
 from app.models.chat import ChatMessageItem
 
 
@@ -256,12 +256,11 @@ def process_legislation(legislation_request: ChatMessageItem, user_id: str):
             )
             if neighbors and len(neighbors) > 0:
                 # Rerank neighbors
-                docs = [n["content_text"] for n in neighbors]
-                rerank_resp = co.rerank(
-                    model="rerank-v3.5",
+                rerank_resp = rerank_neighbors(
                     query=legislation_request.message,
-                    documents=docs,
-                    top_n=min(5, len(docs)),
+                    neighbors=neighbors,
+                    top_n=min(5, len(neighbors)),
+                    caller="legislation_chat",
                 )
                 neighbors_re = []
                 for result in rerank_resp.results:
@@ -0,0 +1,239 @@
+"""In-process BM25 indexes over the embedding inputs of meetings and legislative files.
+
+Embeddings match topics well but exact terms poorly: committee codes ("AGRI committee") and procedure references
+("2023/0001(COD)") land far down the vector results, which is why the searches fetch 1000 candidates and leave the
+ordering to Cohere. With ``LEXICAL_INDEX_ENABLED`` the API keeps a BM25 index per corpus:
+
+- ``meetings``: ``meeting_embeddings.content_text`` by (source_table, source_id),
+- ``legislative_files``: ``legislative_files.embedding_input`` by id.
+
+``get_top_k_neighbors`` fuses its vector results with the lexical ones by reciprocal rank fusion (``fuse``), and
+the reranker prunes the fused list by its fusion scores, so far fewer candidates are sent to Cohere.
+The indexes are loaded on startup, reloaded every ``RELOAD_SECONDS`` and updated from the change events of the
+scrapers and the embedding backfill.
+"""
+
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from app.core.change_events import MEETING_TABLES, ChangeEvent, changed_meetings, get_bus
+from app.core.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60  # rank offset of reciprocal rank fusion, dampens the weight of the first ranks
+PAGE_SIZE = 1000
+RELOAD_SECONDS = 6 * 3600
+MAX_TEXT_CHARS = 4000  # text kept per document for the reranker
+
+_TOKEN = re.compile(r"\w+")
+# procedure references are kept whole as well, e.g. "2023/0001(COD)"
+_PROCEDURE_REFERENCE = re.compile(r"\b\d{4}/\d{4}\([a-z]{3}\)")
+
+Key = tuple[str, str]
+
+
+def tokenize(text: str) -> list[str]:
+    text = text.lower()
+    return _TOKEN.findall(text) + _PROCEDURE_REFERENCE.findall(text)
+
+
+class BM25Index:
+    def __init__(self):
+        self.postings: dict[str, dict[Key, int]] = {}
+        self.lengths: dict[Key, int] = {}
+        self.texts: dict[Key, str] = {}
+        self._terms: dict[Key, Counter] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def _remove(self, key: Key):
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        for term in terms:
+            documents = self.postings[term]
+            del documents[key]
+            if not documents:
+                del self.postings[term]
+        self._total_length -= self.lengths.pop(key)
+        del self.texts[key]
+
+    def upsert(self, key: Key, text: str):
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(key)
+            if not terms:
+                return
+            for term, count in terms.items():
+                self.postings.setdefault(term, {})[key] = count
+            self._terms[key] = terms
+            self.lengths[key] = sum(terms.values())
+            self.texts[key] = text[:MAX_TEXT_CHARS]
+            self._total_length += self.lengths[key]
+
+    def remove(self, key: Key):
+        with self._lock:
+            self._remove(key)
+
+    def search(self, query: str, k: int, allowed: Callable[[Key], bool] | None = None) -> list[tuple[Key, float]]:
+        """The k best BM25 matches of query, optionally only among the keys allowed passes."""
+        with self._lock:
+            if not self.lengths:
+                return []
+            count = len(self.lengths)
+            average_length = self._total_length / count
+            scores: dict[Key, float] = {}
+            for term in set(tokenize(query)):
+                documents = self.postings.get(term)
+                if not documents:
+                    continue
+                idf = math.log(1 + (count - len(documents) + 0.5) / (len(documents) + 0.5))
+                for key, frequency in documents.items():
+                    if allowed is not None and not allowed(key):
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[key] / average_length)
+                    scores[key] = scores.get(key, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+
+def fuse(vector_neighbors: list[dict], lexical: list[tuple[Key, float]], texts: dict[Key, str], k: int) -> list[dict]:
+    """
+    Reciprocal rank fusion of vector and lexical results, best first, at most k.
+    Every neighbor gets a fusion_score; those only found lexically have no vector similarity (0).
+    """
+    scores: dict[Key, float] = {}
+    neighbors: dict[Key, dict] = {}
+    for rank, neighbor in enumerate(vector_neighbors):
+        key = (neighbor["source_table"], str(neighbor["source_id"]))
+        if key in neighbors:  # chunks of the same document, the best one counts
+            continue
+        neighbors[key] = neighbor
+        scores[key] = 1 / (RRF_K + rank + 1)
+    for rank, (key, _) in enumerate(lexical):
+        scores[key] = scores.get(key, 0.0) + 1 / (RRF_K + rank + 1)
+        if key not in neighbors:
+            neighbors[key] = {
+                "source_table": key[0],
+                "source_id": key[1],
+                "content_text": texts.get(key, ""),
+                "similarity": 0.0,
+            }
+    fused = sorted(scores, key=lambda key: scores[key], reverse=True)[:k]
+    for key in fused:
+        neighbors[key]["fusion_score"] = scores[key]
+    return [neighbors[key] for key in fused]
+
+
+def _pages(query_factory, order: list[str]) -> list[dict]:
+    rows: list[dict] = []
+    while True:
+        query = query_factory()
+        for column in order:
+            query = query.order(column)
+        page = query.range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def _meeting_documents(source_table: str | None = None, ids: list[str] | None = None) -> list[tuple[Key, str]]:
+    def query():
+        q = supabase.table("meeting_embeddings").select("source_table, source_id, content_text")
+        return q if source_table is None else q.eq("source_table", source_table).in_("source_id", ids)
+
+    rows = _pages(query, order=["source_table", "source_id"])
+    return [((row["source_table"], str(row["source_id"])), row["content_text"] or "") for row in rows]
+
+
+def _legislative_documents(ids: list[str] | None = None) -> list[tuple[Key, str]]:
+    def query():
+        q = supabase.table("legislative_files").select("id, embedding_input")
+        return q if ids is None else q.in_("id", ids)
+
+    rows = _pages(query, order=["id"])
+    return [(("legislative_files", str(row["id"])), row["embedding_input"] or "") for row in rows]
+
+
+_indexes: dict[str, BM25Index] = {}
+_started = False
+_start_lock = threading.Lock()
+
+
+def get_lexical_index(corpus: str) -> BM25Index | None:
+    """The loaded index of "meetings" or "legislative_files", None if disabled or not loaded yet."""
+    return _indexes.get(corpus)
+
+
+def build_indexes() -> dict[str, BM25Index]:
+    started = time.monotonic()
+    indexes = {"meetings": BM25Index(), "legislative_files": BM25Index()}
+    for key, text in _meeting_documents():
+        indexes["meetings"].upsert(key, text)
+    for key, text in _legislative_documents():
+        indexes["legislative_files"].upsert(key, text)
+    logger.info(
+        f"Loaded lexical indexes of {len(indexes['meetings'])} meetings and "
+        f"{len(indexes['legislative_files'])} legislative files in {time.monotonic() - started:.1f}s"
+    )
+    return indexes
+
+
+def _refresh(index: BM25Index, source_table: str, ids: list[str], documents: list[tuple[Key, str]]):
+    found = set()
+    for key, text in documents:
+        index.upsert(key, text)
+        found.add(key)
+    for row_id in ids:
+        if (source_table, str(row_id)) not in found:
+            index.remove((source_table, str(row_id)))
+
+
+def refresh_documents(event: ChangeEvent) -> None:
+    if event.table == "legislative_files":
+        index = _indexes.get("legislative_files")
+        if index is not None:
+            _refresh(index, event.table, event.ids, _legislative_documents(event.ids))
+        return
+    # topic assignments don't change the text of a meeting
+    if event.table not in MEETING_TABLES and event.table != "meeting_embeddings":
+        return
+    index = _indexes.get("meetings")
+    if index is None:
+        return
+    for source_table, source_ids in changed_meetings(event).items():
+        _refresh(index, source_table, source_ids, _meeting_documents(source_table, source_ids))
+
+
+def _run():
+    global _indexes
+    while True:
+        try:
+            _indexes = build_indexes()
+        except Exception as e:
+            logger.error(f"Failed to load the lexical indexes, searches are vector only: {e}")
+        time.sleep(RELOAD_SECONDS)
+
+
+def start_lexical_indexes() -> None:
+    """Loads the indexes in the background and keeps them current, called on API startup if LEXICAL_INDEX_ENABLED."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    bus = get_bus()
+    bus.subscribe(refresh_documents)
+    bus.start()
+    threading.Thread(target=_run, daemon=True, name="LexicalIndexes").start()
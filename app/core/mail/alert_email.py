@@ -6,7 +6,8 @@ from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from app.core.email import Email, EmailService
 from app.core.mail.newsletter import get_user_email, get_user_name, _load_base64_text_file
-from app.core.openai_client import openai
+from app.core.openai_client import create_chat_completion
+from app.core.rate_limits import Priority
 from app.core.supabase_client import supabase
 from app.core.alerts import mark_alert_ran, set_alert_active
 
@@ -36,7 +37,9 @@ def _generate_subject(alert: dict, meetings: list[dict]) -> str:
     prompt = _SUBJECT_PROMPT_TMPL.format(alert=alert["description"], titles=meeting_titles)
 
     try:
-        resp = openai.chat.completions.create(
+        resp = create_chat_completion(
+            caller="alert_email",
+            priority=Priority.BATCH,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
         )
@@ -6,6 +6,7 @@ from typing import Optional
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from app.core.email import Email, EmailService
+from app.core.rate_limits import Priority
 from app.core.relevant_meetings import RelevantMeetingsResponse, fetch_relevant_meetings
 from app.core.supabase_client import supabase
 
@@ -125,7 +126,7 @@ class Newsletter:
     @staticmethod
     def send_newsletter_to_user(user_id, frequency: str):
         user_mail = get_user_email(user_id=user_id)
-        meetings_response = fetch_relevant_meetings(user_id=user_id, k=10)
+        meetings_response = fetch_relevant_meetings(user_id=user_id, k=10, priority=Priority.BATCH)
 
         if len(meetings_response.meetings) == 0:
             logger.info(f"No relevant meetings found for user_id={user_id}. No newsletter sent.")
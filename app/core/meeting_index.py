@@ -0,0 +1,339 @@
+"""In-process replica of ``meeting_embeddings`` for the meeting vector searches.
+
+``match_filtered_meetings`` is called with k=1000 to 3000 on every semantic request and ships the content texts of
+all matches back, which makes the database round trip the largest part of a search. With ``MEETING_INDEX_ENABLED``
+the API keeps the embeddings in memory instead and searches them brute force with NumPy, which takes a few
+milliseconds at our size (tens of thousands of meetings). ``MEETING_INDEX_QUANTIZATION`` selects how they are stored:
+exact float32 (~6 KB each) or int8/binary codes with float16 rescoring, see ``app/core/quantization.py``.
+
+- The filters of ``match_filtered_meetings`` (source tables, content columns, topics, countries, date range) are
+  evaluated on precomputed attribute bitmaps and day arrays, with the same semantics as the SQL.
+- The index is loaded on startup and reloaded every ``RELOAD_SECONDS``; in between, change events of the meeting
+  tables, meeting embeddings and topic assignments refresh the changed meetings.
+- ``get_meeting_index`` returns None until the index is loaded, ``get_top_k_neighbors`` then uses the RPC.
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from app.core.change_events import ChangeEvent, changed_meetings, get_bus
+from app.core.config import Settings
+from app.core.openai_client import EMBED_DIM
+from app.core.quantization import make_vector_store, parse_vector
+from app.core.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+RELOAD_SECONDS = 6 * 3600
+INITIAL_CAPACITY = 1024
+
+
+def _day(value: str | None) -> np.datetime64:
+    if not value:
+        return np.datetime64("NaT", "D")
+    return np.datetime64(datetime.fromisoformat(value).date(), "D")
+
+
+def _pages(query_factory) -> list[dict]:
+    rows: list[dict] = []
+    while True:
+        page = query_factory().range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+class Bitmaps:
+    """One boolean row mask per attribute value, e.g. per source table."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._masks: dict[str, np.ndarray] = {}
+
+    def grow(self, capacity: int):
+        for value, mask in self._masks.items():
+            grown = np.zeros(capacity, dtype=bool)
+            grown[: self.capacity] = mask
+            self._masks[value] = grown
+        self.capacity = capacity
+
+    def set(self, value: str, row: int):
+        if value not in self._masks:
+            self._masks[value] = np.zeros(self.capacity, dtype=bool)
+        self._masks[value][row] = True
+
+    def clear_row(self, row: int):
+        for mask in self._masks.values():
+            mask[row] = False
+
+    def any_of(self, values: list[str], size: int) -> np.ndarray:
+        result = np.zeros(size, dtype=bool)
+        for value in values:
+            mask = self._masks.get(value)
+            if mask is not None:
+                result |= mask[:size]
+        return result
+
+
+class MeetingIndex:
+    def __init__(self, dim: int = EMBED_DIM, capacity: int = INITIAL_CAPACITY, quantization: str = "float32"):
+        self.dim = dim
+        self.capacity = capacity
+        self.size = 0
+        self.vectors = make_vector_store(quantization, dim, capacity)
+        self.valid = np.zeros(capacity, dtype=bool)
+        self.first_days = np.full(capacity, np.datetime64("NaT", "D"))  # meeting_start_datetime
+        self.last_days = np.full(capacity, np.datetime64("NaT", "D"))  # meeting_end_datetime, else start
+        self.keys: list[tuple[str, str]] = []
+        self.content_texts: list[str] = []
+        self.positions: dict[tuple[str, str], int] = {}
+        self.tables = Bitmaps(capacity)
+        self.columns = Bitmaps(capacity)
+        self.locations = Bitmaps(capacity)  # lower-cased v_meetings.location
+        self.topic_ids = Bitmaps(capacity)
+        self.topic_names: dict[str, list[str]] = {}  # topic name -> topic ids
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return int(self.valid[: self.size].sum())
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        self.vectors.grow(capacity)
+        for name in ("valid", "first_days", "last_days"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=bool) if old.dtype == bool else np.full(capacity, np.datetime64("NaT", "D"))
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+        for bitmaps in (self.tables, self.columns, self.locations, self.topic_ids):
+            bitmaps.grow(capacity)
+        self.capacity = capacity
+
+    def upsert(self, embedding_row: dict, meeting: dict | None, topic_ids: list[str]):
+        """
+        Adds or replaces a meeting.
+        :param embedding_row: Its meeting_embeddings row.
+        :param meeting: Its v_meetings row (location and dates), None if it has none.
+        :param topic_ids: Ids of its meeting_topic_assignments.
+        """
+        key = (embedding_row["source_table"], embedding_row["source_id"])
+        with self._lock:
+            row = self.positions.get(key)
+            if row is None:
+                if self.size == self.capacity:
+                    self._grow()
+                row = self.size
+                self.size += 1
+                self.positions[key] = row
+                self.keys.append(key)
+                self.content_texts.append("")
+            else:
+                for bitmaps in (self.tables, self.columns, self.locations, self.topic_ids):
+                    bitmaps.clear_row(row)
+
+            self.vectors.set(row, parse_vector(embedding_row["embedding"]))
+            self.content_texts[row] = embedding_row["content_text"]
+            self.tables.set(key[0], row)
+            self.columns.set(embedding_row["content_column"], row)
+            for topic_id in topic_ids:
+                self.topic_ids.set(str(topic_id), row)
+            meeting = meeting or {}
+            if meeting.get("location"):
+                self.locations.set(meeting["location"].lower(), row)
+            self.first_days[row] = _day(meeting.get("meeting_start_datetime"))
+            self.last_days[row] = _day(meeting.get("meeting_end_datetime") or meeting.get("meeting_start_datetime"))
+            self.valid[row] = True
+
+    def remove(self, source_table: str, source_id: str):
+        with self._lock:
+            row = self.positions.get((source_table, source_id))
+            if row is not None:
+                self.valid[row] = False
+
+    def set_topics(self, topics: list[dict]):
+        """:param topics: meeting_topics rows (id, topic)."""
+        names: dict[str, list[str]] = {}
+        for topic in topics:
+            names.setdefault(topic["topic"], []).append(str(topic["id"]))
+        with self._lock:
+            self.topic_names = names
+
+    def _mask(
+        self,
+        src_tables: list[str] | None,
+        content_columns: list[str] | None,
+        allowed_topics: list[str] | None,
+        allowed_topic_ids: list[str] | None,
+        allowed_countries: list[str] | None,
+        start_date: datetime | None,
+        end_date: datetime | None,
+    ) -> np.ndarray:
+        size = self.size
+        mask = self.valid[:size].copy()
+        if src_tables:
+            mask &= self.tables.any_of(src_tables, size)
+        if content_columns:
+            mask &= self.columns.any_of(content_columns, size)
+        if allowed_topic_ids:
+            mask &= self.topic_ids.any_of([str(t) for t in allowed_topic_ids], size)
+        if allowed_topics:
+            ids = [topic_id for name in allowed_topics for topic_id in self.topic_names.get(name, [])]
+            mask &= self.topic_ids.any_of(ids, size)
+        if allowed_countries:
+            mask &= self.locations.any_of([c.lower() for c in allowed_countries], size)
+        # comparisons with NaT are False, like the SQL comparisons with NULL for meetings missing in v_meetings
+        if end_date is not None:
+            mask &= self.first_days[:size] <= np.datetime64(_as_date(end_date), "D")
+        if start_date is not None:
+            mask &= self.last_days[:size] >= np.datetime64(_as_date(start_date), "D")
+        return mask
+
+    def filter_keys(
+        self,
+        keys: list[tuple[str, str]],
+        allowed_topics: list[str] | None = None,
+        allowed_topic_ids: list[str] | None = None,
+        allowed_countries: list[str] | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[tuple[str, str]]:
+        """The keys of meetings in the index that pass the filters, e.g. of lexical matches."""
+        with self._lock:
+            mask = self._mask(None, None, allowed_topics, allowed_topic_ids, allowed_countries, start_date, end_date)
+            return [key for key in keys if (row := self.positions.get(key)) is not None and mask[row]]
+
+    def search(
+        self,
+        embedding: list[float],
+        k: int,
+        src_tables: list[str] | None = None,
+        content_columns: list[str] | None = None,
+        allowed_topics: list[str] | None = None,
+        allowed_topic_ids: list[str] | None = None,
+        allowed_countries: list[str] | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> list[dict]:
+        """The k nearest meetings passing the filters, shaped like the rows of match_filtered_meetings."""
+        query = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            mask = self._mask(
+                src_tables, content_columns, allowed_topics, allowed_topic_ids, allowed_countries, start_date, end_date
+            )
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+            # the RPC orders by negative inner product, its similarity is (1 + dot) / 2
+            rows, scores = self.vectors.search(query, candidates, k)
+            return [
+                {
+                    "source_table": self.keys[row][0],
+                    "source_id": self.keys[row][1],
+                    "content_text": self.content_texts[row],
+                    "similarity": float((1 + score) / 2),
+                }
+                for row, score in zip(rows, scores, strict=True)
+            ]
+
+
+def _as_date(value: datetime | date | str) -> date:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+
+def meeting_rows(source_table: str | None = None, source_ids: list[str] | None = None):
+    """meeting_embeddings, v_meetings and topic assignment rows of all meetings, or of source_ids of source_table."""
+
+    def select(table: str, columns: str):
+        def query():
+            q = supabase.table(table).select(columns)
+            if source_table is not None:
+                q = q.eq("source_table", source_table).in_("source_id", source_ids)
+            return q.order("source_table").order("source_id")
+
+        return query
+
+    embeddings = _pages(
+        select("meeting_embeddings", "source_table, source_id, content_column, content_text, embedding")
+    )
+    meetings = _pages(
+        select("v_meetings", "source_table, source_id, location, meeting_start_datetime, meeting_end_datetime")
+    )
+    assignments = _pages(select("meeting_topic_assignments", "source_table, source_id, topic_id"))
+
+    meetings_by_key = {(m["source_table"], m["source_id"]): m for m in meetings}
+    topics_by_key: dict[tuple[str, str], list[str]] = {}
+    for assignment in assignments:
+        topics_by_key.setdefault((assignment["source_table"], assignment["source_id"]), []).append(
+            assignment["topic_id"]
+        )
+    for row in embeddings:
+        key = (row["source_table"], row["source_id"])
+        yield row, meetings_by_key.get(key), topics_by_key.get(key, [])
+
+
+def build_index(quantization: str = "float32") -> MeetingIndex:
+    started = time.monotonic()
+    index = MeetingIndex(quantization=quantization)
+    index.set_topics(supabase.table("meeting_topics").select("id, topic").execute().data or [])
+    for row, meeting, topic_ids in meeting_rows():
+        index.upsert(row, meeting, topic_ids)
+    logger.info(
+        f"Loaded {len(index)} meeting embeddings into the meeting index in {time.monotonic() - started:.1f}s "
+        f"({index.vectors.nbytes / 2**20:.0f} MB as {quantization})"
+    )
+    return index
+
+
+_index: MeetingIndex | None = None
+_started = False
+_start_lock = threading.Lock()
+
+
+def get_meeting_index() -> MeetingIndex | None:
+    """The loaded index, None if it is disabled or not loaded yet."""
+    return _index
+
+
+def refresh_meetings(event: ChangeEvent) -> None:
+    index = _index
+    if index is None:
+        return
+    for source_table, source_ids in changed_meetings(event).items():
+        found = set()
+        for row, meeting, topic_ids in meeting_rows(source_table, source_ids):
+            index.upsert(row, meeting, topic_ids)
+            found.add(row["source_id"])
+        # meetings without embedding are not searchable
+        for source_id in set(source_ids) - found:
+            index.remove(source_table, source_id)
+        logger.info(f"Refreshed {len(found)} meetings of {source_table} in the in-process index ({event.table})")
+
+
+def _run():
+    global _index
+    while True:
+        try:
+            _index = build_index(Settings().get_meeting_index_quantization())
+        except Exception as e:
+            logger.error(f"Failed to load the meeting index, searches use the database: {e}")
+        time.sleep(RELOAD_SECONDS)
+
+
+def start_meeting_index() -> None:
+    """Loads the index in the background and keeps it current, called on API startup if MEETING_INDEX_ENABLED."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+    bus = get_bus()
+    bus.subscribe(refresh_meetings)
+    bus.start()
+    threading.Thread(target=_run, daemon=True, name="MeetingIndex").start()
@@ -0,0 +1,90 @@
+import re
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp
+
+from app.core.auth import User, decode_supabase_jwt
+
+
+class JWTMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp):
+        super().__init__(app)
+        self.public_paths = [
+            r"^/$",
+            r"^/docs$",
+            r"^/redoc$",
+            r"^/openapi.json$",
+            r"^/topics",
+            r"^/countries",
+        ]
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS":
+            return await call_next(request)
+
+        for pattern in self.public_paths:
+            if re.match(pattern, request.url.path):
+                response = await call_next(request)
+                return response
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": "Authentication required. Missing Authorization header."},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        try:
+            scheme, token = auth_header.split()
+            if scheme.lower() != "bearer":
+                raise ValueError("Invalid authentication scheme. Must be Bearer.")
+
+            payload = decode_supabase_jwt(token)
+            # Store the decoded user information in request.state
+            # This makes the user object available to any endpoint via `request.state.user`
+            # or through the `get_current_user` dependency.
+            request.state.user = User(id=payload.get("sub"), email=payload.get("email"))
+
+        except (ValueError, HTTPException) as e:
+            detail = getattr(e, "detail", str(e))
+
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"detail": f"Invalid authentication token: {detail}"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        except Exception as e:
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"detail": f"An unexpected error occurred during authentication: {e}"},
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        response = await call_next(request)
+        return response
+
+
+class CustomCORSMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        origin = request.headers.get("origin")
+        is_allowed_origin = origin and (
+            origin.startswith("http://localhost")
+            or origin.endswith("netlify.app")
+            or origin.endswith("openeu.csee.tech")
+        )
+
+        if request.method == "OPTIONS" and is_allowed_origin:
+            response = PlainTextResponse("Preflight OK", status_code=200)
+        else:
+            response = await call_next(request)
+
+        if is_allowed_origin:
+            response.headers["Access-Control-Allow-Origin"] = origin
+            response.headers["Access-Control-Allow-Credentials"] = "true"
+            response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PATCH"
+            response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+
+        return response
@@ -0,0 +1,253 @@
+"""Shared model-serving process for scheduled jobs.
+
+Jobs registered with ``run_in_process=True`` start a fresh interpreter, so every scraper used to load the
+SentenceTransformer behind ``TopicExtractor`` and run the ``get_meeting_tables`` RPC of ``EmbeddingGenerator``
+again. The scheduler instead starts one long-lived ``ModelServer`` process that owns the models. Workers reach
+it over a local unix socket (``multiprocessing.managers``), concurrent requests are coalesced into
+micro-batches, and vectors are returned as contiguous ``float32`` arrays instead of nested Python lists.
+
+If the server is disabled or unreachable, callers fall back to loading the models in their own process.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from multiprocessing.managers import BaseManager
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_ENV = "MODEL_SERVER_ADDRESS"
+AUTHKEY_ENV = "MODEL_SERVER_AUTHKEY"
+
+MAX_BATCH_SIZE = 256  # max. number of texts encoded in one micro-batch
+MAX_WAIT_MS = 20  # how long the batcher waits for more requests before flushing
+STARTUP_TIMEOUT_SECONDS = 30
+
+OPENAI_MODEL_KEY = "openai"
+
+
+@dataclass
+class _Request:
+    key: tuple
+    texts: list[str]
+    done: threading.Event = field(default_factory=threading.Event)
+    result: np.ndarray | None = None
+    error: Exception | None = None
+
+
+class MicroBatcher:
+    """
+    Collects concurrent encode requests and runs them as one batch per model.
+
+    :param handler: Called with a request key and the concatenated texts of all requests sharing that key.
+        Must return one row per text.
+    :param max_batch_size: Upper bound of texts per batch; a batch is flushed as soon as it is reached.
+    :param max_wait_ms: Upper bound of time the first request of a batch waits for others to join.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[tuple, list[str]], np.ndarray],
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_wait_ms: int = MAX_WAIT_MS,
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue[_Request] = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="MicroBatcher")
+        self._thread.start()
+
+    def submit(self, key: tuple, texts: list[str]) -> np.ndarray:
+        request = _Request(key=key, texts=list(texts))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        assert request.result is not None
+        return request.result
+
+    def _collect(self) -> list[_Request]:
+        pending = [self._queue.get()]
+        size = len(pending[0].texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            pending.append(request)
+            size += len(request.texts)
+        return pending
+
+    def _loop(self):
+        while True:
+            grouped: dict[tuple, list[_Request]] = {}
+            for request in self._collect():
+                grouped.setdefault(request.key, []).append(request)
+
+            for key, requests in grouped.items():
+                texts = [text for request in requests for text in request.texts]
+                try:
+                    vectors = self.handler(key, texts)
+                    offset = 0
+                    for request in requests:
+                        request.result = vectors[offset : offset + len(request.texts)]
+                        offset += len(request.texts)
+                except Exception as e:
+                    logger.error(f"Micro-batch for {key} with {len(texts)} text(s) failed: {e}")
+                    for request in requests:
+                        request.error = e
+                finally:
+                    for request in requests:
+                        request.done.set()
+
+
+class ModelServer:
+    """
+    Owns the models that would otherwise be loaded by every job process.
+    Public methods are exposed to clients through the manager proxy.
+    """
+
+    def __init__(self):
+        self._sentence_models: dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        self._meeting_sources: list[str] | None = None
+        self._batcher = MicroBatcher(self._handle_batch)
+
+    def _sentence_model(self, model_name: str):
+        with self._models_lock:
+            if model_name not in self._sentence_models:
+                from sentence_transformers import SentenceTransformer
+
+                logger.info(f"Loading sentence model '{model_name}'")
+                self._sentence_models[model_name] = SentenceTransformer(model_name)
+            return self._sentence_models[model_name]
+
+    def _handle_batch(self, key: tuple, texts: list[str]) -> np.ndarray:
+        if key[0] == OPENAI_MODEL_KEY:
+            from app.core.openai_client import BATCH_SZ, create_embeddings
+            from app.core.rate_limits import Priority
+
+            vectors: list[list[float]] = []
+            for i in range(0, len(texts), BATCH_SZ):
+                vectors.extend(
+                    create_embeddings(texts[i : i + BATCH_SZ], caller="model_server", priority=Priority.BATCH)
+                )
+            return np.asarray(vectors, dtype=np.float32)
+
+        _, model_name, normalize = key
+        model = self._sentence_model(model_name)
+        return np.asarray(model.encode(texts, normalize_embeddings=normalize), dtype=np.float32)
+
+    def ping(self) -> bool:
+        return True
+
+    def encode(self, model_name: str, texts: list[str], normalize: bool = True) -> np.ndarray:
+        """Encode texts with a local SentenceTransformer model."""
+        return self._batcher.submit(("sentence", model_name, normalize), texts)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Embed texts with the OpenAI embedding model; requests of concurrent jobs share API calls."""
+        return self._batcher.submit((OPENAI_MODEL_KEY,), texts)
+
+    def get_meeting_sources(self) -> list[str]:
+        """Cached result of the ``get_meeting_tables`` RPC."""
+        if self._meeting_sources is None:
+            from app.core.supabase_client import supabase
+
+            response = supabase.rpc("get_meeting_tables").execute().data
+            self._meeting_sources = [row["source_table"] for row in response]
+        return self._meeting_sources
+
+
+class _ModelServerManager(BaseManager):
+    pass
+
+
+_ModelServerManager.register("model_server")
+
+
+def _serve(address: str, authkey: bytes) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    server = ModelServer()
+    _ModelServerManager.register("model_server", callable=lambda: server)
+    manager = _ModelServerManager(address=address, authkey=authkey)
+    logger.info(f"Model server listening on {address}")
+    manager.get_server().serve_forever()
+
+
+def start_model_server() -> multiprocessing.process.BaseProcess | None:
+    """
+    Start the model server in a fresh interpreter and publish its address through the environment,
+    so that job processes started afterwards connect to it automatically.
+    Returns None if a server is already known to this process or it could not be started.
+    """
+    if os.getenv(ADDRESS_ENV):
+        return None
+
+    address = os.path.join(tempfile.gettempdir(), f"openeu-model-server-{os.getpid()}.sock")
+    if os.path.exists(address):
+        os.remove(address)
+    authkey = secrets.token_bytes(16)
+
+    # spawn instead of fork: the server should not inherit the scraper stack of the parent
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(address, authkey), daemon=True, name="ModelServer"
+    )
+    process.start()
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while not os.path.exists(address):
+        if not process.is_alive() or time.monotonic() > deadline:
+            logger.error("Model server did not come up, jobs will load models locally")
+            process.kill()
+            return None
+        time.sleep(0.1)
+
+    os.environ[ADDRESS_ENV] = address
+    os.environ[AUTHKEY_ENV] = authkey.hex()
+    logger.info(f"Started model server (pid={process.pid}) on {address}")
+    return process
+
+
+_client: Any = None
+_client_lock = threading.Lock()
+
+
+def get_model_client() -> Any:
+    """
+    Return a proxy to the shared model server, or None if no server is configured or reachable.
+    The proxy is thread-safe; each thread gets its own connection.
+    """
+    global _client
+
+    address = os.getenv(ADDRESS_ENV)
+    if not address:
+        return None
+
+    with _client_lock:
+        if _client is None:
+            try:
+                manager = _ModelServerManager(address=address, authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+                manager.connect()
+                client = manager.model_server()  # type: ignore[attr-defined]
+                client.ping()
+                _client = client
+            except Exception as e:
+                logger.warning(f"Model server at {address} is not reachable, loading models locally: {e}")
+                return None
+    return _client
@@ -1,11 +1,52 @@
+from typing import Any
+
 from openai import OpenAI
 
 from app.core.config import Settings
+from app.core.rate_limits import Priority, estimate_tokens, limited_call
 
 EMBED_MODEL = "text-embedding-ada-002"
 EMBED_DIM = 1536
 MAX_TOKENS = 1000
 BATCH_SZ = 100
+# limits of the embeddings endpoint, requests are packed by token count up to these
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
 
 settings = Settings()
 openai = OpenAI(api_key=settings.get_openai_api_key())
+
+
+def create_embeddings(
+    texts: list[str], caller: str, priority: Priority = Priority.INTERACTIVE
+) -> list[list[float]]:
+    """Embed texts with EMBED_MODEL within the shared rate limits."""
+
+    def call():
+        raw = openai.embeddings.with_raw_response.create(model=EMBED_MODEL, input=texts)
+        return [d.embedding for d in raw.parse().data], raw.headers
+
+    return limited_call(call, model=EMBED_MODEL, caller=caller, priority=priority, tokens=estimate_tokens(texts))
+
+
+def create_chat_completion(caller: str, priority: Priority = Priority.INTERACTIVE, **kwargs: Any) -> Any:
+    """openai.chat.completions.create within the shared rate limits; kwargs are passed through."""
+    prompt_texts = [str(m.get("content") or "") for m in kwargs.get("messages", [])]
+    tokens = estimate_tokens(prompt_texts) + (kwargs.get("max_tokens") or 512)
+
+    def call():
+        raw = openai.chat.completions.with_raw_response.create(**kwargs)
+        return raw.parse(), raw.headers
+
+    return limited_call(call, model=kwargs["model"], caller=caller, priority=priority, tokens=tokens)
+
+
+def create_response(caller: str, priority: Priority = Priority.INTERACTIVE, **kwargs: Any) -> Any:
+    """openai.responses.create within the shared rate limits; kwargs are passed through."""
+    tokens = estimate_tokens([str(kwargs.get("input", ""))]) + 512
+
+    def call():
+        raw = openai.responses.with_raw_response.create(**kwargs)
+        return raw.parse(), raw.headers
+
+    return limited_call(call, model=kwargs["model"], caller=caller, priority=priority, tokens=tokens)
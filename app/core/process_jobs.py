@@ -0,0 +1,86 @@
+"""Jobs registered with ``run_in_process=True``.
+
+The worker pool resolves a job by its module path, so a worker imports this module instead of ``app.core.jobs``
+with all scrapers. Each job imports its scraper on first use: a worker only loads the stack of the job it runs,
+and Scrapy installs its reactor in the worker of the Scrapy job, not in the forkserver.
+"""
+
+import multiprocessing
+import multiprocessing.synchronize
+from datetime import datetime, timedelta
+
+from app.data_sources.scraper_base import ScraperResult
+
+LOOKAHEAD_DAYS = 7  # Number of days in future to scrape data for
+
+
+def scrape_netherlands_twka_meetings(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.nl_twka_meetings_scraper import NetherlandsTwkaMeetingsScraper
+
+    today = datetime.now().date()
+    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
+    scraper = NetherlandsTwkaMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_mep_meetings(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.mep_meetings_scraper import MEPMeetingsScraper
+
+    today = datetime.now().date()
+    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
+    scraper = MEPMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_weekly_agenda(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.weekly_agenda_scraper import WeeklyAgendaScraper
+
+    today = datetime.now().date()
+    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
+    scraper = WeeklyAgendaScraper(start_date=today, end_date=end_date, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_polish_presidency_meetings(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.polish_presidency_meetings_scraper import PolishPresidencyMeetingsScraper
+
+    today = datetime.now().date()
+    end_date = today + timedelta(days=LOOKAHEAD_DAYS)
+    scraper = PolishPresidencyMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_ec_res_inno_meetings(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.ec_res_inno_meetings_scraper import EcResInnoMeetingsScraper
+
+    today = datetime.now().date()
+    end_date = today + timedelta(days=365)
+    scraper = EcResInnoMeetingsScraper(start_date=today, end_date=end_date, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_spanish_commission_meetings(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.spanish_commission_scraper import SpanishCommissionScraper
+
+    today = datetime.now().date()
+    scraper = SpanishCommissionScraper(date=today, stop_event=stop_event)
+    return scraper.scrape()
+
+
+def scrape_legislative_observatory(stop_event: multiprocessing.synchronize.Event):
+    from app.data_sources.scrapers.legislative_observatory_scraper import LegislativeObservatoryScraper
+
+    scraper = LegislativeObservatoryScraper(stop_event=stop_event)
+    return scraper.scrape()
+
+
+def clean_up_meetings(stop_event: multiprocessing.synchronize.Event):
+    from scripts.meeting_cleanup import embedd_missing_entries
+
+    return embedd_missing_entries(stop_event=stop_event)
+
+
+def update_user_recommendations(stop_event: multiprocessing.synchronize.Event):
+    from app.core.recommendations import update_recommendations
+
+    return ScraperResult(success=not stop_event.is_set(), lines_added=update_recommendations(stop_event))
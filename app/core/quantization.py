@@ -0,0 +1,205 @@
+"""Compact storage of embeddings for in-process vector search, with two-stage search.
+
+A 1536-d ada-002 embedding takes 6 KB as float32. The quantized stores keep
+
+- ``int8``: one signed byte per dimension and a scale per vector (1.5 KB), or
+- ``binary``: one sign bit per dimension (192 bytes),
+
+plus a float16 copy (3 KB) that is only read for rescoring. A search scores the candidates coarsely on the codes,
+keeps the best ``k * OVERSAMPLE`` (``BINARY_OVERSAMPLE``) and rescores those exactly on the float16 vectors.
+``float32`` is the exact store the quantized ones are measured against, see ``scripts/quantization_report.py``.
+
+In total a vector takes 4.5 KB with int8 and 3.2 KB with binary codes, against 6 KB as float32.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+QUANTIZATION_MODES = ("float32", "int8", "binary")
+OVERSAMPLE = 4  # candidates rescored per requested neighbor
+BINARY_OVERSAMPLE = 10  # sign bits rank coarser than int8 codes
+CHUNK_ROWS = 8192  # rows scored at once, bounds the float32 temporaries of the coarse pass
+
+
+def parse_vector(value: Any) -> np.ndarray:
+    # PostgREST returns pgvector columns as text, e.g. "[0.1,0.2]"
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector scalar quantization, returns the codes and the scale of each vector."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """Sign bits of the vectors, packed eight dimensions per byte."""
+    return np.packbits(np.atleast_2d(np.asarray(vectors)) > 0, axis=1)
+
+
+_POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _popcount_table(values: np.ndarray) -> np.ndarray:
+    """Set bits per byte by table lookup, for numpy < 2.0 which has no bitwise_count."""
+    return _POPCOUNT_TABLE[values]
+
+
+_popcount: Callable[[np.ndarray], np.ndarray] = getattr(np, "bitwise_count", _popcount_table)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    top = np.argpartition(-scores, k - 1)[:k] if scores.size > k else np.arange(scores.size)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorStore(ABC):
+    """Growable matrix of vectors addressed by row, searched by inner product."""
+
+    def __init__(self, dim: int, capacity: int):
+        self.dim = dim
+        self.capacity = capacity
+
+    @abstractmethod
+    def set(self, row: int, vector: np.ndarray) -> None: ...
+
+    @abstractmethod
+    def grow(self, capacity: int) -> None: ...
+
+    @abstractmethod
+    def search(self, query: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """The k rows out of rows with the highest inner product with query, best first, and their products."""
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int: ...
+
+    @staticmethod
+    def _grown(array: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+        grown[: len(array)] = array
+        return grown
+
+
+class FloatVectors(VectorStore):
+    """Exact float32 vectors."""
+
+    def __init__(self, dim: int, capacity: int):
+        super().__init__(dim, capacity)
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+
+    def set(self, row: int, vector: np.ndarray) -> None:
+        self.vectors[row] = vector
+
+    def grow(self, capacity: int) -> None:
+        self.vectors = self._grown(self.vectors, capacity)
+        self.capacity = capacity
+
+    def search(self, query: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        if rows.size == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        # rows are ascending: one product over the leading block instead of copying the rows out
+        scores = (self.vectors[: rows[-1] + 1] @ query)[rows]
+        top = _top(scores, k)
+        return rows[top], scores[top]
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes
+
+
+class QuantizedVectors(VectorStore):
+    """Quantized codes for the coarse pass and float16 vectors for rescoring its best candidates."""
+
+    def __init__(self, dim: int, capacity: int, oversample: int = OVERSAMPLE):
+        super().__init__(dim, capacity)
+        self.oversample = oversample
+        self.rescoring = np.zeros((capacity, dim), dtype=np.float16)
+
+    def set(self, row: int, vector: np.ndarray) -> None:
+        self.rescoring[row] = vector
+
+    def grow(self, capacity: int) -> None:
+        self.rescoring = self._grown(self.rescoring, capacity)
+        self.capacity = capacity
+
+    @abstractmethod
+    def coarse_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray: ...
+
+    def search(self, query: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        coarse = np.concatenate(
+            [self.coarse_scores(query, rows[i : i + CHUNK_ROWS]) for i in range(0, len(rows), CHUNK_ROWS)]
+            or [np.zeros(0, dtype=np.float32)]
+        )
+        shortlist = rows[_top(coarse, k * self.oversample)]
+        scores = self.rescoring[shortlist].astype(np.float32) @ query
+        top = _top(scores, k)
+        return shortlist[top], scores[top]
+
+
+class Int8Vectors(QuantizedVectors):
+    def __init__(self, dim: int, capacity: int, oversample: int = OVERSAMPLE):
+        super().__init__(dim, capacity, oversample)
+        self.codes = np.zeros((capacity, dim), dtype=np.int8)
+        self.scales = np.zeros(capacity, dtype=np.float32)
+
+    def set(self, row: int, vector: np.ndarray) -> None:
+        super().set(row, vector)
+        codes, scales = quantize_int8(vector)
+        self.codes[row] = codes[0]
+        self.scales[row] = scales[0]
+
+    def grow(self, capacity: int) -> None:
+        super().grow(capacity)
+        self.codes = self._grown(self.codes, capacity)
+        self.scales = self._grown(self.scales, capacity)
+
+    def coarse_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return (self.codes[rows].astype(np.float32) @ query) * self.scales[rows]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.rescoring.nbytes
+
+
+class BinaryVectors(QuantizedVectors):
+    def __init__(self, dim: int, capacity: int, oversample: int = BINARY_OVERSAMPLE):
+        super().__init__(dim, capacity, oversample)
+        self.codes = np.zeros((capacity, (dim + 7) // 8), dtype=np.uint8)
+
+    def set(self, row: int, vector: np.ndarray) -> None:
+        super().set(row, vector)
+        self.codes[row] = quantize_binary(vector)[0]
+
+    def grow(self, capacity: int) -> None:
+        super().grow(capacity)
+        self.codes = self._grown(self.codes, capacity)
+
+    def coarse_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        # fewer differing sign bits (Hamming distance) means a higher score
+        differing = _popcount(self.codes[rows] ^ quantize_binary(query)[0]).sum(axis=1, dtype=np.int32)
+        return -differing.astype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.rescoring.nbytes
+
+
+def make_vector_store(mode: str, dim: int, capacity: int) -> VectorStore:
+    if mode == "float32":
+        return FloatVectors(dim, capacity)
+    if mode == "int8":
+        return Int8Vectors(dim, capacity)
+    if mode == "binary":
+        return BinaryVectors(dim, capacity)
+    raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
@@ -0,0 +1,463 @@
+"""Shared concurrency and rate-limit control for OpenAI and Cohere calls.
+
+All outbound model calls go through ``limited_call``. Per model there is a request bucket, a token bucket
+and an AIMD concurrency limit: the limit grows by one slot per window of successful calls and is halved on
+every 429. Rate-limit headers returned by OpenAI re-sync the buckets with the provider's view. Waiting calls
+are served in priority order, so interactive requests overtake batch jobs of the same process, and batch
+callers can only use part of the concurrency limit.
+
+The API, worker.py and the job worker processes each have their own limiters. With ``REDIS_URL`` set, the request
+and token buckets and the concurrency slots are additionally kept in Redis (``SharedLimits``), so their combined
+rate stays within the provider's limits and batch callers of any process leave ``1 - BATCH_SHARE`` of the buckets
+and slots to interactive ones. The wait queue, the AIMD limit and the metrics stay per process; without Redis
+everything is per process.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, TypeVar
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # a user is waiting for the response
+    BATCH = 1  # scheduled jobs, scrapers, newsletters
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    requests_per_minute: int
+    tokens_per_minute: int | None
+    max_concurrency: int
+
+
+MODEL_LIMITS: dict[str, ModelLimits] = {
+    "text-embedding-ada-002": ModelLimits(3_000, 1_000_000, 16),
+    "gpt-4o-mini": ModelLimits(5_000, 2_000_000, 16),
+    "gpt-4o-mini-2024-07-18": ModelLimits(5_000, 2_000_000, 16),
+    "gpt-4o": ModelLimits(5_000, 800_000, 8),
+    "gpt-4o-2024-08-06": ModelLimits(5_000, 800_000, 8),
+    "gpt-4.1-mini": ModelLimits(5_000, 2_000_000, 16),
+    "rerank-v3.5": ModelLimits(1_000, None, 8),
+}
+DEFAULT_LIMITS = ModelLimits(500, 200_000, 4)
+
+BATCH_SHARE = 0.75  # share of the concurrency limit (and of the shared buckets) batch callers may occupy
+BATCH_MAX_ATTEMPTS = 4  # batch calls are retried on 429, interactive calls fail fast
+LATENCY_WINDOW = 500  # latencies kept per caller for the percentiles
+SHARED_KEY_PREFIX = "openeu-ratelimit"
+SHARED_POLL_SECONDS = 0.05  # slots freed by other processes are not signalled, waiting calls poll for them
+LEASE_SECONDS = 600  # a shared slot of a process that died is freed after this
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously up to its per-minute capacity."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # requests larger than the bucket only wait for a full bucket
+        needed = min(amount, self.capacity)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def sync(self, remaining: float) -> None:
+        """The provider reports fewer remaining tokens than we assumed, e.g. other clients share the key."""
+        self.tokens = min(self.tokens, remaining)
+
+    def drain(self) -> None:
+        self.tokens = min(self.tokens, 0.0)
+
+
+# Refills the buckets and takes one request, ARGV[3] tokens and a slot, or returns the seconds to wait ("-1": no
+# free slot). Batch calls (ARGV[4] > 0) must leave that share of the buckets. Uses the server's clock.
+_ACQUIRE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local reserve = tonumber(ARGV[4])
+local function level(key, capacity)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    return math.min(capacity, tokens + elapsed * capacity / 60)
+end
+local function wait_for(tokens, needed, capacity)
+    local floor = reserve * capacity
+    needed = math.min(needed, capacity - floor)
+    if tokens - needed >= floor then return 0 end
+    return (floor + needed - tokens) * 60 / capacity
+end
+
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+if redis.call('ZCARD', KEYS[3]) >= tonumber(ARGV[5]) then return '-1' end
+
+local rpm, tpm, amount = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local requests = level(KEYS[1], rpm)
+local wait = wait_for(requests, 1, rpm)
+local tokens = 0
+if tpm > 0 then
+    tokens = level(KEYS[2], tpm)
+    wait = math.max(wait, wait_for(tokens, amount, tpm))
+end
+if wait > 0 then return tostring(wait) end
+
+redis.call('HSET', KEYS[1], 'tokens', requests - 1, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+if tpm > 0 then
+    redis.call('HSET', KEYS[2], 'tokens', tokens - amount, 'ts', now)
+    redis.call('EXPIRE', KEYS[2], 120)
+end
+redis.call('ZADD', KEYS[3], now + tonumber(ARGV[7]), ARGV[6])
+redis.call('EXPIRE', KEYS[3], tonumber(ARGV[7]))
+return '0'
+"""
+
+# Lowers the buckets to at most ARGV[3] requests and ARGV[4] tokens ("" leaves a bucket as it is).
+_CAP_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local function cap(key, capacity, value)
+    if value == '' or capacity <= 0 then return end
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    tokens = math.min(capacity, tokens + elapsed * capacity / 60, tonumber(value))
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, 120)
+end
+cap(KEYS[1], tonumber(ARGV[1]), ARGV[3])
+cap(KEYS[2], tonumber(ARGV[2]), ARGV[4])
+return 1
+"""
+
+
+class SharedLimits:
+    """
+    The request and token buckets and the concurrency slots of a model in Redis, shared by all processes.
+    Fails open: while Redis is unreachable only the limits of the process apply.
+    """
+
+    def __init__(self, client: Any, model: str, limits: ModelLimits):
+        self.client = client
+        self.limits = limits
+        prefix = f"{SHARED_KEY_PREFIX}:{model}"
+        self.keys = [f"{prefix}:requests", f"{prefix}:tokens", f"{prefix}:slots"]
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._cap = client.register_script(_CAP_SCRIPT)
+
+    def try_acquire(self, priority: Priority, tokens: int, lease: str) -> float | None:
+        """0 if the call may start (its slot is held until release), seconds to wait for the buckets, or None."""
+        batch = priority != Priority.INTERACTIVE
+        slots = self.limits.max_concurrency * (BATCH_SHARE if batch else 1)
+        try:
+            wait = float(
+                self._acquire(
+                    keys=self.keys,
+                    args=[
+                        self.limits.requests_per_minute,
+                        self.limits.tokens_per_minute or 0,
+                        tokens,
+                        1 - BATCH_SHARE if batch else 0,
+                        max(1, int(slots)),
+                        lease,
+                        LEASE_SECONDS,
+                    ],
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Shared rate limits unavailable, using the process's limits only: {e}")
+            return 0.0
+        return None if wait < 0 else wait
+
+    def release(self, lease: str) -> None:
+        try:
+            self.client.zrem(self.keys[2], lease)
+        except Exception as e:
+            logger.debug(f"Failed to release shared slot {lease}: {e}")
+
+    def cap(self, requests: float | None, tokens: float | None) -> None:
+        try:
+            self._cap(
+                keys=self.keys[:2],
+                args=[
+                    self.limits.requests_per_minute,
+                    self.limits.tokens_per_minute or 0,
+                    "" if requests is None else requests,
+                    "" if tokens is None else tokens,
+                ],
+            )
+        except Exception as e:
+            logger.debug(f"Failed to update the shared buckets: {e}")
+
+
+class ModelLimiter:
+    """
+    :param shared: Limits shared with other processes, checked after the process's own ones.
+    """
+
+    def __init__(self, model: str, limits: ModelLimits, shared: SharedLimits | None = None):
+        self.model = model
+        self.limits = limits
+        self.shared = shared
+        self.concurrency = float(limits.max_concurrency)
+        self.in_flight = 0
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        self._cond = threading.Condition()
+        self._waiting: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+
+    def _slot_limit(self, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return max(1, int(self.concurrency))
+        return max(1, int(self.concurrency * BATCH_SHARE))
+
+    def _wait_time(self, ticket: tuple[int, int], tokens: int, lease: str) -> float | None:
+        """0 if the ticket may start now, seconds to wait for the buckets, or None to wait for a release."""
+        if self._waiting[0] != ticket or self.in_flight >= self._slot_limit(Priority(ticket[0])):
+            return None
+        now = time.monotonic()
+        wait = self.requests.wait_time(1, now)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        if wait == 0 and self.shared is not None:
+            shared_wait = self.shared.try_acquire(Priority(ticket[0]), tokens, lease)
+            return SHARED_POLL_SECONDS if shared_wait is None else shared_wait
+        return wait
+
+    def acquire(self, priority: Priority, tokens: int) -> str:
+        """Blocks until the call may start; returns the lease to pass to release."""
+        ticket = (int(priority), next(self._seq))
+        lease = uuid.uuid4().hex
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            self._cond.notify_all()
+            try:
+                while (wait := self._wait_time(ticket, tokens, lease)) != 0:
+                    self._cond.wait(timeout=wait)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self._cond.notify_all()
+        return lease
+
+    def release(self, rate_limited: bool, headers: Mapping[str, str] | None, lease: str | None = None) -> None:
+        if self.shared is not None and lease is not None:
+            self.shared.release(lease)
+            if rate_limited:
+                self.shared.cap(0, 0)
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                # multiplicative decrease and an empty bucket, so queued calls back off as well
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self.requests.drain()
+                if self.tokens is not None:
+                    self.tokens.drain()
+                logger.warning(f"Rate limited on {self.model}, concurrency limit is now {int(self.concurrency)}")
+            else:
+                # additive increase: one more slot after a full window of successful calls
+                self.concurrency = min(float(self.limits.max_concurrency), self.concurrency + 1 / self.concurrency)
+            if headers:
+                self._sync_headers(headers)
+            self._cond.notify_all()
+
+    def _sync_headers(self, headers: Mapping[str, str]) -> None:
+        remaining_requests = _header_number(headers, "x-ratelimit-remaining-requests")
+        if remaining_requests is not None:
+            self.requests.sync(remaining_requests)
+        remaining_tokens = _header_number(headers, "x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None and self.tokens is not None:
+            self.tokens.sync(remaining_tokens)
+        if self.shared is not None and (remaining_requests is not None or remaining_tokens is not None):
+            self.shared.cap(remaining_requests, remaining_tokens)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "concurrency_limit": int(self.concurrency),
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+            }
+
+
+class CallerStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.tokens = 0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, tokens: int, error: bool, rate_limited: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.tokens += tokens
+            self.errors += int(error)
+            self.rate_limited += int(rate_limited)
+            self.latencies.append(latency)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "tokens": self.tokens,
+            "latency_p50_ms": _percentile(latencies, 0.5) * 1000,
+            "latency_p95_ms": _percentile(latencies, 0.95) * 1000,
+        }
+
+
+_limiters: dict[str, ModelLimiter] = {}
+_stats: dict[str, CallerStats] = {}
+_registry_lock = threading.Lock()
+_redis: Any = None  # False once it is known that REDIS_URL is not set
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _redis_client() -> Any:
+    global _redis
+    if _redis is None:
+        url = Settings().get_redis_url()
+        if url:
+            import redis
+
+            _redis = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        else:
+            _redis = False
+    return _redis
+
+
+def get_limiter(model: str) -> ModelLimiter:
+    with _registry_lock:
+        if model not in _limiters:
+            limits = MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+            client = _redis_client()
+            shared = SharedLimits(client, model, limits) if client else None
+            _limiters[model] = ModelLimiter(model, limits, shared)
+        return _limiters[model]
+
+
+def _get_stats(caller: str) -> CallerStats:
+    with _registry_lock:
+        if caller not in _stats:
+            _stats[caller] = CallerStats()
+        return _stats[caller]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    # OpenAI, Cohere and LiteLLM errors all carry the HTTP status code
+    return getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__
+
+
+def _error_headers(error: Exception) -> Mapping[str, str] | None:
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    """Rough token estimate (~4 characters per token) used for the token buckets."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+def limited_call(
+    call: Callable[[], tuple[T, Mapping[str, str] | None]],
+    *,
+    model: str,
+    caller: str,
+    priority: Priority = Priority.INTERACTIVE,
+    tokens: int = 1,
+) -> T:
+    """
+    Run a model call within the limits of its model.
+
+    :param call: Performs the request and returns the result and the response headers (or None).
+    :param model: Model name, selects the buckets and the concurrency limit.
+    :param caller: Name under which latency and token metrics are recorded.
+    :param priority: Interactive calls are served before batch calls.
+    :param tokens: Estimated tokens of the request.
+    """
+    limiter = get_limiter(model)
+    stats = _get_stats(caller)
+    attempts = 1 if priority == Priority.INTERACTIVE else BATCH_MAX_ATTEMPTS
+
+    for attempt in range(1, attempts + 1):
+        lease = limiter.acquire(priority, tokens)
+        started = time.monotonic()
+        rate_limited = False
+        headers: Mapping[str, str] | None = None
+        try:
+            result, headers = call()
+            stats.record(time.monotonic() - started, tokens, error=False, rate_limited=False)
+            return result
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            headers = _error_headers(e)
+            stats.record(time.monotonic() - started, tokens, error=True, rate_limited=rate_limited)
+            if not rate_limited or attempt == attempts:
+                raise
+            backoff = _header_number(headers or {}, "retry-after") or 2**attempt
+        finally:
+            limiter.release(rate_limited, headers, lease)
+
+        logger.info(f"{caller}: rate limited on {model}, retrying in {backoff:.1f}s (attempt {attempt}/{attempts})")
+        time.sleep(backoff)
+
+    raise AssertionError("unreachable")
+
+
+def get_rate_limit_metrics() -> dict[str, Any]:
+    with _registry_lock:
+        limiters = dict(_limiters)
+        stats = dict(_stats)
+    return {
+        "models": {model: limiter.snapshot() for model, limiter in limiters.items()},
+        "callers": {caller: caller_stats.snapshot() for caller, caller_stats in stats.items()},
+    }
@@ -0,0 +1,387 @@
+"""Precomputed recommendations per profile in ``user_recommendations``.
+
+``fetch_relevant_meetings`` and ``fetch_relevant_legislative_files`` used to search and rerank for every newsletter
+recipient and personalized request. The ``update_recommendations`` job keeps the best items per profile instead,
+scored by the similarity of their embedding to the profile embedding (``(1 + dot) / 2``, like the RPCs):
+
+- meetings: the ``PER_DAY`` best per profile and meeting day, restricted to the profile's topics and countries like
+  the live search, from ``LOOKBACK_DAYS`` ago on, so every newsletter window has candidates;
+- legislative files: the ``PER_PROFILE`` best per profile.
+
+Each run scores only the embeddings created since the last run (``recommendation_watermarks``) against all profile
+vectors at once, and rebuilds the recommendations of profiles whose embedding input, topics or countries changed
+(``profiles.recommendations_hash``). Reads are key lookups on the table (``get_recommended_meetings``); profiles
+whose recommendations are not current yet fall back to the live search.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+
+from app.core.change_events import publish_change
+from app.core.meeting_index import meeting_rows
+from app.core.openai_client import EMBED_DIM
+from app.core.quantization import parse_vector
+from app.core.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_VERSION = 1  # bump when the scoring changes, all profiles are rebuilt
+PER_DAY = 20  # meetings kept per profile and meeting day
+PER_PROFILE = 200  # legislative files kept per profile
+LOOKBACK_DAYS = 30  # meetings of older days are dropped
+PROFILE_CHUNK = 256  # profiles scored at once, bounds the score matrix
+ID_CHUNK = 200  # source ids per in_() filter
+PAGE_SIZE = 1000
+MEETINGS = "meetings"
+LEGISLATIVE_FILES = "legislative_files"
+
+Key = tuple[str, str]
+
+
+@dataclass
+class Profile:
+    id: str
+    embedding: np.ndarray
+    topic_ids: list[str]
+    countries: list[str]
+    input_hash: str
+    stored_hash: str | None
+
+
+@dataclass
+class Items:
+    """Embedded items of a corpus; buckets are meeting days (days since epoch), 0 for legislative files."""
+
+    keys: list[Key]
+    vectors: np.ndarray
+    buckets: np.ndarray
+    topic_ids: list[set[str]]
+    locations: list[set[str]]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def subset(self, keys: set[Key]) -> "Items":
+        rows = [row for row, key in enumerate(self.keys) if key in keys]
+        return Items(
+            keys=[self.keys[row] for row in rows],
+            vectors=self.vectors[rows],
+            buckets=self.buckets[rows],
+            topic_ids=[self.topic_ids[row] for row in rows],
+            locations=[self.locations[row] for row in rows],
+        )
+
+
+def profile_hash(embedding_input: str, topic_ids: list[str] | None, countries: list[str] | None) -> str:
+    """Hash of everything the recommendations of a profile depend on."""
+    payload = json.dumps(
+        [RECOMMENDATIONS_VERSION, embedding_input, sorted(topic_ids or []), sorted(c.lower() for c in countries or [])]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def recommendations_current(profile: dict) -> bool:
+    """Whether the stored recommendations of a v_profiles row were built from its current inputs."""
+    stored = profile.get("recommendations_hash")
+    return stored is not None and stored == profile_hash(
+        profile.get("embedding_input") or "", profile.get("topic_ids"), profile.get("countries")
+    )
+
+
+def _incidence(sets: list[set[str]], vocabulary: dict[str, int]) -> np.ndarray:
+    matrix = np.zeros((len(sets), len(vocabulary)), dtype=np.float32)
+    for row, values in enumerate(sets):
+        for value in values:
+            column = vocabulary.get(value)
+            if column is not None:
+                matrix[row, column] = 1
+    return matrix
+
+
+def eligibility(profiles: list[Profile], items: Items) -> np.ndarray:
+    """
+    profiles x items mask of the meetings each profile may be recommended: one of its topics and one of its
+    countries, unless it has none, like the allowed_topic_ids and allowed_countries filters of the live search.
+    """
+    mask = np.ones((len(profiles), len(items)), dtype=bool)
+    for profile_sets, item_sets in (
+        ([set(p.topic_ids) for p in profiles], items.topic_ids),
+        ([{c.lower() for c in p.countries} for p in profiles], items.locations),
+    ):
+        vocabulary = {value: i for i, value in enumerate(sorted(set().union(*profile_sets)))}
+        if not vocabulary:
+            continue
+        matches = (_incidence(profile_sets, vocabulary) @ _incidence(item_sets, vocabulary).T) > 0
+        unrestricted = np.array([not values for values in profile_sets])
+        mask &= matches | unrestricted[:, None]
+    return mask
+
+
+def top_per_bucket(
+    scores: np.ndarray, mask: np.ndarray, buckets: np.ndarray, limit: int
+) -> list[tuple[int, int, float]]:
+    """The limit best eligible items per profile (row) and bucket, as (profile row, item column, score)."""
+    scores = np.where(mask, scores, -np.inf)
+    picks: list[tuple[int, int, float]] = []
+    for bucket in np.unique(buckets):
+        columns = np.flatnonzero(buckets == bucket)
+        block = scores[:, columns]
+        if columns.size > limit:
+            top = np.argpartition(-block, limit - 1, axis=1)[:, :limit]
+        else:
+            top = np.broadcast_to(np.arange(columns.size), block.shape)
+        top_scores = np.take_along_axis(block, top, axis=1)
+        rows, positions = np.nonzero(np.isfinite(top_scores))
+        items = columns[top[rows, positions]]
+        picks.extend(zip(rows.tolist(), items.tolist(), top_scores[rows, positions].tolist(), strict=True))
+    return picks
+
+
+def score(profiles: list[Profile], items: Items, corpus: str) -> list[dict]:
+    """user_recommendations rows of the best items per profile (and day, for meetings)."""
+    if not profiles or not len(items):
+        return []
+    computed_at = datetime.now(UTC).isoformat()
+    limit = PER_DAY if corpus == MEETINGS else PER_PROFILE
+    rows = []
+    for start in range(0, len(profiles), PROFILE_CHUNK):
+        chunk = profiles[start : start + PROFILE_CHUNK]
+        similarities = (1 + np.stack([p.embedding for p in chunk]) @ items.vectors.T) / 2
+        mask = eligibility(chunk, items) if corpus == MEETINGS else np.ones(similarities.shape, dtype=bool)
+        for row, column, similarity in top_per_bucket(similarities, mask, items.buckets, limit):
+            source_table, source_id = items.keys[column]
+            bucket = int(items.buckets[column])
+            rows.append(
+                {
+                    "profile_id": chunk[row].id,
+                    "source_table": source_table,
+                    "source_id": source_id,
+                    "bucket": str(np.datetime64(bucket, "D")) if corpus == MEETINGS else None,
+                    "score": similarity,
+                    "computed_at": computed_at,
+                }
+            )
+    return rows
+
+
+def _pages(query_factory) -> list[dict]:
+    rows: list[dict] = []
+    while True:
+        page = query_factory().range(len(rows), len(rows) + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def load_profiles() -> list[Profile]:
+    rows = _pages(
+        lambda: supabase.table("v_profiles")
+        .select("id, embedding, embedding_input, topic_ids, countries, recommendations_hash")
+        .order("id")
+    )
+    return [
+        Profile(
+            id=row["id"],
+            embedding=parse_vector(row["embedding"]),
+            topic_ids=[str(t) for t in row.get("topic_ids") or []],
+            countries=row.get("countries") or [],
+            input_hash=profile_hash(row.get("embedding_input") or "", row.get("topic_ids"), row.get("countries")),
+            stored_hash=row.get("recommendations_hash"),
+        )
+        for row in rows
+        if row.get("embedding")
+    ]
+
+
+def _items(rows: Iterable[tuple[Key, np.ndarray, int, set[str], set[str]]]) -> Items:
+    keys, vectors, buckets, topic_ids, locations = [], [], [], [], []
+    for key, vector, bucket, topics, location in rows:
+        keys.append(key)
+        vectors.append(vector)
+        buckets.append(bucket)
+        topic_ids.append(topics)
+        locations.append(location)
+    return Items(
+        keys=keys,
+        vectors=np.stack(vectors) if vectors else np.zeros((0, EMBED_DIM), dtype=np.float32),
+        buckets=np.asarray(buckets, dtype=np.int64),
+        topic_ids=topic_ids,
+        locations=locations,
+    )
+
+
+def _day_number(value: str | None) -> int | None:
+    return (datetime.fromisoformat(value).date() - date(1970, 1, 1)).days if value else None
+
+
+def load_meetings(keys: Iterable[Key], cutoff: date) -> Items:
+    """The meetings of keys that end on or after cutoff."""
+    ids_by_table: dict[str, list[str]] = {}
+    for source_table, source_id in keys:
+        ids_by_table.setdefault(source_table, []).append(source_id)
+    last_allowed = (cutoff - date(1970, 1, 1)).days
+
+    def rows():
+        for source_table, ids in ids_by_table.items():
+            for start in range(0, len(ids), ID_CHUNK):
+                for row, meeting, topic_ids in meeting_rows(source_table, ids[start : start + ID_CHUNK]):
+                    meeting = meeting or {}
+                    first_day = _day_number(meeting.get("meeting_start_datetime"))
+                    last_day = _day_number(meeting.get("meeting_end_datetime")) or first_day
+                    if first_day is None or last_day < last_allowed:
+                        continue
+                    location = meeting.get("location")
+                    yield (
+                        (row["source_table"], row["source_id"]),
+                        parse_vector(row["embedding"]),
+                        first_day,
+                        {str(t) for t in topic_ids},
+                        {location.lower()} if location else set(),
+                    )
+
+    return _items(rows())
+
+
+def meeting_keys(cutoff: date) -> set[Key]:
+    """Keys of the meetings that end on or after cutoff."""
+    day = cutoff.isoformat()
+    rows = _pages(
+        lambda: supabase.table("v_meetings")
+        .select("source_table, source_id")
+        .or_(f"meeting_start_datetime.gte.{day},meeting_end_datetime.gte.{day}")
+        .order("source_table")
+        .order("source_id")
+    )
+    return {(row["source_table"], str(row["source_id"])) for row in rows}
+
+
+def load_legislative_files() -> Items:
+    rows = _pages(
+        lambda: supabase.table("documents_embeddings")
+        .select("source_id, embedding")
+        .eq("source_table", LEGISLATIVE_FILES)
+        .eq("content_column", "embedding_input")
+        .order("created_at")
+    )
+    # a re-embedded file has several rows, the newest wins
+    vectors = {row["source_id"]: row["embedding"] for row in rows}
+    return _items(
+        ((LEGISLATIVE_FILES, source_id), parse_vector(vector), 0, set(), set()) for source_id, vector in vectors.items()
+    )
+
+
+def new_keys(corpus: str, since: str | None) -> tuple[set[Key], str | None]:
+    """Keys of the embeddings created after since, and the newest creation time among them."""
+    table = "meeting_embeddings" if corpus == MEETINGS else "documents_embeddings"
+
+    def query():
+        q = supabase.table(table).select("source_table, source_id, created_at")
+        if corpus == LEGISLATIVE_FILES:
+            q = q.eq("source_table", LEGISLATIVE_FILES)
+        if since is not None:
+            q = q.gt("created_at", since)
+        return q.order("created_at")
+
+    rows = _pages(query)
+    return {(row["source_table"], str(row["source_id"])) for row in rows}, (rows[-1]["created_at"] if rows else since)
+
+
+def _watermark(corpus: str) -> str | None:
+    rows = supabase.table("recommendation_watermarks").select("embedded_until").eq("corpus", corpus).execute().data
+    return rows[0]["embedded_until"] if rows else None
+
+
+def _store(rows: list[dict]):
+    for start in range(0, len(rows), PAGE_SIZE):
+        supabase.table("user_recommendations").upsert(
+            rows[start : start + PAGE_SIZE], on_conflict="profile_id,source_table,source_id"
+        ).execute()
+
+
+def _delete(profile: Profile, corpus: str):
+    query = supabase.table("user_recommendations").delete().eq("profile_id", profile.id)
+    if corpus == MEETINGS:
+        query = query.neq("source_table", LEGISLATIVE_FILES)
+    else:
+        query = query.eq("source_table", LEGISLATIVE_FILES)
+    query.execute()
+
+
+def update_recommendations(stop_event: multiprocessing.synchronize.Event | None = None) -> int:
+    """
+    Scores the items embedded since the last run against all current profiles and rebuilds the recommendations of
+    changed profiles. Returns the number of stored rows.
+    """
+    profiles = load_profiles()
+    changed = [p for p in profiles if p.stored_hash != p.input_hash]
+    current = [p for p in profiles if p.stored_hash == p.input_hash]
+    cutoff = datetime.now(UTC).date() - timedelta(days=LOOKBACK_DAYS)
+    logger.info(f"Updating recommendations of {len(profiles)} profile(s), rebuilding {len(changed)}")
+
+    stored = 0
+    updated: set[str] = set()
+    for corpus in (MEETINGS, LEGISLATIVE_FILES):
+        if stop_event is not None and stop_event.is_set():
+            break
+        watermark = _watermark(corpus)
+        keys, embedded_until = new_keys(corpus, watermark)
+        # the first run of a corpus builds it for everyone
+        incremental, rebuilt = (current, changed) if watermark is not None else ([], profiles)
+
+        if rebuilt:
+            items = load_meetings(meeting_keys(cutoff), cutoff) if corpus == MEETINGS else load_legislative_files()
+            fresh = items.subset(keys)
+        else:
+            fresh = load_meetings(keys, cutoff) if corpus == MEETINGS else load_legislative_files().subset(keys)
+
+        rows = score(incremental, fresh, corpus)
+        for profile in rebuilt:
+            _delete(profile, corpus)
+        if rebuilt:
+            rows += score(rebuilt, items, corpus)
+        _store(rows)
+        stored += len(rows)
+        updated.update(row["profile_id"] for row in rows)
+        updated.update(profile.id for profile in rebuilt)
+        logger.info(f"Stored {len(rows)} {corpus} recommendation(s), {len(fresh)} new item(s)")
+
+        if embedded_until is not None:
+            supabase.table("recommendation_watermarks").upsert(
+                {"corpus": corpus, "embedded_until": embedded_until}, on_conflict="corpus"
+            ).execute()
+
+    # drops the cached meeting lists of these profiles
+    publish_change("user_recommendations", sorted(updated))
+    if stop_event is not None and stop_event.is_set():
+        return stored
+    for profile in changed:
+        supabase.table("profiles").update({"recommendations_hash": profile.input_hash}).eq("id", profile.id).execute()
+    pruned = supabase.rpc(
+        "prune_user_recommendations", {"per_day": PER_DAY, "per_profile": PER_PROFILE, "keep_after": cutoff.isoformat()}
+    ).execute()
+    logger.info(f"Pruned {pruned.data} recommendation(s)")
+    return stored
+
+
+def recommended_legislative_file_ids(profile_id: str, k: int) -> list[dict]:
+    """The k best stored legislative files of a profile as neighbors (source_id, similarity), best first."""
+    rows = (
+        supabase.table("user_recommendations")
+        .select("source_table, source_id, score")
+        .eq("profile_id", profile_id)
+        .eq("source_table", LEGISLATIVE_FILES)
+        .order("score", desc=True)
+        .limit(k)
+        .execute()
+        .data
+        or []
+    )
+    return [{"source_table": r["source_table"], "source_id": r["source_id"], "similarity": r["score"]} for r in rows]
@@ -0,0 +1,268 @@
+"""Cached LLM reformulation of search queries and profile texts.
+
+The semantic search paths reformulate the user's query (or profile text) with gpt-4o-mini before embedding it.
+``reformulate`` caches the results keyed by ``(prompt, prompt version, sha256 of the input)``:
+
+- in a per-process LRU of ``LRU_SIZE`` entries,
+- persistently in ``query_reformulations``, whose least recently used rows are evicted by the
+  ``prune_query_reformulations`` job beyond ``MAX_STORED_REFORMULATIONS``.
+
+Reformulations of profile texts are also stored on the profile itself (``profiles.query_reformulations``), see
+``reformulate_profile``; they are only recomputed when ``embedding_input`` or the prompt changed.
+Bump a prompt's ``version`` whenever its text changes, older cached outputs are then ignored.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from app.core.openai_client import create_chat_completion
+from app.core.rate_limits import Priority
+from app.core.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+REFORMULATIONS_TABLE = "query_reformulations"
+LRU_SIZE = 4096
+MAX_STORED_REFORMULATIONS = 50_000
+TOUCH_INTERVAL = timedelta(days=1)  # last_used_at is only rewritten if older, hits stay read-only mostly
+
+
+@dataclass(frozen=True)
+class ReformulationPrompt:
+    name: str
+    version: int
+    system: str
+    model: str = "gpt-4o-mini"
+    max_tokens: int = 128
+
+
+MEETING_SEARCH = ReformulationPrompt(
+    name="meeting_search",
+    version=1,
+    system="You are a helpful assistant that reformulates text for semantic search."
+    "Your task is to generate a meeting summary document based on the user's question. "
+    + "Use a formal tone, and try to vary the phrasing and details based on the query context. "
+    + "Keep the summary within three sentences, with a clear title and a brief description.",
+)
+
+LEGISLATIVE_SEARCH_WITH_PROFILE = ReformulationPrompt(
+    name="legislative_search_with_profile",
+    version=1,
+    system=(
+        "You are a helpful assistantthat reformulates text for "
+        "semantic search. "
+        "Your task is to generate a title for a legislative"
+        "concerning the user and his query. "
+        "For example:\n"
+        "User Input: Infrastrucure, User Profile: As the CEO of Transport Logistics,"
+        "acompany pioneering"
+        "the integration of AI intransportation "
+        "I am steering a dynamicgrowth-stage enterprise witha team of"
+        "21-50   professionals.\n"
+        "Output 1: Infrastructureand Technology Rules"
+        "Output 2: Implementaion of the Infrastructure and Technology Package"
+    ),
+)
+
+LEGISLATIVE_SEARCH = ReformulationPrompt(
+    name="legislative_search",
+    version=1,
+    system=(
+        "You are a helpful assistantthat reformulates text for "
+        "semantic search. "
+        "Your task is to generate a title for a legislative"
+        "concerning the user and his query. "
+        "For example:\n"
+        "User Input: Infrastrucure"
+        "Output 1: Infrastructureand Technology Rules"
+        "Output 2: Implementaion of the Infrastructure and Technology Package"
+    ),
+)
+
+PROFILE_MEETINGS = ReformulationPrompt(
+    name="profile_meetings",
+    version=1,
+    system=(
+        "You are a helpful assistant that reformulates text for semantic search. "
+        "Your task is to generate a meeting title for a legislative/institutional meeting"
+        "concerning the user. "
+        "For example:\n"
+        "User Input: As the CEO of Transport Logistics, a company pioneering the"
+        "integration of AI in transportation, "
+        "I am steering a dynamic growth-stage enterprise with a team of 21-50 professionals.\n"
+        "Output: Meeting on Infrastructure and Technology"
+    ),
+)
+
+PROFILE_LEGISLATIVES = ReformulationPrompt(
+    name="profile_legislatives",
+    version=1,
+    system=(
+        "You are a helpful assistant that reformulates text for semantic search. "
+        "Your task is to generate a title for a legislative concerning the user. "
+        "For example:\n"
+        "User Input: As the CEO of Transport Logistics, a company pioneering the"
+        "integration of AI in transportation, "
+        "I am steering a dynamic growth-stage enterprise with a team of 21-50 professionals.\n"
+        "Output 1: Infrastructure and Technology Rules"
+        "Output 2: Implementaion of the Infrastructure and Technology Package"
+    ),
+)
+
+
+def input_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+_lru: OrderedDict[tuple[str, int, str], str] = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def _lru_get(key: tuple[str, int, str]) -> str | None:
+    with _lru_lock:
+        output = _lru.get(key)
+        if output is not None:
+            _lru.move_to_end(key)
+        return output
+
+
+def _lru_put(key: tuple[str, int, str], output: str):
+    with _lru_lock:
+        _lru[key] = output
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _load(key: tuple[str, int, str]) -> str | None:
+    prompt, version, digest = key
+    try:
+        response = (
+            supabase.table(REFORMULATIONS_TABLE)
+            .select("output, last_used_at")
+            .eq("prompt", prompt)
+            .eq("prompt_version", version)
+            .eq("input_hash", digest)
+            .limit(1)
+            .execute()
+        )
+    except Exception as e:
+        logger.warning(f"Failed to load reformulation for '{prompt}': {e}")
+        return None
+    if not response.data:
+        return None
+    row = response.data[0]
+    if datetime.fromisoformat(row["last_used_at"]) < datetime.now(UTC) - TOUCH_INTERVAL:
+        try:
+            supabase.table(REFORMULATIONS_TABLE).update({"last_used_at": datetime.now(UTC).isoformat()}).eq(
+                "prompt", prompt
+            ).eq("prompt_version", version).eq("input_hash", digest).execute()
+        except Exception as e:
+            logger.warning(f"Failed to touch reformulation for '{prompt}': {e}")
+    return row["output"]
+
+
+def _store(key: tuple[str, int, str], output: str):
+    prompt, version, digest = key
+    try:
+        supabase.table(REFORMULATIONS_TABLE).upsert(
+            {
+                "prompt": prompt,
+                "prompt_version": version,
+                "input_hash": digest,
+                "output": output,
+                "last_used_at": datetime.now(UTC).isoformat(),
+            },
+            on_conflict="prompt,prompt_version,input_hash",
+        ).execute()
+    except Exception as e:
+        logger.warning(f"Failed to store reformulation for '{prompt}': {e}")
+
+
+def _complete(prompt: ReformulationPrompt, text: str, caller: str, priority: Priority) -> str | None:
+    try:
+        completion = create_chat_completion(
+            caller=caller,
+            priority=priority,
+            model=prompt.model,
+            messages=[
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": text},
+            ],
+            temperature=0,
+            max_tokens=prompt.max_tokens,
+        )
+        return (completion.choices[0].message.content or "").strip() or None
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        return None
+
+
+def cached_reformulation(prompt: ReformulationPrompt, text: str) -> str | None:
+    """The cached reformulation of text by prompt, None if it would take an LLM call."""
+    key = (prompt.name, prompt.version, input_hash(text))
+    output = _lru_get(key)
+    if output is None:
+        output = _load(key)
+        if output is not None:
+            _lru_put(key, output)
+    return output
+
+
+def reformulate(
+    prompt: ReformulationPrompt, text: str, caller: str, priority: Priority = Priority.INTERACTIVE
+) -> str:
+    """
+    The reformulation of text by prompt, from the cache if possible.
+    Falls back to text itself if the LLM call fails; such fallbacks are not cached.
+    """
+    output = cached_reformulation(prompt, text)
+    if output is not None:
+        return output
+    output = _complete(prompt, text, caller, priority)
+    if output is None:
+        return text
+    key = (prompt.name, prompt.version, input_hash(text))
+    _store(key, output)
+    _lru_put(key, output)
+    return output
+
+
+def reformulate_profile(
+    user_id: str,
+    embedding_input: str,
+    stored: dict | None,
+    prompt: ReformulationPrompt,
+    caller: str,
+    priority: Priority = Priority.INTERACTIVE,
+) -> str:
+    """
+    The reformulation of a profile's embedding_input, kept on the profile until embedding_input or prompt change.
+    :param stored: The profile's query_reformulations column, as loaded with the profile.
+    """
+    digest = input_hash(embedding_input)
+    entry = (stored or {}).get(prompt.name)
+    if entry and entry.get("version") == prompt.version and entry.get("input_hash") == digest:
+        return entry["output"]
+
+    output = reformulate(prompt, embedding_input, caller, priority)
+    if output == embedding_input:
+        return output  # the LLM call failed, try again next time
+    updated = {**(stored or {}), prompt.name: {"version": prompt.version, "input_hash": digest, "output": output}}
+    try:
+        supabase.table("profiles").update({"query_reformulations": updated}).eq("id", user_id).execute()
+    except Exception as e:
+        logger.warning(f"Failed to store reformulation on profile {user_id}: {e}")
+    return output
+
+
+def prune_reformulations(max_rows: int = MAX_STORED_REFORMULATIONS) -> int:
+    """Evicts the least recently used stored reformulations beyond max_rows, returns how many were deleted."""
+    response = supabase.rpc("prune_query_reformulations", {"max_rows": max_rows}).execute()
+    deleted = response.data or 0
+    logger.info(f"Evicted {deleted} query reformulations")
+    return deleted
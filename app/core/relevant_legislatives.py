@@ -1,14 +1,14 @@
 import logging
 from typing import Optional
 
-from openai import OpenAI
 from pydantic import BaseModel, ValidationError
 from datetime import datetime
 
-from app.core.config import Settings
 from postgrest import SyncSelectRequestBuilder
+from app.core.recommendations import recommendations_current, recommended_legislative_file_ids
+from app.core.reformulation import PROFILE_LEGISLATIVES, reformulate_profile
 from app.core.supabase_client import supabase
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
 from app.core.vector_search import get_top_k_neighbors
 from app.models.legislative_file import LegislativeFile
 
@@ -17,11 +17,6 @@ class RelevantLegislativeFilesResponse(BaseModel):
     legislative_files: list[LegislativeFile]
 
 
-settings = Settings()
-openai = OpenAI(api_key=settings.get_openai_api_key())
-EMBED_MODEL = "text-embedding-ada-002"
-
-
 logger = logging.getLogger(__name__)
 
 
@@ -61,69 +56,64 @@ def fetch_relevant_legislative_files(
     try:
         resp = (
             supabase.table("v_profiles")
-            .select("embedding", "countries", "newsletter_frequency", "topic_ids", "embedding_input")
+            .select(
+                "countries",
+                "newsletter_frequency",
+                "topic_ids",
+                "embedding_input",
+                "query_reformulations",
+                "recommendations_hash",
+            )
             .eq("id", user_id)
             .single()
             .execute()
         )
         profile_embedding_input = resp.data["embedding_input"]
+        stored_reformulations = resp.data.get("query_reformulations")
 
     except Exception as e:
         logger.exception(f"Unexpected error loading profile embedding or profile doesnt exist: {e}")
         return RelevantLegislativeFilesResponse(legislative_files=[])
 
-    # 2) call `get_top_k_neighbors`
+    # 2) precomputed by the update_recommendations job (a key lookup), or search and rerank
     try:
-        completion = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that reformulates text for semantic search. "
-                        "Your task is to generate a title for a legislative concerning the user. "
-                        "For example:\n"
-                        "User Input: As the CEO of Transport Logistics, a company pioneering the"
-                        "integration of AI in transportation, "
-                        "I am steering a dynamic growth-stage enterprise with a team of 21-50 professionals.\n"
-                        "Output 1: Infrastructure and Technology Rules"
-                        "Output 2: Implementaion of the Infrastructure and Technology Package"
-                    ),
-                },
-                {"role": "user", "content": profile_embedding_input},
-            ],
-            temperature=0,
-            max_tokens=128,
-        )
-        reformulated_query = (completion.choices[0].message.content or profile_embedding_input).strip()
-
-        neighbors = get_top_k_neighbors(
-            query=reformulated_query,
-            allowed_sources={"legislative_files": "embedding_input"},
-            sources=["document_embeddings"],
-            k=1000,
-        )
-
-        # Remove duplicates
-        neighbors = deduplicate_neighbors(neighbors)
-        docs = [n["content_text"] for n in neighbors]
-
-        rerank_resp = co.rerank(
-            model="rerank-v3.5",
-            query=profile_embedding_input,
-            documents=docs,
-            top_n=min(k, len(docs)),
-        )
-
-        neighbors_re = []
-        for result in rerank_resp.results:
-            idx = result.index
-            new_score = result.relevance_score
-            neighbors[idx]["similarity"] = new_score
-            if new_score > 0.05:
-                neighbors_re.append(neighbors[idx])
-
-        neighbors = neighbors_re
+        if recommendations_current(resp.data):
+            neighbors = recommended_legislative_file_ids(user_id, k)
+        else:
+            reformulated_query = reformulate_profile(
+                user_id,
+                profile_embedding_input,
+                stored_reformulations,
+                PROFILE_LEGISLATIVES,
+                caller="relevant_legislatives",
+            )
+
+            neighbors = get_top_k_neighbors(
+                query=reformulated_query,
+                allowed_sources={"legislative_files": "embedding_input"},
+                sources=["document_embeddings"],
+                k=1000,
+            )
+
+            # Remove duplicates
+            neighbors = deduplicate_neighbors(neighbors)
+
+            rerank_resp = rerank_neighbors(
+                query=profile_embedding_input,
+                neighbors=neighbors,
+                top_n=min(k, len(neighbors)),
+                caller="relevant_legislatives",
+            )
+
+            neighbors_re = []
+            for result in rerank_resp.results:
+                idx = result.index
+                new_score = result.relevance_score
+                neighbors[idx]["similarity"] = new_score
+                if new_score > 0.05:
+                    neighbors_re.append(neighbors[idx])
+
+            neighbors = neighbors_re
 
         if query_to_compare:
             match = query_to_compare.execute()
@@ -2,14 +2,13 @@ import logging
 from typing import Optional
 from datetime import datetime, time, timedelta
 
-from openai import OpenAI
-from postgrest import SyncSelectRequestBuilder
 from pydantic import BaseModel, ValidationError
-from app.core.cohere_client import co
+from app.core.rerank import rerank_neighbors
 
-from app.core.config import Settings
+from app.core.rate_limits import Priority
+from app.core.recommendations import recommendations_current
+from app.core.reformulation import PROFILE_MEETINGS, reformulate_profile
 from app.core.supabase_client import supabase
-from app.core.vector_search import get_top_k_neighbors
 from app.models.meeting import Meeting
 
 
@@ -17,170 +16,135 @@ class RelevantMeetingsResponse(BaseModel):
     meetings: list[Meeting]
 
 
-settings = Settings()
-openai = OpenAI(api_key=settings.get_openai_api_key())
-EMBED_MODEL = "text-embedding-ada-002"
-
-
 logger = logging.getLogger(__name__)
 
+PROFILE_CANDIDATES = 300  # nearest meetings reranked per profile, within the reranker's pruning budget
+RERANK_INPUT_COLUMNS = ("source_table", "source_id", "content_text", "similarity")
+
 
 def fetch_relevant_meetings(
     user_id: str,
     k: int,
-    query_to_compare: Optional[SyncSelectRequestBuilder] = None,
     consider_frequency: bool = True,
+    priority: Priority = Priority.INTERACTIVE,
+    source_tables: Optional[list[str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    countries: Optional[list[str]] = None,
+    topics: Optional[list[str]] = None,
 ) -> RelevantMeetingsResponse:
+    """
+    The k meetings most relevant to the profile of user_id.
+
+    Profiles with current precomputed recommendations are answered from user_recommendations
+    (get_recommended_meetings). Otherwise search_meetings_for_profile finds the candidates nearest to the stored
+    profile embedding in the database, restricted to the profile's topics and countries and to the given filters,
+    and returns them with their meeting columns; they are reranked against the reformulated profile.
+
+    :param consider_frequency: only meetings of the profile's newsletter period (today or this week), instead of
+        start and end
+    :param source_tables: only meetings of these tables
+    :param start: only meetings ending at or after start
+    :param end: only meetings starting at or before end
+    :param countries: only meetings whose location contains one of these (case-insensitive)
+    :param topics: only meetings with one of these topic names
+    """
     meetings: list[Meeting] = []
-    # 1) load the stored profile embedding for `user_id`
+    # 1) load the profile of `user_id`, its embedding stays in the database
     try:
         resp = (
             supabase.table("v_profiles")
-            .select("embedding", "countries", "newsletter_frequency", "topic_ids", "embedding_input")
+            .select(
+                "newsletter_frequency",
+                "embedding_input",
+                "query_reformulations",
+                "topic_ids",
+                "countries",
+                "recommendations_hash",
+            )
             .eq("id", user_id)
             .single()
             .execute()
         )
         profile_embedding_input = resp.data["embedding_input"]
         newsletter_frequency = resp.data.get("newsletter_frequency", "daily")
-        allowed_topic_ids = resp.data["topic_ids"]
-        allowed_countries = resp.data["countries"]
+        stored_reformulations = resp.data.get("query_reformulations")
 
     except Exception as e:
         logger.exception(f"Unexpected error loading profile embedding or profile doesnt exist: {e}")
         return RelevantMeetingsResponse(meetings=[])
 
-    # 2) call `get_top_k_neighbors`
-
-    try:
-        completion = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that reformulates text for semantic search. "
-                        "Your task is to generate a meeting title for a legislative/institutional meeting"
-                        "concerning the user. "
-                        "For example:\n"
-                        "User Input: As the CEO of Transport Logistics, a company pioneering the"
-                        "integration of AI in transportation, "
-                        "I am steering a dynamic growth-stage enterprise with a team of 21-50 professionals.\n"
-                        "Output: Meeting on Infrastructure and Technology"
-                    ),
-                },
-                {"role": "user", "content": profile_embedding_input},
-            ],
-            temperature=0,
-            max_tokens=128,
-        )
-        reformulated_query = (completion.choices[0].message.content or profile_embedding_input).strip()
-
-    except Exception as e:
-        reformulated_query = profile_embedding_input
-        logger.error(f"An error occurred: {e}")
+    if consider_frequency:
+        today = datetime.now().date()
+
+        if newsletter_frequency == "weekly":
+            # Start from Monday of the current week
+            start_date = today - timedelta(days=today.weekday())
+            start = datetime.combine(start_date, time.min)
+            end_date = start_date + timedelta(days=6)
+            end = datetime.combine(end_date, time.max)
+        else:
+            # Start and end are just today
+            start = datetime.combine(today, time.min)
+            end = datetime.combine(today, time.max)
+
+    filters = {
+        "profile_id": user_id,
+        "src_tables": source_tables or None,
+        "start_date": start.isoformat() if start else None,
+        "end_date": end.isoformat() if end else None,
+        "countries": countries or None,
+        "topics": topics or None,
+    }
 
+    # 2a) precomputed by the update_recommendations job, a key lookup
+    if recommendations_current(resp.data):
+        try:
+            rows = supabase.rpc("get_recommended_meetings", {**filters, "match_count": k}).execute().data or []
+        except Exception as e:
+            logger.error("Loading recommended meetings failed: %s", e)
+            return RelevantMeetingsResponse(meetings=[])
+        for row in rows:
+            try:
+                meetings.append(Meeting.model_validate(row))
+            except ValidationError as ve:
+                logger.warning("Skipping invalid row %s: %s", row.get("source_id"), ve)
+        return RelevantMeetingsResponse(meetings=meetings)
+
+    reformulated_query = reformulate_profile(
+        user_id,
+        profile_embedding_input,
+        stored_reformulations,
+        PROFILE_MEETINGS,
+        caller="relevant_meetings",
+        priority=priority,
+    )
+
+    # 2b) search and hydrate the candidates in one call, then rerank them
     try:
-        start_date_time = None
-        end_date_time = None
-
-        if consider_frequency:
-            today = datetime.now().date()
-
-            if newsletter_frequency == "weekly":
-                # Start from Monday of the current week
-                start_date = today - timedelta(days=today.weekday())
-                start_date_time = datetime.combine(start_date, time.min)
-                end_date = start_date + timedelta(days=6)
-                end_date_time = datetime.combine(end_date, time.max)
-            else:
-                # Start and end are just today
-                start_date_time = datetime.combine(today, time.min)
-                end_date_time = datetime.combine(today, time.max)
-
-        neighbors = get_top_k_neighbors(
-            query=reformulated_query,
-            sources=["meeting_embeddings"],
-            allowed_topic_ids=allowed_topic_ids,
-            allowed_countries=allowed_countries,
-            start_date=start_date_time,
-            end_date=end_date_time,
-            k=3000,
-        )
-
-        docs = [n["content_text"] for n in neighbors]
+        rpc_params = {**filters, "match_count": max(k, PROFILE_CANDIDATES)}
+        neighbors = supabase.rpc("search_meetings_for_profile", rpc_params).execute().data or []
+        if not neighbors:
+            return RelevantMeetingsResponse(meetings=[])
 
-        rerank_resp = co.rerank(
-            model="rerank-v3.5",
+        rerank_resp = rerank_neighbors(
             query=reformulated_query,
-            documents=docs,
-            top_n=min(k, len(docs)),
+            neighbors=[{key: n[key] for key in RERANK_INPUT_COLUMNS} for n in neighbors],
+            top_n=min(k, len(neighbors)),
+            caller="relevant_meetings",
+            priority=priority,
         )
 
-        neighbors_re = []
-        for result in rerank_resp.results:
-            idx = result.index
-            new_score = result.relevance_score
-            neighbors[idx]["similarity"] = new_score
-            if new_score > 0.05:
-                neighbors_re.append(neighbors[idx])
-
-        neighbors = neighbors_re
-
-        sorted_neighbors = sorted(neighbors, key=lambda n: n["similarity"], reverse=True)[:k]
-
-        if query_to_compare:
-            match = query_to_compare.order("meeting_start_datetime", desc=True).execute()
-
-            if match.data:
-                allowed_keys = {(r["source_table"], r["source_id"]) for r in match.data}
-
-                neighbors = [n for n in sorted_neighbors if (n["source_table"], n["source_id"]) in allowed_keys]
-
     except Exception as e:
         logger.error("Similarity search failed: %s", e)
         return RelevantMeetingsResponse(meetings=[])
-    if not neighbors:
-        return RelevantMeetingsResponse(meetings=[])
-
-    # 3) fetch metadata for each neighbor
-    # Prepare lists for the filter function
-    source_tables = [n["source_table"] for n in neighbors]
-    source_ids = [n["source_id"] for n in neighbors]
-
-    rpc_params: dict = {
-        "source_tables": source_tables,
-        "source_ids": source_ids,
-        "max_results": k,
-    }
-
-    try:
-        rows = (
-            supabase.rpc(
-                "get_meetings_by_filter",
-                rpc_params,
-            )
-            .execute()
-            .data
-        )
-    except Exception:
-        logger.exception("Unexpected error fetching meetings with filter")
-        return RelevantMeetingsResponse(meetings=[])
 
-    fetched = {}
-    for row in rows:
-        fetched[(row["source_table"], row["source_id"])] = row
-
-    # 4) assemble ordered list, injecting similarity
-    for n in neighbors:
-        key = (n["source_table"], n["source_id"])
-        row = fetched.get(key)
-        if not row:
-            logger.debug("No metadata found for %s %s", *key)
+    # 3) assemble the ordered list, injecting the rerank scores
+    for result in rerank_resp.results:
+        if result.relevance_score <= 0.05:
             continue
-
-        # carry over similarity
-        row["similarity"] = n.get("similarity")
+        row = neighbors[result.index]
+        row["similarity"] = result.relevance_score
         try:
             meetings.append(Meeting.model_validate(row))
         except ValidationError as ve:
@@ -0,0 +1,334 @@
+"""Reranking of vector search candidates with a score cache and candidate pruning.
+
+``rerank_neighbors`` sits in front of the reranker used by the semantic searches, the newsletters and the alerts,
+which used to send every candidate (up to 3000 per call) with its full text to Cohere:
+
+- Candidates are pruned to an adaptive budget first: those clearly below the vector similarity distribution
+  (``mean + PRUNE_Z * stdev``) are dropped, keeping between ``MIN_CANDIDATES`` and ``MAX_CANDIDATES``. Results
+  fused with lexical matches are pruned by their ``fusion_score`` instead.
+- Rerank scores depend on the query and the document only, so they are cached per
+  ``(query hash, doc id, doc hash)`` in a per-process LRU and only documents not scored before are sent.
+- Every call records its candidates, cache hits, documents sent, billed search units, estimated cost and latency
+  per caller, see ``/metrics/rerank``.
+
+The scores come from a ``RerankBackend`` chosen by ``RERANK_BACKEND``:
+
+- ``remote`` (default): Cohere ``rerank-v3.5``.
+- ``local``: a sentence-transformers cross-encoder on the CPU, no network round trip. Its scores are calibrated
+  differently than Cohere's, check the thresholds of the call sites with ``scripts/rerank_benchmark.py`` first.
+- ``hybrid``: the cross-encoder pre-filters and Cohere rescores its best ``RERANK_REMOTE_TOP_N`` documents.
+"""
+
+import hashlib
+import logging
+import math
+import statistics
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.core.cohere_client import RERANK_MODEL, rerank
+from app.core.config import Settings
+from app.core.rate_limits import Priority
+
+logger = logging.getLogger(__name__)
+
+SCORE_CACHE_SIZE = 200_000
+MIN_CANDIDATES = 100
+MAX_CANDIDATES = 500
+PRUNE_Z = 0.5
+DOCS_PER_SEARCH_UNIT = 100  # Cohere bills one search unit per query and 100 documents
+USD_PER_SEARCH_UNIT = 0.002  # rerank-v3.5: $2 per 1000 search units
+LATENCY_SAMPLES = 500
+LOCAL_BATCH_SIZE = 32  # query-document pairs per cross-encoder forward pass
+LOCAL_MAX_TOKENS = 256  # query and document tokens the cross-encoder sees, longer inputs are truncated
+LOCAL_MAX_CHARS = 2000  # documents are cut before tokenization, the tokens beyond would be truncated anyway
+LOCAL_WORKERS = 1  # torch uses several cores per forward pass already
+
+
+@dataclass
+class RerankHit:
+    index: int  # position in the neighbors passed to rerank_neighbors
+    relevance_score: float
+
+
+@dataclass
+class RerankResponse:
+    """Shaped like Cohere's rerank response, results are ordered by relevance."""
+
+    results: list[RerankHit]
+
+
+@dataclass
+class RerankStats:
+    calls: int = 0
+    candidates: int = 0
+    pruned: int = 0
+    cache_hits: int = 0
+    documents_sent: int = 0
+    search_units: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def snapshot(self) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        scored = self.cache_hits + self.documents_sent
+        return {
+            "calls": self.calls,
+            "candidates": self.candidates,
+            "pruned": self.pruned,
+            "cache_hits": self.cache_hits,
+            "documents_sent": self.documents_sent,
+            "cache_hit_ratio": self.cache_hits / scored if scored else None,
+            "search_units": self.search_units,
+            "estimated_cost_usd": round(self.search_units * USD_PER_SEARCH_UNIT, 4),
+            "latency_p50_ms": 1000 * latencies[len(latencies) // 2] if latencies else None,
+            "latency_p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            if latencies
+            else None,
+        }
+
+
+class RerankBackend(ABC):
+    name: str
+
+    @abstractmethod
+    def score(
+        self, query: str, documents: list[str], caller: str, priority: Priority
+    ) -> tuple[list[float | None], int]:
+        """
+        Relevance of every document to query, and the search units billed for it.
+        None marks documents the backend dropped without a score of their own, they are not cached.
+        """
+
+
+class CohereRerankBackend(RerankBackend):
+    name = RERANK_MODEL
+
+    def score(
+        self, query: str, documents: list[str], caller: str, priority: Priority
+    ) -> tuple[list[float | None], int]:
+        response = rerank(query=query, documents=documents, top_n=len(documents), caller=caller, priority=priority)
+        scores: list[float | None] = [None] * len(documents)
+        for result in response.results:
+            scores[result.index] = result.relevance_score
+        return scores, _search_units(response, len(documents))
+
+
+class CrossEncoderRerankBackend(RerankBackend):
+    """
+    A local sentence-transformers cross-encoder. Inputs are truncated and scored in batches on a small thread
+    pool, so concurrent requests queue for the CPU instead of competing for it.
+    """
+
+    def __init__(self, model_name: str, workers: int = LOCAL_WORKERS):
+        self.name = model_name
+        self._model: Any = None
+        self._model_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="CrossEncoder")
+
+    def _load(self):
+        with self._model_lock:
+            if self._model is None:
+                # imported on first use: torch is only needed when the local backend is selected
+                from sentence_transformers import CrossEncoder
+
+                logger.info(f"Loading cross-encoder '{self.name}'")
+                self._model = CrossEncoder(self.name, max_length=LOCAL_MAX_TOKENS)
+            return self._model
+
+    def _predict(self, query: str, documents: list[str]) -> list[float]:
+        model = self._load()
+        pairs = [(query, document[:LOCAL_MAX_CHARS]) for document in documents]
+        logits = model.predict(pairs, batch_size=LOCAL_BATCH_SIZE, show_progress_bar=False)
+        # the logits of MS MARCO cross-encoders, mapped to 0..1 like Cohere's relevance scores
+        return [1 / (1 + math.exp(-float(logit))) for logit in logits]
+
+    def score(
+        self, query: str, documents: list[str], caller: str, priority: Priority
+    ) -> tuple[list[float | None], int]:
+        return list(self._pool.submit(self._predict, query, documents).result()), 0
+
+
+class HybridRerankBackend(RerankBackend):
+    """
+    The local backend pre-filters, the remote one rescores the remote_top_n best documents. The others keep their
+    local score shifted below 0, so they rank after every remotely scored document instead of being dropped.
+    """
+
+    def __init__(self, local: RerankBackend, remote: RerankBackend, remote_top_n: int):
+        self.name = f"{local.name}+{remote.name}@{remote_top_n}"
+        self.local = local
+        self.remote = remote
+        self.remote_top_n = remote_top_n
+
+    def score(
+        self, query: str, documents: list[str], caller: str, priority: Priority
+    ) -> tuple[list[float | None], int]:
+        local_scores, _ = self.local.score(query, documents, caller, priority)
+        ranked = sorted(range(len(documents)), key=lambda i: local_scores[i] or 0.0, reverse=True)
+        best = ranked[: self.remote_top_n]
+        remote_scores, search_units = self.remote.score(query, [documents[i] for i in best], caller, priority)
+        # relevance scores are within 0..1
+        scores: list[float | None] = [(local_scores[i] or 0.0) - 1 for i in range(len(documents))]
+        for i, score in zip(best, remote_scores, strict=True):
+            scores[i] = score
+        return scores, search_units
+
+
+def make_rerank_backend(kind: str, local_model: str, remote_top_n: int) -> RerankBackend:
+    if kind == "remote":
+        return CohereRerankBackend()
+    if kind == "local":
+        return CrossEncoderRerankBackend(local_model)
+    if kind == "hybrid":
+        return HybridRerankBackend(CrossEncoderRerankBackend(local_model), CohereRerankBackend(), remote_top_n)
+    raise ValueError(f"Unknown rerank backend '{kind}', expected remote, local or hybrid")
+
+
+_backend: RerankBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_rerank_backend() -> RerankBackend:
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            settings = Settings()
+            _backend = make_rerank_backend(
+                settings.get_rerank_backend(), settings.get_rerank_local_model(), settings.get_rerank_remote_top_n()
+            )
+        return _backend
+
+
+_scores: OrderedDict[str, float] = OrderedDict()
+_stats: dict[str, RerankStats] = {}
+_lock = threading.Lock()
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:32]
+
+
+def _score_key(query_hash: str, neighbor: dict) -> str:
+    doc_id = f"{neighbor.get('source_table')}:{neighbor.get('source_id')}"
+    return f"{query_hash}:{doc_id}:{_hash(neighbor.get('content_text') or '')}"
+
+
+def _cached_scores(keys: list[str]) -> dict[str, float]:
+    with _lock:
+        found = {}
+        for key in keys:
+            score = _scores.get(key)
+            if score is not None:
+                _scores.move_to_end(key)
+                found[key] = score
+        return found
+
+
+def _store_scores(scores: dict[str, float]):
+    with _lock:
+        for key, score in scores.items():
+            _scores[key] = score
+            _scores.move_to_end(key)
+        while len(_scores) > SCORE_CACHE_SIZE:
+            _scores.popitem(last=False)
+
+
+def candidate_budget(similarities: list[float], min_candidates: int = MIN_CANDIDATES) -> int:
+    """
+    How many of the candidates, ordered by vector similarity, are worth reranking.
+    Those below mean + PRUNE_Z * stdev of the similarities are dropped, within [min_candidates, MAX_CANDIDATES].
+    """
+    if len(similarities) <= min_candidates:
+        return len(similarities)
+    cutoff = statistics.fmean(similarities) + PRUNE_Z * statistics.pstdev(similarities)
+    above = sum(1 for similarity in similarities if similarity >= cutoff)
+    return min(len(similarities), max(min_candidates, min(above, MAX_CANDIDATES)))
+
+
+def _retrieval_score(neighbor: dict) -> float:
+    if "fusion_score" in neighbor:
+        return neighbor["fusion_score"]
+    return neighbor.get("similarity") or 0.0
+
+
+def prune_candidates(neighbors: list[dict], top_n: int = 0, min_candidates: int = MIN_CANDIDATES) -> list[int]:
+    """
+    Indices of the neighbors to rerank, those with the best retrieval scores within candidate_budget.
+    :param top_n: Results the caller asked for, never pruned below that.
+    """
+    order = sorted(range(len(neighbors)), key=lambda i: _retrieval_score(neighbors[i]), reverse=True)
+    budget = candidate_budget([_retrieval_score(neighbors[i]) for i in order], min_candidates)
+    return order[: max(top_n, budget)]
+
+
+def _search_units(response: Any, documents: int) -> int:
+    billed = getattr(getattr(getattr(response, "meta", None), "billed_units", None), "search_units", None)
+    if billed is not None:
+        return int(billed)
+    return -(-documents // DOCS_PER_SEARCH_UNIT)
+
+
+def rerank_neighbors(
+    query: str,
+    neighbors: list[dict],
+    top_n: int,
+    caller: str,
+    priority: Priority = Priority.INTERACTIVE,
+    prune: bool = True,
+) -> RerankResponse:
+    """
+    Reranks vector search candidates by their content_text, reusing the cached scores of documents seen before.
+    :param neighbors: Candidates as returned by get_top_k_neighbors.
+    :param top_n: Number of results to return at most.
+    :param prune: Whether candidates below the similarity budget are dropped before reranking, keeping at least
+        top_n.
+    """
+    started = time.monotonic()
+    backend = get_rerank_backend()
+    indices = prune_candidates(neighbors, top_n) if prune else list(range(len(neighbors)))
+    query_hash = _hash(f"{backend.name}:{query}")
+    keys = {i: _score_key(query_hash, neighbors[i]) for i in indices}
+    cached = _cached_scores(list(keys.values()))
+    scores = {i: cached[keys[i]] for i in indices if keys[i] in cached}
+
+    missing = [i for i in indices if i not in scores]
+    search_units = 0
+    if missing:
+        # all missing documents are scored and cached, top_n only applies to the combined ranking
+        missing_scores, search_units = backend.score(
+            query, [neighbors[i].get("content_text") or "" for i in missing], caller, priority
+        )
+        fresh = {i: score for i, score in zip(missing, missing_scores, strict=True) if score is not None}
+        _store_scores({keys[i]: score for i, score in fresh.items()})
+        scores.update(fresh)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_n]
+    latency = time.monotonic() - started
+    with _lock:
+        stats = _stats.setdefault(caller, RerankStats())
+        stats.calls += 1
+        stats.candidates += len(neighbors)
+        stats.pruned += len(neighbors) - len(indices)
+        stats.cache_hits += len(indices) - len(missing)
+        stats.documents_sent += len(missing)
+        stats.search_units += search_units
+        stats.latencies.append(latency)
+    logger.info(
+        f"{caller}: reranked {len(indices)}/{len(neighbors)} candidates, {len(missing)} sent, "
+        f"{search_units} search units, {latency * 1000:.0f}ms"
+    )
+    return RerankResponse(results=[RerankHit(index=i, relevance_score=score) for i, score in ranked])
+
+
+def get_rerank_metrics() -> dict[str, Any]:
+    with _lock:
+        return {
+            "backend": _backend.name if _backend is not None else None,
+            "cached_scores": len(_scores),
+            "callers": {caller: stats.snapshot() for caller, stats in _stats.items()},
+        }
@@ -0,0 +1,163 @@
+"""Per-run metrics of scheduled jobs and their aggregation for ``/scheduler/metrics``.
+
+Counters are process-wide: a job's external calls are the difference of the counters before and after the run.
+That is exact for process jobs, each worker runs one job at a time; for thread jobs that overlap with other
+thread jobs the numbers include the calls of those jobs as well. The same holds for the sampled peak RSS.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from statistics import median
+from typing import Any
+
+from app.core.rate_limits import get_rate_limit_metrics
+
+logger = logging.getLogger(__name__)
+
+RSS_SAMPLE_INTERVAL_SECONDS = 0.5
+SLOW_RUN_FACTOR = 2.0  # a run is flagged if it took this many times the median of its baseline
+BASELINE_RUNS = 10  # successful runs before the latest one that form the baseline
+MIN_BASELINE_RUNS = 3
+
+_http_requests = 0
+_http_lock = threading.Lock()
+_http_counter_installed = False
+
+
+def install_http_counter() -> None:
+    """Counts every request sent through the requests library, scrapers use it for most of their fetching."""
+    global _http_counter_installed
+    if _http_counter_installed:
+        return
+    try:
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return
+
+    original_send = HTTPAdapter.send
+
+    def send(adapter, request, **kwargs):
+        global _http_requests
+        with _http_lock:
+            _http_requests += 1
+        return original_send(adapter, request, **kwargs)
+
+    HTTPAdapter.send = send
+    _http_counter_installed = True
+
+
+def external_calls() -> int:
+    """HTTP requests plus rate-limited model API calls (OpenAI, Cohere, LiteLLM) made by this process so far."""
+    model_calls = sum(stats["calls"] for stats in get_rate_limit_metrics()["callers"].values())
+    return _http_requests + model_calls
+
+
+def _current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class RunRecorder:
+    """
+    Measures one job run: wall time, external calls and peak RSS (sampled in a background thread).
+
+    Use as a context manager; the measured values are available afterwards as attributes.
+    """
+
+    def __init__(self):
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.duration_seconds = 0.0
+        self.external_calls: int | None = 0
+        self.peak_rss_mb: float | None = 0.0
+        self._calls_before = 0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def _sample(self):
+        while True:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, _current_rss_mb())
+            if self._stop.wait(RSS_SAMPLE_INTERVAL_SECONDS):
+                return
+
+    def __enter__(self) -> "RunRecorder":
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+        self._calls_before = external_calls()
+        self._sampler = threading.Thread(target=self._sample, daemon=True, name="RssSampler")
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.peak_rss_mb = max(self.peak_rss_mb or 0.0, _current_rss_mb())
+        self.duration_seconds = time.monotonic() - self._started
+        self.finished_at = datetime.now()
+        self.external_calls = external_calls() - self._calls_before
+
+
+def _percentile(sorted_values: list[float], q: float) -> float | None:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize_runs(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Aggregates rows of scheduled_job_runs per job: duration percentiles, daily throughput and slow-run flag.
+
+    :param runs: Rows with name, started_at (ISO string), duration_seconds, rows_written and exit_reason.
+    """
+    by_job: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        if run.get("started_at") and run.get("duration_seconds") is not None:
+            by_job[run["name"]].append(run)
+
+    summary = {}
+    for name, job_runs in by_job.items():
+        job_runs.sort(key=lambda r: r["started_at"])
+        durations = sorted(float(r["duration_seconds"]) for r in job_runs)
+
+        rows_per_second_by_day: dict[str, list[float]] = defaultdict(list)
+        for run in job_runs:
+            if run["duration_seconds"] > 0:
+                rows_per_second_by_day[run["started_at"][:10]].append(
+                    (run.get("rows_written") or 0) / run["duration_seconds"]
+                )
+
+        latest = job_runs[-1]
+        baseline = [
+            float(r["duration_seconds"]) for r in job_runs[:-1] if r.get("exit_reason") == "success"
+        ][-BASELINE_RUNS:]
+        baseline_seconds = median(baseline) if len(baseline) >= MIN_BASELINE_RUNS else None
+        slow = baseline_seconds is not None and latest["duration_seconds"] > SLOW_RUN_FACTOR * baseline_seconds
+
+        summary[name] = {
+            "runs": len(job_runs),
+            "duration_p50_seconds": _percentile(durations, 0.5),
+            "duration_p95_seconds": _percentile(durations, 0.95),
+            "rows_per_second_by_day": {
+                day: median(values) for day, values in sorted(rows_per_second_by_day.items())
+            },
+            "latest": {
+                "started_at": latest["started_at"],
+                "duration_seconds": latest["duration_seconds"],
+                "rows_written": latest.get("rows_written"),
+                "exit_reason": latest.get("exit_reason"),
+            },
+            "baseline_duration_seconds": baseline_seconds,
+            "slow": slow,
+        }
+    return summary
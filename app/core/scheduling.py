@@ -8,11 +8,68 @@ from typing import Callable
 
 import schedule
 
+from app.core.config import Settings
+from app.core.job_executor import JobExecutor, JobPriority, ResourceClass
+from app.core.leader import LeaderElector
 from app.core.mail.notify_job_failure import notify_job_failure
+from app.core.model_server import start_model_server
+from app.core.run_metrics import RunRecorder, install_http_counter
 from app.core.supabase_client import supabase
+from app.core.worker_pool import WorkerPool, job_target
 from app.data_sources.scraper_base import ScraperResult
 
 TABLE_NAME = "scheduled_job_runs"
+LATEST_RUNS_VIEW = "v_latest_job_runs"
+RUNNING = "running"  # exit_reason of a started run that has not finished yet
+
+
+class RunWriter:
+    """
+    Write-behind buffer for scheduled_job_runs: finished runs are inserted in batches by a background thread,
+    so jobs don't wait for the database. The scheduler keeps last_run_at in memory, flush() on shutdown.
+    Runs of MAIL jobs bypass it, see ScheduledJob.mark_started.
+    :param flush_interval_seconds: Max. time a run stays in the buffer.
+    :param max_batch: Number of buffered runs that triggers a flush right away.
+    :param max_buffered: Runs kept for a retry while the database is unreachable; older ones are dropped.
+    """
+
+    def __init__(self, flush_interval_seconds: float = 5.0, max_batch: int = 50, max_buffered: int = 1000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_batch = max_batch
+        self.max_buffered = max_buffered
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._rows: list[dict] = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def add(self, row: dict):
+        with self._cond:
+            self._rows.append(row)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="RunWriter")
+                self._thread.start()
+            if len(self._rows) >= self.max_batch:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._rows) >= self.max_batch, timeout=self.flush_interval_seconds)
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._cond:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                supabase.table(TABLE_NAME).insert(rows).execute()
+            except Exception as e:
+                self.logger.error(f"Failed to store {len(rows)} job runs, retrying with the next flush: {e}")
+                with self._cond:
+                    self._rows = (rows + self._rows)[-self.max_buffered :]
 
 
 class ScheduledJob:
@@ -20,63 +77,119 @@ class ScheduledJob:
         self,
         name: str,
         func: Callable[[multiprocessing.synchronize.Event], typing.Any],
-        job_schedule: schedule.Job,
+        job_schedule: schedule.Job | None,
         timeout_minutes: int,
         run_in_process: bool = False,
+        resource_class: ResourceClass = ResourceClass.API,
+        priority: JobPriority = JobPriority.NORMAL,
+        worker_pool: WorkerPool | None = None,
+        run_writer: RunWriter | None = None,
     ):
         """
         Initializes a ScheduledJob instance.
         :param name: Unique name for the job.
         :param func: The function to run for this job. Will receive the stop_event as parameter.
             stop_event is required to ensure developers handle stopping the job gracefully.
+        :param job_schedule: When the job becomes due; None for jobs that only run when triggered by other jobs.
         :param timeout_minutes: Timeout in minutes for the job to complete.
-        :param run_in_process: If True, runs the job in a separate process; otherwise, runs in a thread.
+        :param run_in_process: If True, runs the job in a process of worker_pool; otherwise, runs in a thread.
+        :param resource_class: Concurrency class the job counts against in the executor.
+        :param priority: Queue priority of the job when it waits for capacity.
+        :param worker_pool: Pool of warm worker processes, required for jobs with run_in_process.
+        :param run_writer: Buffer the job's runs are stored through; written directly if None.
+            last_run_at is loaded for all jobs at once by the scheduler.
         """
+        if run_in_process and worker_pool is None:
+            raise ValueError(f"Job '{name}' runs in a process and needs a worker pool.")
+        if run_in_process:
+            job_target(func)  # raises at registration rather than on the first run
         self.logger = logging.getLogger(self.__class__.__name__)
         self.name = name
         self.func = func
         self.job_schedule = job_schedule
         self.timeout = timedelta(minutes=timeout_minutes)
         self.run_in_process = run_in_process
+        self.resource_class = resource_class
+        self.priority = priority
+        self.worker_pool = worker_pool
+        self.run_writer = run_writer
         self.last_run_at: datetime | None = None
+        # start of the latest run if it has not finished, as recorded in scheduled_job_runs
+        self.running_since: datetime | None = None
+        self._run_id: int | None = None
         self.success: bool = False
         self.result: ScraperResult | None = None
         self.error: Exception | None = None
         self.stop_event: multiprocessing.synchronize.Event = multiprocessing.Event()
 
+    @property
+    def records_start(self) -> bool:
+        """Mail jobs must not be repeated by a new leader, so their runs are visible while they are running."""
+        return self.resource_class is ResourceClass.MAIL
+
+    def mark_started(self, started_at: datetime):
+        """Inserts the row of a run that has started, it is completed by mark_just_ran."""
+        self._run_id = None
         try:
-            result = (
+            response = (
                 supabase.table(TABLE_NAME)
-                .select("last_run_at")
-                .eq("name", name)
-                .order("last_run_at", desc=True)
-                .limit(1)
+                .insert(
+                    {
+                        "name": self.name,
+                        "last_run_at": started_at.isoformat(),
+                        "started_at": started_at.isoformat(),
+                        "exit_reason": RUNNING,
+                    }
+                )
                 .execute()
             )
-            if result.data and len(result.data) == 1 and result.data[0].get("last_run_at"):
-                self.last_run_at = datetime.fromisoformat(result.data[0]["last_run_at"])
-                self.logger.info(f"Loaded last run for '{name}': {self.last_run_at}")
+            self._run_id = response.data[0]["id"] if response.data else None
         except Exception as e:
-            self.logger.error(f"Failed to load last run for job '{name}': {e}")
+            self.logger.error(f"Failed to record the start of job '{self.name}': {e}")
 
-    def mark_just_ran(self):
+    def mark_just_ran(self, recorder: RunRecorder | None = None, exit_reason: str | None = None):
         now = datetime.now()
         self.last_run_at = now
+        # Some jobs are not scraper jobs and there don't return a scraper result. Handle it by checking for None.
+        result = self.result
+        # every run has all columns, so buffered runs can be inserted in one batch
+        run = {
+            "name": self.name,
+            "last_run_at": now.isoformat(),
+            "success": self.success if result is None else result.success,
+            "inserted_rows": 0 if result is None else result.lines_added,
+            "error_msg": repr(self.error) if result is None else repr(result.error),
+            "exit_reason": exit_reason,
+            "rows_scraped": None if result is None else result.rows_scraped,
+            "rows_written": None if result is None else result.lines_added,
+            "rows_skipped": None if result is None else max(0, result.rows_scraped - result.lines_added),
+            "started_at": recorder.started_at.isoformat() if recorder and recorder.started_at else None,
+            "finished_at": recorder.finished_at.isoformat() if recorder and recorder.finished_at else None,
+            "duration_seconds": recorder.duration_seconds if recorder else None,
+            "external_calls": recorder.external_calls if recorder else None,
+            "peak_rss_mb": recorder.peak_rss_mb if recorder else None,
+        }
+        if self.run_writer is not None and not self.records_start:
+            self.run_writer.add(run)
+            return
+        run_id, self._run_id = self._run_id, None
         try:
-            # Some jobs are not scraper jobs and there don't return a scraper result. Handle it by checking for None.
-            is_result_none = self.result is None
-            supabase.table(TABLE_NAME).upsert(
-                {
-                    "name": self.name,
-                    "last_run_at": now.isoformat(),
-                    "success": self.success if is_result_none else self.result.success,
-                    "inserted_rows": 0 if is_result_none else self.result.lines_added,
-                    "error_msg": repr(self.error) if is_result_none else repr(self.result.error),
-                },
-            ).execute()
+            if run_id is not None:
+                supabase.table(TABLE_NAME).update(run).eq("id", run_id).execute()
+            else:
+                supabase.table(TABLE_NAME).insert(run).execute()
         except Exception as e:
             self.logger.error(f"Failed to update last run time for job '{self.name}': {e}")
 
+    def _exit_reason(self, timed_out: bool) -> str:
+        if timed_out:
+            return "timeout"
+        if self.error is not None:
+            return "error"
+        if self.result is not None and not self.result.success:
+            return "failed"
+        return "success" if self.success else "error"
+
     def _run(self):
         self.success = False
         self.error = None
@@ -90,50 +203,58 @@ class ScheduledJob:
             self.logger.error(f"Error in job '{self.name}': {e}")
             self.error = e
             notify_job_failure(self.name, e)
-        finally:
-            self.mark_just_ran()
 
     def execute(self):
         """
-        Executes the job, either in a separate thread or process.
+        Executes the job, either in a separate thread or process, and blocks until it finished.
         If the job does not complete within the specified timeout, it will log an error and notify of the failure.
         Since threads cannot be killed safely, they are gracefully stopped using the
         stop_event which must be checked periodically by the job itself.
         """
         timeout_seconds = self.timeout.total_seconds()
         timeout_error = f"Timeout: Job '{self.name}' timed out after {(timeout_seconds / 60):.2f} minutes."
+        # a previous run may have timed out and left the event set
+        self.stop_event.clear()
 
-        if self.run_in_process:
-            proc = multiprocessing.Process(target=self._run, daemon=True)
-            proc.start()
-
-            def monitor_process():
-                proc.join(timeout=timeout_seconds)
-                if proc.is_alive():
+        with RunRecorder() as recorder:
+            if self.records_start and recorder.started_at is not None:
+                self.mark_started(recorder.started_at)
+            if self.run_in_process:
+                # Scrapy's reactor cannot be restarted, so scrapy jobs don't share their worker with later jobs
+                outcome = self.worker_pool.run(
+                    self.name, self.func, timeout_seconds, single_use=self.resource_class is ResourceClass.SCRAPY
+                )
+                timed_out = outcome.timed_out
+                if outcome.timed_out:
+                    # the worker was killed, so the job itself could not record its run
                     self.logger.error(timeout_error)
                     notify_job_failure(self.name, "Timeout reached")
-                    proc.terminate()
-                    # log job run in db manually, because when killing
-                    # the process self.mark_just_ran() in _run() won't be reached
                     self.success = False
+                    self.result = None
                     self.error = Exception("Timeout reached")
-                    self.mark_just_ran()
-
-            threading.Thread(target=monitor_process, daemon=True).start()
-
-        else:
-            thread = threading.Thread(target=self._run, daemon=True)
-            thread.start()
+                else:
+                    self.success = outcome.ok
+                    self.result = outcome.value if isinstance(outcome.value, ScraperResult) else None
+                    self.error = None if outcome.ok else Exception(outcome.error)
+                    if not outcome.ok:
+                        notify_job_failure(self.name, self.error)
 
-            def monitor_thread():
+            else:
+                thread = threading.Thread(target=self._run, daemon=True)
+                thread.start()
                 thread.join(timeout=timeout_seconds)
-                if thread.is_alive():
+                timed_out = thread.is_alive()
+                if timed_out:
                     self.logger.error(timeout_error + " Waiting gracefully for the thread to stop.")
                     self.stop_event.set()  # signal the thread to stop if it supports it
                     notify_job_failure(self.name, "Timeout reached")
                     thread.join()  # finally wait for the thread to cleanup and finish
 
-            threading.Thread(target=monitor_thread, daemon=True).start()
+        if self.run_in_process:
+            # measured in the worker, the scheduler process only waited for it; unknown if the worker was killed
+            recorder.external_calls = outcome.external_calls
+            recorder.peak_rss_mb = outcome.peak_rss_mb
+        self.mark_just_ran(recorder, self._exit_reason(timed_out))
 
 
 class JobScheduler:
@@ -143,44 +264,273 @@ class JobScheduler:
         self.logger = logging.getLogger(self.__class__.__name__)
         self._stop_event = threading.Event()
         self._scheduler_thread = None
+        # job DAG: upstream jobs a job waits for, and the jobs triggered when a job finished
+        self.depends_on: dict[str, list[str]] = {}
+        self.triggered_by: dict[str, list[str]] = {}
+        self.triggers: dict[str, list[str]] = {}
+        # jobs that want to run but wait for an upstream job (or a running copy of themselves), with the reason
+        self._waiting: dict[str, str] = {}
+        self._dag_lock = threading.RLock()
+        settings = Settings()
+        class_limits = {c: settings.get_job_class_limit(c.value) for c in ResourceClass}
+        self.executor = JobExecutor(
+            max_threads=settings.get_job_max_threads(),
+            max_processes=settings.get_job_max_processes(),
+            class_limits={c: limit for c, limit in class_limits.items() if limit is not None},
+            on_finished=self._on_job_finished,
+        )
+        self.worker_pool = WorkerPool(
+            size=settings.get_job_max_processes(),
+            max_jobs=settings.get_job_worker_max_jobs(),
+            max_rss_mb=settings.get_job_worker_max_rss_mb(),
+        )
+        install_http_counter()
+        self.run_writer = RunWriter()
+        self.catch_up_window = timedelta(hours=settings.get_job_catch_up_hours())
+        self.elector: LeaderElector | None = None
+        if settings.is_scheduler_leader_election_enabled():
+            self.elector = LeaderElector(
+                holder=settings.get_scheduler_instance_id(),
+                address=settings.get_scheduler_advertise_url(),
+                ttl_seconds=settings.get_scheduler_lease_ttl_seconds(),
+                on_elected=self._on_elected,
+                on_demoted=self._on_demoted,
+            )
+
+    @property
+    def is_leader(self) -> bool:
+        return self.elector is None or self.elector.is_leader
+
+    @property
+    def leader_address(self) -> str | None:
+        return None if self.elector is None else self.elector.leader_address
+
+    def _on_elected(self):
+        if Settings().is_model_server_enabled():
+            # started before any job runs, so process jobs inherit the server address
+            start_model_server()
+        # forked after the model server started, so the workers inherit its address
+        self.worker_pool.start()
+        # fresh state: another instance may have run jobs while it was leading
+        self.load_state()
+        self._catch_up()
+
+    def _on_demoted(self):
+        # running jobs finish, but nothing new is started here; the new leader owns the schedule now
+        with self._dag_lock:
+            self._waiting.clear()
+
+    def load_state(self):
+        """Loads last_run_at and unfinished runs of all registered jobs with one query."""
+        if not self.jobs:
+            return
+        try:
+            response = (
+                supabase.table(LATEST_RUNS_VIEW)
+                .select("name, last_run_at, exit_reason")
+                .in_("name", list(self.jobs))
+                .execute()
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to load the last runs of the scheduled jobs: {e}")
+            return
+        for row in response.data or []:
+            job = self.jobs.get(row["name"])
+            if job is None or not row.get("last_run_at"):
+                continue
+            last_run_at = datetime.fromisoformat(row["last_run_at"])
+            job.running_since = last_run_at if row.get("exit_reason") == RUNNING else None
+            # runs of this instance may still sit in the write buffer
+            if job.last_run_at is None or last_run_at > job.last_run_at:
+                job.last_run_at = last_run_at
+        self.logger.info(f"Loaded the last runs of {len(response.data or [])} scheduled jobs")
+
+    def _catch_up(self):
+        """
+        Queues scheduled jobs whose latest slot passed without a run, e.g. during a restart or a leader change,
+        once per job and only for slots within the catch-up window. The executor applies the usual class limits.
+        Jobs that never ran are left to their next slot, and so are jobs whose latest run has not finished (unless it
+        started longer than the job's timeout ago, then its instance died).
+        """
+        now = datetime.now()
+        for job in self.jobs.values():
+            job_schedule = job.job_schedule
+            if job_schedule is None or job_schedule.next_run is None or job_schedule.unit is None:
+                continue
+            if job_schedule.next_run <= now:
+                # the slot passed while no instance was leading, move on to the next one and catch up once
+                job_schedule._schedule_next_run()
+            missed_slot = job_schedule.next_run - timedelta(**{job_schedule.unit: job_schedule.interval})
+            if job.last_run_at is None or job.last_run_at >= missed_slot or now - missed_slot > self.catch_up_window:
+                continue
+            if job.running_since is not None and now - job.running_since < job.timeout:
+                self.logger.info(f"Not catching up on job '{job.name}', its run from {job.running_since} is unfinished")
+                continue
+            self.logger.info(f"Catching up on job '{job.name}', missed its slot at {missed_slot}")
+            self._request_run(job, "catch-up")
 
     def start(self):
-        """Start the background scheduler thread."""
+        """Start the background scheduler thread. Jobs only run while this instance is the leader."""
         if self._scheduler_thread and self._scheduler_thread.is_alive():
             return
 
+        if self.elector is None:
+            self._on_elected()
+        else:
+            # the first attempt runs synchronously, so a single instance starts leading right away
+            self.elector.try_acquire()
+            self.elector.start()
+
         self._stop_event.clear()
         self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True, name="JobScheduler")
         self._scheduler_thread.start()
         self.logger.info("Started background scheduler thread")
 
+    def stop(self):
+        """Stops scheduling, stores buffered runs and hands the leadership over right away."""
+        self._stop_event.set()
+        self.run_writer.flush()
+        if self.elector is not None:
+            self.elector.stop()
+
     def _run_scheduler(self):
         """Background thread that runs pending jobs every minute."""
         while not self._stop_event.wait(60):  # Run every 60 seconds
-            schedule.run_pending()
+            if self.is_leader:
+                schedule.run_pending()
 
     def register(
         self,
         name: str,
         func: Callable[[multiprocessing.synchronize.Event], typing.Any],
-        job_schedule: schedule.Job,
+        job_schedule: schedule.Job | None = None,
         run_in_process: bool = False,
         timeout_minutes: int = 15,
+        resource_class: ResourceClass = ResourceClass.API,
+        priority: JobPriority = JobPriority.NORMAL,
+        depends_on: list[str] | None = None,
+        triggered_by: list[str] | None = None,
     ):
+        """
+        Registers a job.
+        :param job_schedule: When the job becomes due. Optional for jobs that are triggered by other jobs.
+        :param depends_on: Upstream jobs; a due job waits until none of them is queued, running or waiting.
+        :param triggered_by: Upstream jobs; the job is queued whenever one of them stored new rows
+            (or, for jobs that don't return a ScraperResult, finished successfully).
+        Upstream jobs must be registered before, which keeps the job graph acyclic.
+        """
         if name in self.job_names:
             raise ValueError(f"Job '{name}' is already registered, name must be unique.")
+        if job_schedule is None and not triggered_by:
+            raise ValueError(f"Job '{name}' needs a schedule or upstream jobs that trigger it.")
+        unknown = [upstream for upstream in [*(depends_on or []), *(triggered_by or [])] if upstream not in self.jobs]
+        if unknown:
+            raise ValueError(f"Upstream jobs {unknown} of job '{name}' must be registered first.")
 
         self.job_names.add(name)
-        job = ScheduledJob(name, func, job_schedule, timeout_minutes, run_in_process)
+        job = ScheduledJob(
+            name,
+            func,
+            job_schedule,
+            timeout_minutes,
+            run_in_process,
+            resource_class,
+            priority,
+            self.worker_pool,
+            self.run_writer,
+        )
         self.jobs[name] = job
+        self.depends_on[name] = list(depends_on or [])
+        self.triggered_by[name] = list(triggered_by or [])
+        for upstream in triggered_by or []:
+            self.triggers.setdefault(upstream, []).append(name)
+
+        if job_schedule is not None:
+            # due jobs only get queued, the executor starts them once their resource class has capacity
+            job_schedule.do(self._request_run, job, "schedule")
+        logging.info(
+            f"Registered job '{name}' ({resource_class.value}, {priority.name}) with schedule: {job_schedule}; "
+            f"depends on: {depends_on or []}; triggered by: {triggered_by or []}; "
+            f"and timeout: {timeout_minutes} minutes"
+        )
+
+    def _is_pending(self, name: str) -> bool:
+        """Whether the job is queued, running, waiting, or will be triggered by a job that is."""
+        if self.executor.is_busy(name) or name in self._waiting:
+            return True
+        return any(self._is_pending(upstream) for upstream in self.triggered_by[name])
 
-        job_schedule.do(job.execute)
-        logging.info(f"Registered job '{name}' with schedule: {job_schedule}; and timeout: {timeout_minutes} minutes")
+    def _is_blocked(self, name: str) -> bool:
+        return any(self._is_pending(upstream) for upstream in self.depends_on[name])
+
+    def _request_run(self, job: ScheduledJob, reason: str, rerun_if_busy: bool = False) -> bool:
+        """
+        Queues job in the executor, or parks it until its upstream jobs finished.
+        Returns False if the job is already queued or running and rerun_if_busy is not set.
+        """
+        with self._dag_lock:
+            if not self.is_leader:
+                self.logger.warning(f"Not running job '{job.name}' ({reason}), this instance is not the leader")
+                return False
+            if job.name in self._waiting:
+                return True
+            if self._is_blocked(job.name) or (rerun_if_busy and self.executor.is_busy(job.name)):
+                self.logger.info(f"Job '{job.name}' ({reason}) waits for upstream jobs or its running copy")
+                self._waiting[job.name] = reason
+                return True
+            return self.executor.submit(job)
+
+    def _on_job_finished(self, job: ScheduledJob):
+        result = job.result if isinstance(job.result, ScraperResult) else None
+        produced = result.lines_added > 0 if result is not None else job.success
+        with self._dag_lock:
+            if produced:
+                for downstream in self.triggers.get(job.name, []):
+                    self._request_run(self.jobs[downstream], f"triggered by {job.name}", rerun_if_busy=True)
+            # release parked jobs in registration order, upstream jobs were registered first
+            for name in [name for name in self.jobs if name in self._waiting]:
+                if not self._is_blocked(name) and not self.executor.is_busy(name):
+                    self.logger.info(f"Releasing job '{name}' ({self._waiting.pop(name)})")
+                    self.executor.submit(self.jobs[name])
 
     def run_job(self, name: str):
         if name not in self.jobs:
             raise ValueError(f"Job '{name}' is not registered.")
-        self.jobs[name].execute()
+        return self._request_run(self.jobs[name], "manual")
+
+    def state(self) -> dict:
+        """Current state of the job DAG and of the executor, for /scheduler."""
+        with self._dag_lock:
+            executor = self.executor.snapshot()
+            jobs = {}
+            for name, job in self.jobs.items():
+                if name in executor["running"]:
+                    status = "running"
+                elif name in executor["queued"]:
+                    status = "queued"
+                elif name in self._waiting:
+                    status = f"waiting ({self._waiting[name]})"
+                else:
+                    status = "idle"
+                jobs[name] = {
+                    "status": status,
+                    "schedule": str(job.job_schedule) if job.job_schedule is not None else None,
+                    "next_run": job.job_schedule.next_run.isoformat()
+                    if job.job_schedule is not None and job.job_schedule.next_run
+                    else None,
+                    "depends_on": self.depends_on[name],
+                    "triggers": self.triggers.get(name, []),
+                    "resource_class": job.resource_class.value,
+                    "priority": job.priority.name,
+                    "last_run_at": job.last_run_at.isoformat() if job.last_run_at else None,
+                    "last_success": job.success,
+                }
+            return {
+                "jobs": jobs,
+                "executor": executor,
+                "worker_pool": self.worker_pool.snapshot(),
+                "leader": self.elector.snapshot() if self.elector is not None else None,
+            }
 
 
 scheduler = JobScheduler()
@@ -0,0 +1,113 @@
+"""Speculative retrieval while the LLM reformulates a search query.
+
+The semantic searches reformulate the query before embedding it, and the LLM call often takes longer than embedding,
+vector search and reranking together. ``speculative_search`` therefore starts the search on the raw query right away
+and gives the reformulation a latency budget (``REFORMULATION_BUDGET_SECONDS``):
+
+- reformulation cached: only the reformulated query is searched, nothing to speculate on,
+- reformulation within budget: its candidates come first, the raw query's fill up the remaining ``k``,
+- reformulation late or failed: the raw query's candidates are used. The reformulation still finishes in the
+  background and is cached, so the next identical search takes the reformulated path.
+
+Every candidate is tagged with the ``retrieval_path`` that found it, "reformulated" or "raw".
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+from app.core.config import Settings
+from app.core.rate_limits import Priority
+from app.core.reformulation import ReformulationPrompt, cached_reformulation, reformulate
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 16
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="SpeculativeRetrieval")
+
+Search = Callable[[str], list[dict]]
+
+
+@dataclass
+class SpeculativeResult:
+    query: str  # the query the candidates should be reranked with
+    neighbors: list[dict]
+    path: str  # "reformulated", "merged" (reformulated plus raw candidates) or "raw"
+
+
+def _neighbor_key(neighbor: dict) -> tuple:
+    return neighbor.get("source_table"), neighbor.get("source_id"), neighbor.get("content_text")
+
+
+def _tagged(neighbors: list[dict], path: str) -> list[dict]:
+    for neighbor in neighbors:
+        neighbor["retrieval_path"] = path
+    return neighbors
+
+
+def _raw_candidates(raw_search: Future, caller: str) -> list[dict]:
+    """The raw query's candidates; a failed search contributes none instead of failing the request."""
+    try:
+        return _tagged(raw_search.result(), "raw")
+    except Exception as e:
+        logger.warning(f"{caller}: search with the raw query failed, continuing without its candidates: {e}")
+        return []
+
+
+def merge_candidates(reformulated: list[dict], raw: list[dict], k: int) -> list[dict]:
+    """The candidates of the reformulated query, followed by those only the raw query found, at most k."""
+    seen = {_neighbor_key(n) for n in reformulated}
+    merged = list(reformulated)
+    for neighbor in raw:
+        if len(merged) >= k:
+            break
+        if _neighbor_key(neighbor) not in seen:
+            seen.add(_neighbor_key(neighbor))
+            merged.append(neighbor)
+    return merged[:k]
+
+
+def speculative_search(
+    prompt: ReformulationPrompt,
+    text: str,
+    search: Search,
+    k: int,
+    caller: str,
+    priority: Priority = Priority.INTERACTIVE,
+    budget_seconds: float | None = None,
+) -> SpeculativeResult:
+    """
+    Candidates for text, searched with its reformulation by prompt or, if that is too slow, with text itself.
+    :param search: Returns the vector search candidates of a query, at most k.
+    :param budget_seconds: How long to wait for the reformulation, REFORMULATION_BUDGET_SECONDS by default.
+    """
+    cached = cached_reformulation(prompt, text)
+    if cached is not None:
+        return SpeculativeResult(query=cached, neighbors=_tagged(search(cached), "reformulated"), path="reformulated")
+
+    if budget_seconds is None:
+        budget_seconds = Settings().get_reformulation_budget_seconds()
+    started = time.monotonic()
+    reformulation = _executor.submit(reformulate, prompt, text, caller, priority)
+    raw_search = _executor.submit(search, text)
+
+    try:
+        reformulated = reformulation.result(timeout=budget_seconds or None)
+    except FutureTimeoutError:
+        reformulated = None
+    waited = time.monotonic() - started
+
+    if reformulated is None or reformulated == text:  # too slow, or the LLM call failed
+        logger.info(f"{caller}: reformulation not ready after {waited:.2f}s, using the raw query's candidates")
+        return SpeculativeResult(query=text, neighbors=_raw_candidates(raw_search, caller), path="raw")
+
+    reformulated_neighbors = _tagged(search(reformulated), "reformulated")
+    raw_neighbors = _raw_candidates(raw_search, caller)
+    neighbors = merge_candidates(reformulated_neighbors, raw_neighbors, k)
+    path = "merged" if len(neighbors) > len(reformulated_neighbors) else "reformulated"
+    logger.info(f"{caller}: reformulated after {waited:.2f}s, {len(neighbors)} candidates ({path})")
+    return SpeculativeResult(query=reformulated, neighbors=neighbors, path=path)
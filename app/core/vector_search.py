@@ -2,11 +2,16 @@ from typing import Optional, Any
 import logging
 from datetime import datetime
 
-from app.core.openai_client import EMBED_MODEL, openai
+from app.core.lexical_index import fuse, get_lexical_index
+from app.core.meeting_index import get_meeting_index
+from app.core.openai_client import create_embeddings
+from app.core.rate_limits import Priority
 from app.core.supabase_client import supabase
 
 logger = logging.getLogger(__name__)
 
+LEXICAL_K = 100  # lexical matches fused into the vector results
+
 
 def get_top_k_neighbors(
     query: Optional[str] = None,
@@ -20,6 +25,8 @@ def get_top_k_neighbors(
     k: int = 5,
     sources: Optional[list[str]] = None,
     source_id: Optional[str] = None,
+    priority: Priority = Priority.INTERACTIVE,
+    hydrate_meetings: bool = False,
 ) -> list[dict]:
     """
     Fetch the top-k nearest neighbors for a text query or a given embedding.
@@ -35,6 +42,9 @@ def get_top_k_neighbors(
         * None or other: combined embeddings
     - allowed_topics/allowed countries only viable for meetings
     - source_id: filter for a specific source_id (for legislative RAG)
+    - priority: rate-limit priority of the query embedding, batch jobs pass Priority.BATCH
+    - hydrate_meetings: meeting searches return their v_meetings columns too (search_meetings_semantic), so no
+      second query is needed to fetch them. Neighbors from the in-process indexes lack them, see meeting_id.
 
     Returns:
         A list of dicts representing matching records.
@@ -46,7 +56,7 @@ def get_top_k_neighbors(
     # Generate embedding if only query is provided
     if embedding is None:
         assert query is not None
-        embedding = openai.embeddings.create(input=query, model=EMBED_MODEL).data[0].embedding
+        embedding = create_embeddings([query], caller="vector_search", priority=priority)[0]
 
     tables = list(allowed_sources or {})
     cols = list((allowed_sources or {}).values())
@@ -56,15 +66,29 @@ def get_top_k_neighbors(
         "match_count": k,
     }
 
+    neighbors: Optional[list[dict]] = None
+    corpus: Optional[str] = None  # lexical index fused with the results of text queries
+    meeting_filters: dict[str, Any] = {}
+
     # Determine which RPC to call based on sources
     if sources == ["document_embeddings"]:
+        if tables == ["legislative_files"] and source_id is None:
+            corpus = "legislative_files"
         rpc_name = "match_filtered"
         if tables:
             rpc_args.update({"src_tables": tables, "content_columns": cols})
         if source_id is not None:
             rpc_args["source_id_param"] = source_id
     elif sources == ["meeting_embeddings"] or allowed_topic_ids or allowed_topics or allowed_countries:
-        rpc_name = "match_filtered_meetings"
+        rpc_name = "search_meetings_semantic" if hydrate_meetings else "match_filtered_meetings"
+        corpus = "meetings"
+        meeting_filters = {
+            "allowed_topics": allowed_topics,
+            "allowed_topic_ids": allowed_topic_ids,
+            "allowed_countries": allowed_countries,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
         rpc_args = {
             "query_embedding": embedding,
             "match_count": k,
@@ -78,16 +102,63 @@ def get_top_k_neighbors(
         }
         # Optionally: Only include keys that are not None to avoid passing nulls unnecessarily
         rpc_args = {k: v for k, v in rpc_args.items() if v is not None}
+
+        # the in-process replica of meeting_embeddings answers without a database round trip, if it is loaded
+        index = get_meeting_index()
+        if index is not None:
+            try:
+                neighbors = index.search(
+                    embedding,
+                    k,
+                    src_tables=tables or None,
+                    content_columns=cols or None,
+                    allowed_topics=allowed_topics,
+                    allowed_topic_ids=allowed_topic_ids,
+                    allowed_countries=allowed_countries,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+            except Exception as e:
+                logger.error(f"Meeting index search failed, using {rpc_name}: {e}")
     else:
         rpc_name = "match_combined_filtered_embeddings"
         if tables:
             rpc_args.update({"src_tables": tables, "content_columns": cols})
 
-    logger.info(f"Calling {rpc_name} with: query_embedding={embedding[:5]}, match_count={k}, (len={len(embedding)})")
-    try:
-        resp = supabase.rpc(rpc_name, rpc_args).execute()
-        logger.info(f"Result: {resp.data}, Error: {getattr(resp, 'error', None)}")
-        return resp.data
-    except Exception as e:
-        logger.error(f"Error in get_top_k_neighbors: {e}")
-        return []
\ No newline at end of file
+    if neighbors is None:
+        logger.info(
+            f"Calling {rpc_name} with: query_embedding={embedding[:5]}, match_count={k}, (len={len(embedding)})"
+        )
+        try:
+            resp = supabase.rpc(rpc_name, rpc_args).execute()
+            logger.info(f"Result: {resp.data}, Error: {getattr(resp, 'error', None)}")
+            neighbors = resp.data
+        except Exception as e:
+            logger.error(f"Error in get_top_k_neighbors: {e}")
+            return []
+
+    if query is not None and corpus is not None:
+        neighbors = fuse_lexical(query, corpus, neighbors or [], k, tables, meeting_filters)
+    return neighbors
+
+
+def fuse_lexical(
+    query: str, corpus: str, neighbors: list[dict], k: int, tables: list[str], meeting_filters: dict[str, Any]
+) -> list[dict]:
+    """
+    Fuses the vector results of query with its matches in the lexical index of corpus (reciprocal rank fusion).
+    Lexical matches have to pass the same filters, the topic, country and date filters of meetings are checked on
+    the meeting index if it is loaded, otherwise only lexical matches among the vector results count.
+    """
+    index = get_lexical_index(corpus)
+    if index is None:
+        return neighbors
+    lexical = index.search(query, LEXICAL_K, allowed=(lambda key: key[0] in tables) if tables else None)
+    if lexical and any(meeting_filters.values()):
+        meeting_index = get_meeting_index()
+        if meeting_index is not None:
+            passing = set(meeting_index.filter_keys([key for key, _ in lexical], **meeting_filters))
+        else:
+            passing = {(n["source_table"], str(n["source_id"])) for n in neighbors}
+        lexical = [(key, score) for key, score in lexical if key in passing]
+    return fuse(neighbors, lexical, index.texts, k)
\ No newline at end of file
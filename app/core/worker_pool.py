@@ -0,0 +1,260 @@
+"""Warm worker processes for process-isolated jobs.
+
+Jobs registered with ``run_in_process=True`` used to start a fresh ``multiprocessing.Process`` per run that
+imported the whole scraper stack again. ``WorkerPool`` instead forks its workers from a ``forkserver`` that has
+the common modules and clients imported already, keeps them alive between jobs and hands every job to an idle one.
+
+- A worker is retired after ``max_jobs`` jobs or once its peak RSS exceeds ``max_rss_mb``, and replaced by a fresh
+  fork, so memory across the night stays bounded.
+- Jobs that cannot share a process with later jobs (Scrapy's reactor cannot be restarted) run ``single_use``: the
+  worker exits after the job, they still profit from the preloaded imports.
+- A job that exceeds its timeout gets its worker killed, like the old per-job process.
+- Jobs are handed over by module path (``module:function``) and imported by the worker, so a worker loads the
+  module of its job, not the module that registered it (``app.core.process_jobs``, not ``app.core.jobs``).
+"""
+
+import contextlib
+import importlib
+import logging
+import multiprocessing
+import multiprocessing.context
+import multiprocessing.synchronize
+import os
+import pickle
+import resource
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any
+
+from app.core.run_metrics import RunRecorder, install_http_counter
+
+logger = logging.getLogger(__name__)
+
+# imported once by the forkserver, inherited by every worker; Scrapy and Playwright are left out on purpose,
+# they install their reactor / event loop on import and must do so in the job's own worker. Modules only some jobs
+# need (the scrapers, scripts.meeting_cleanup) are imported by those jobs
+DEFAULT_PRELOAD = [
+    "app.core.config",
+    "app.core.supabase_client",
+    "app.core.openai_client",
+    "app.core.process_jobs",
+]
+
+
+@dataclass
+class JobOutcome:
+    ok: bool  # the job function returned without raising
+    value: Any = None  # its return value, None if it could not be sent back
+    error: str | None = None
+    timed_out: bool = False
+    duration_seconds: float = 0.0
+    worker_pid: int | None = None
+    peak_rss_mb: float | None = None  # of the worker while running the job
+    external_calls: int | None = None
+
+
+def job_target(func: Callable) -> str:
+    """The module path a worker imports func from, only module-level functions can be resolved."""
+    target = f"{func.__module__}:{func.__qualname__}"
+    if "<" in func.__qualname__ or func.__module__ == "__main__":
+        raise ValueError(f"Job function {target} is not importable by a worker.")
+    return target
+
+
+def _resolve(target: str) -> Callable[[multiprocessing.synchronize.Event], Any]:
+    module, _, qualname = target.partition(":")
+    func: Any = importlib.import_module(module)
+    for attribute in qualname.split("."):
+        func = getattr(func, attribute)
+    return func
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _worker_main(conn: Connection, max_jobs: int, max_rss_mb: float):
+    install_http_counter()
+    jobs = 0
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        name, target, single_use = task
+        # the stop event is local: process jobs are killed on timeout instead of being asked to stop
+        stop_event = multiprocessing.Event()
+        with RunRecorder() as recorder:
+            try:
+                outcome = JobOutcome(ok=True, value=_resolve(target)(stop_event))
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Error in job '{name}': {e}")
+                outcome = JobOutcome(ok=False, error=repr(e))
+        outcome.duration_seconds = recorder.duration_seconds
+        outcome.peak_rss_mb = recorder.peak_rss_mb
+        outcome.external_calls = recorder.external_calls
+        outcome.worker_pid = os.getpid()
+
+        jobs += 1
+        retire = single_use or jobs >= max_jobs or _peak_rss_mb() > max_rss_mb
+        try:
+            conn.send((outcome, retire))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            outcome.value = None
+            conn.send((outcome, retire))
+        if retire:
+            return
+
+
+class _Worker:
+    def __init__(self, ctx, max_jobs: int, max_rss_mb: float):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, max_jobs, max_rss_mb), daemon=True, name="JobWorker"
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            with contextlib.suppress(OSError):
+                self.conn.send(None)
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Bounded pool of preforked job workers.
+
+    :param size: Max. number of workers, i.e. of process jobs running at the same time.
+    :param max_jobs: Jobs a worker runs before it is replaced.
+    :param max_rss_mb: Peak RSS after which a worker is replaced.
+    :param preload: Modules the forkserver imports before forking workers.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_jobs: int = 20,
+        max_rss_mb: float = 1024,
+        preload: list[str] | None = None,
+    ):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_mb = max_rss_mb
+        self.preload = DEFAULT_PRELOAD if preload is None else preload
+        self._ctx: multiprocessing.context.ForkServerContext | None = None
+        self._cond = threading.Condition()
+        self._idle: list[_Worker] = []
+        self._busy = 0
+        self.stats = {"started": 0, "recycled": 0, "killed": 0, "jobs": 0}
+
+    def start(self, prefork: bool = True):
+        """Starts the forkserver and forks the workers. Must be called after env vars for the workers are set."""
+        with self._cond:
+            if self._ctx is not None:
+                return
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload(self.preload)
+            self._ctx = ctx
+            if prefork:
+                for _ in range(self.size):
+                    self._idle.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        self.stats["started"] += 1
+        return _Worker(self._ctx, self.max_jobs, self.max_rss_mb)
+
+    def _acquire(self) -> _Worker:
+        self.start(prefork=False)
+        with self._cond:
+            while not self._idle and self._busy >= self.size:
+                self._cond.wait()
+            self._busy += 1
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.stop(kill=True)
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, worker: _Worker | None):
+        with self._cond:
+            self._busy -= 1
+            if worker is not None:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def run(
+        self,
+        name: str,
+        func: Callable[[multiprocessing.synchronize.Event], Any],
+        timeout_seconds: float,
+        single_use: bool = False,
+    ) -> JobOutcome:
+        """
+        Runs func(stop_event) in an idle worker and blocks until it finished or timed out.
+
+        :param func: A module-level function, the worker imports it by its module path.
+        """
+        target = job_target(func)
+        worker = self._acquire()
+        started = time.monotonic()
+        try:
+            worker.conn.send((name, target, single_use))
+            if not worker.conn.poll(timeout_seconds):
+                # hard kill, threads can be asked to stop but a stuck scraper process cannot
+                logger.error(f"Killing worker {worker.process.pid} of job '{name}' after {timeout_seconds:.0f}s")
+                worker.stop(kill=True)
+                self.stats["killed"] += 1
+                self._release(None)
+                return JobOutcome(
+                    ok=False,
+                    error="Timeout reached",
+                    timed_out=True,
+                    duration_seconds=time.monotonic() - started,
+                    worker_pid=worker.process.pid,
+                )
+            outcome, retire = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            worker.stop(kill=True)
+            self._release(None)
+            return JobOutcome(
+                ok=False,
+                error=f"Worker {worker.process.pid} died (exit code {worker.process.exitcode}): {e!r}",
+                duration_seconds=time.monotonic() - started,
+                worker_pid=worker.process.pid,
+            )
+
+        self.stats["jobs"] += 1
+        if retire:
+            worker.stop()
+            self.stats["recycled"] += 1
+            self._release(None)
+        else:
+            self._release(worker)
+        return outcome
+
+    def shutdown(self):
+        with self._cond:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"size": self.size, "idle": len(self._idle), "busy": self._busy, **self.stats}
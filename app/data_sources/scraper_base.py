@@ -8,6 +8,7 @@ from typing import Any, Optional
 from postgrest import APIResponse
 from zoneinfo import ZoneInfo
 
+from app.core.change_events import publish_change
 from app.core.extract_topics import TopicExtractor
 from app.core.supabase_client import supabase
 from app.models.meeting import MeetingTopicAssignment
@@ -16,15 +17,23 @@ from app.core.mail.notify_job_failure import notify_job_failure
 
 logger = logging.getLogger(__name__)
 
+CHANGE_EVENT_BATCH = 100  # stored rows after which a change event is published during a scrape
+
 brussels_tz = ZoneInfo("Europe/Brussels")
 
 
 class ScraperResult:
     def __init__(
-        self, success: bool, lines_added: int = 0, error: Optional[Exception] = None, last_entry: Optional[Any] = None
+        self,
+        success: bool,
+        lines_added: int = 0,
+        error: Optional[Exception] = None,
+        last_entry: Optional[Any] = None,
+        rows_scraped: int = 0,
     ) -> None:
         self.success = success
         self.lines_added = lines_added
+        self.rows_scraped = rows_scraped  # rows handed to store_entry, including the ones that failed to store
         self.error = error
         self.last_entry = last_entry
 
@@ -54,10 +63,18 @@ class ScraperBase(ABC):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.lines_added = 0
+        self.rows_scraped = 0
+        self._changed_ids: list[Any] = []
         self._last_entry = None
         self.embedding_generator = EmbeddingGenerator()
 
     def scrape(self, **args) -> ScraperResult:
+        try:
+            return self._scrape_with_retries(**args)
+        finally:
+            self.publish_changes()
+
+    def _scrape_with_retries(self, **args) -> ScraperResult:
         attempt = 0
 
         while attempt <= self.max_retries:
@@ -71,6 +88,9 @@ class ScraperBase(ABC):
                 logger.info(f"Attempt {attempt + 1} for {self.__class__.__name__}")
                 result = self.scrape_once(self.last_entry, **args)
                 if result.success:
+                    # scrapers count stored rows on the instance, the scheduler triggers downstream jobs on them
+                    result.lines_added = max(result.lines_added, self.lines_added)
+                    result.rows_scraped = max(result.rows_scraped, self.rows_scraped)
                     return result
                 else:
                     logger.warning(f"Scrape attempt {attempt + 1} failed, retrying...")
@@ -89,8 +109,19 @@ class ScraperBase(ABC):
                 time.sleep(self.retry_delay)
 
         result.lines_added = self.lines_added
+        result.rows_scraped = self.rows_scraped
         return result  # Last result after retries
 
+    def _note_changes(self, response: APIResponse):
+        self._changed_ids.extend(row["id"] for row in response.data or [] if row.get("id") is not None)
+        if len(self._changed_ids) >= CHANGE_EVENT_BATCH:
+            self.publish_changes()
+
+    def publish_changes(self):
+        """Tells the API which stored rows changed, so it drops the cached responses built from them."""
+        ids, self._changed_ids = self._changed_ids, []
+        publish_change(self.table_name, ids)
+
     @property
     def last_entry(self) -> Any:
         return self._last_entry
@@ -113,6 +144,7 @@ class ScraperBase(ABC):
     def store_entry(
         self, entry, on_conflict: Optional[str] = None, embedd_entries: bool = True, assign_topic: bool = True
     ) -> Optional[ScraperResult]:
+        self.rows_scraped += len(entry) if isinstance(entry, list) else 1
         try:
             # add/update scraped_at timestamp
             entry["scraped_at"] = datetime.now(brussels_tz).isoformat()
@@ -123,6 +155,8 @@ class ScraperBase(ABC):
 
             if assign_topic:
                 self.assign_meeting_topic(entry, response)
+            # after the embedding and the topic, the event makes the API reload the meeting with both
+            self._note_changes(response)
 
             return None
         except Exception as e:
@@ -139,6 +173,7 @@ class ScraperBase(ABC):
         """
         Store an entry in the database and return the ID of the stored entry.
         """
+        self.rows_scraped += 1
         try:
             response = supabase.table(self.table_name).upsert(entry, on_conflict=on_conflict).execute()
             if embedd_entries:
@@ -146,6 +181,7 @@ class ScraperBase(ABC):
             self.lines_added += 1
             if assign_topic:
                 self.assign_meeting_topic(entry, response)
+            self._note_changes(response)
             return response.data[0].get("id") if response.data else None
         except Exception as e:
             logger.error(f"Error storing entry in Supabase: {e}")
@@ -71,7 +71,7 @@ class Translator:
 
         try:
             prompt = base_prompt.format(content=text)
-            llm_client = LLMClient(model=LLMModels.openai_4o_mini)
+            llm_client = LLMClient(model=LLMModels.openai_4o_mini, caller="translator")
             translated_text = llm_client.generate_response(prompt)
             return translated_text
         except Exception as e:
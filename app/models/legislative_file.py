@@ -53,6 +53,7 @@ class LegislativeFile(BaseModel):
     key_events: Optional[list[KeyEvent]] = None
     documentation_gateway: Optional[list[DocumentationGateway]] = None
     similarity: Optional[float] = None
+    retrieval_path: Optional[str] = None  # "reformulated" or "raw" query, set by semantic searches
     subscribed: Optional[bool] = None
 
 
@@ -21,6 +21,7 @@ class Meeting(BaseModel):
     description: Optional[str] = None
     tags: Optional[list[str]] = None
     similarity: Optional[float] = None
+    retrieval_path: Optional[str] = None  # "reformulated" or "raw" query, set by semantic searches
     member: Optional[Person] = None
     attendees: Optional[str] = None
 
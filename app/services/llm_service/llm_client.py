@@ -3,6 +3,7 @@ from litellm import (
 )
 
 from app.core.config import Settings
+from app.core.rate_limits import Priority, estimate_tokens, limited_call
 import logging
 from app.services.llm_service.llm_models import LLMModels
 
@@ -19,15 +20,19 @@ class LLMClient:
         api_key (Optional[str]): API key for authentication. If None, assumes
         that environment variable is set accordingly
         https://docs.litellm.ai/docs/
+        caller (str): Name under which calls are recorded in the rate-limit metrics
+        priority (Priority): Rate-limit priority, the client is mostly used by scrapers
 
     Examples:
         >>> service = LLMClient(LLMModels.openai_4o)
         >>> response = service.generate_response("Tell me a joke")
     """
 
-    def __init__(self, model: LLMModels):
+    def __init__(self, model: LLMModels, caller: str = "llm_client", priority: Priority = Priority.BATCH):
         self.model = model.value
         self.api_key = Settings().get_openai_api_key()
+        self.caller = caller
+        self.priority = priority
 
     def generate_response(self, prompt: str, temperature: float = 0.1) -> str:
         return self.__prompt(prompt, temperature=temperature)
@@ -46,7 +51,13 @@ class LLMClient:
             kwargs["api_key"] = self.api_key
 
         try:
-            response = completion(**kwargs)
+            response = limited_call(
+                lambda: (completion(**kwargs), None),
+                model=self.model,
+                caller=self.caller,
+                priority=self.priority,
+                tokens=estimate_tokens([prompt]) + 512,
+            )
             return response.choices[0].message.content
 
         except Exception as e:
@@ -0,0 +1,6 @@
+"""Offline benchmark harness for the scraper pipeline.
+
+Every scraper in ``app/data_sources`` is run against recorded HTTP fixtures, an in-memory PostgREST stand-in
+and fake embedding, translation and topic backends with configurable latency, so a scraper change can be
+measured without touching live sites, OpenAI or Supabase. See ``benchmarks/run.py`` for usage.
+"""
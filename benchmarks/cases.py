@@ -0,0 +1,152 @@
+"""Benchmark cases, one per scraper in ``app/data_sources``.
+
+Each case builds its scraper the same way as the job in ``app/core/jobs.py``, but with the date window stored in
+the case's fixture manifest instead of today's date, so replayed requests match the recorded ones.
+Scraper modules are imported inside the run functions, listing the cases does not import Scrapy or crawl4ai.
+"""
+
+import multiprocessing.synchronize
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.data_sources.scraper_base import ScraperResult
+
+LOOKAHEAD_DAYS = 7  # same window as the scheduled jobs
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    name: str
+    table: str  # main table of the scraper, rows per second are counted in it
+    transport: str  # "requests", "scrapy" or "crawl4ai"
+    run: Callable[[date, date, multiprocessing.synchronize.Event], "ScraperResult"]
+    window_days: int = LOOKAHEAD_DAYS
+
+    def window(self, start_date: date) -> tuple[date, date]:
+        return start_date, start_date + timedelta(days=self.window_days)
+
+
+def _meeting_calendar(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.meeting_calendar_scraper import EPMeetingCalendarScraper
+
+    return EPMeetingCalendarScraper(start_date, end_date, stop_event=stop_event).scrape()
+
+
+def _mep_meetings(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.mep_meetings_scraper import MEPMeetingsScraper
+
+    return MEPMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _ipex_calendar(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.ipex_calender_scraper import run_scraper
+
+    return run_scraper(start_date=start_date, end_date=end_date, stop_event=stop_event)
+
+
+def _mec_sum_minist_meetings(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.mec_sum_minist_meetings_scraper import MECSumMinistMeetingsScraper
+
+    return MECSumMinistMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _mec_prep_bodies_meetings(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.mec_prep_bodies_meetings_scraper import MECPrepBodiesMeetingsScraper
+
+    return MECPrepBodiesMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _weekly_agenda(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.weekly_agenda_scraper import WeeklyAgendaScraper
+
+    return WeeklyAgendaScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _austrian_parliament(start_date, end_date, stop_event):
+    from app.data_sources.apis.austrian_parliament import run_scraper
+
+    return run_scraper(start_date=start_date, end_date=end_date, stop_event=stop_event)
+
+
+def _polish_presidency(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.polish_presidency_meetings_scraper import PolishPresidencyMeetingsScraper
+
+    return PolishPresidencyMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _ec_res_inno_meetings(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.ec_res_inno_meetings_scraper import EcResInnoMeetingsScraper
+
+    return EcResInnoMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+def _spanish_commission(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.spanish_commission_scraper import SpanishCommissionScraper
+
+    return SpanishCommissionScraper(date=start_date, stop_event=stop_event).scrape()
+
+
+def _bundestag_drucksachen(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.bundestag_drucksachen_scraper import BundestagDrucksachenScraper
+
+    return BundestagDrucksachenScraper(stop_event=stop_event).scrape(start_date=start_date, end_date=end_date)
+
+
+def _bundestag_plenary_protocols(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.bundestag_plenarprotocol_scaper import BundestagPlenarprotokolleScraper
+
+    return BundestagPlenarprotokolleScraper(stop_event=stop_event).scrape(start_date=start_date, end_date=end_date)
+
+
+def _tweets(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.tweets import TweetScraper
+
+    usernames = ["EU_Commission", "EUCouncil", "epc_eu", "Euractiv"]
+    return TweetScraper(usernames=usernames, stop_event=stop_event).scrape()
+
+
+def _legislative_observatory(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.legislative_observatory_scraper import LegislativeObservatoryScraper
+
+    return LegislativeObservatoryScraper(stop_event=stop_event).scrape()
+
+
+def _eu_laws_by_topic(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.lawtracker_topic_scraper import LawTrackerSpider
+
+    return LawTrackerSpider(stop_event=stop_event).scrape()
+
+
+def _netherlands_twka_meetings(start_date, end_date, stop_event):
+    from app.data_sources.scrapers.nl_twka_meetings_scraper import NetherlandsTwkaMeetingsScraper
+
+    return NetherlandsTwkaMeetingsScraper(start_date=start_date, end_date=end_date, stop_event=stop_event).scrape()
+
+
+# The Belgian parliament scraper drives Playwright directly and has no HTTP layer to replay.
+CASES: dict[str, BenchmarkCase] = {
+    case.name: case
+    for case in [
+        BenchmarkCase("meeting_calendar", "ep_meetings", "requests", _meeting_calendar),
+        BenchmarkCase("mep_meetings", "mep_meetings", "scrapy", _mep_meetings),
+        BenchmarkCase("ipex_calendar", "ipex_events", "requests", _ipex_calendar),
+        BenchmarkCase(
+            "mec_sum_minist_meetings", "mec_summit_ministerial_meeting", "crawl4ai", _mec_sum_minist_meetings
+        ),
+        BenchmarkCase("mec_prep_bodies_meetings", "mec_prep_bodies_meeting", "crawl4ai", _mec_prep_bodies_meetings),
+        BenchmarkCase("weekly_agenda", "weekly_agenda", "scrapy", _weekly_agenda),
+        BenchmarkCase("austrian_parliament", "austrian_parliament_meetings", "requests", _austrian_parliament),
+        BenchmarkCase("polish_presidency", "polish_presidency_meeting", "scrapy", _polish_presidency),
+        BenchmarkCase("ec_res_inno_meetings", "ec_res_inno_meetings", "scrapy", _ec_res_inno_meetings, 365),
+        BenchmarkCase("spanish_commission", "spanish_commission_meetings", "scrapy", _spanish_commission, 0),
+        BenchmarkCase("bundestag_drucksachen", "bt_documents", "requests", _bundestag_drucksachen),
+        BenchmarkCase("bundestag_plenary_protocols", "bt_plenarprotokolle", "requests", _bundestag_plenary_protocols),
+        BenchmarkCase("tweets", "tweets", "requests", _tweets),
+        BenchmarkCase("legislative_observatory", "legislative_files", "scrapy", _legislative_observatory),
+        BenchmarkCase("eu_laws_by_topic", "eu_law_procedures", "scrapy", _eu_laws_by_topic),
+        BenchmarkCase("netherlands_twka_meetings", "nl_twka_meetings", "scrapy", _netherlands_twka_meetings),
+    ]
+}
@@ -0,0 +1,263 @@
+"""Record and replay of the HTTP traffic of a scraper.
+
+Fixtures live in ``benchmarks/fixtures/<case>/``: ``manifest.json`` lists the recorded exchanges in request order
+and every response body is stored next to it in its own file, so HTML, JSON and XML fixtures stay diffable.
+
+Three transports are hooked: ``requests`` (``HTTPAdapter.send``, covers ``requests.get`` and sessions), Scrapy
+(``DownloadHandlers.download_request``, covers plain HTTP and scrapy-playwright) and crawl4ai
+(``AsyncWebCrawler.arun``, which stores the whole ``CrawlResult`` because the scrapers read its parsed links).
+Scrapers that drive Playwright directly cannot be replayed.
+
+A request is answered by the first unused exchange with the same method, URL (query parameters sorted) and body.
+If there is none, the next unused exchange with the same method and path is used, so query parameters derived
+from the current time (e.g. "since" filters) do not break replay. Unmatched requests fail loudly.
+"""
+
+import hashlib
+import json
+import logging
+import mimetypes
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+MANIFEST = "manifest.json"
+CRAWL4AI_CONTENT_TYPE = "application/x-crawl4ai-result+json"
+# hosts that are always reached live, e.g. tiktoken downloads its BPE ranks once and caches them
+PASSTHROUGH_HOSTS = {"openaipublic.blob.core.windows.net"}
+
+
+class MissingFixtureError(Exception):
+    pass
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+def _path_key(method: str, url: str) -> str:
+    parts = urlsplit(url)
+    return f"{method.upper()} {parts.netloc.lower()}{parts.path}"
+
+
+def _body_hash(body: bytes | str | None) -> str | None:
+    if not body:
+        return None
+    if isinstance(body, str):
+        body = body.encode()
+    return hashlib.sha1(body).hexdigest()
+
+
+@dataclass
+class Exchange:
+    method: str
+    url: str
+    status: int
+    headers: dict[str, str]
+    file: str
+    body_sha1: str | None = None
+    used: bool = field(default=False, compare=False)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "url": self.url,
+            "body_sha1": self.body_sha1,
+            "status": self.status,
+            "headers": self.headers,
+            "file": self.file,
+        }
+
+
+class FixtureStore:
+    """
+    Recorded exchanges of one benchmark case.
+
+    :param case_dir: Directory holding the manifest and the response bodies.
+    :param record: Record live responses instead of replaying them.
+    """
+
+    def __init__(self, case_dir: Path, record: bool = False):
+        self.case_dir = case_dir
+        self.record = record
+        self.meta: dict[str, Any] = {}
+        self.exchanges: list[Exchange] = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        if not record:
+            manifest = json.loads((case_dir / MANIFEST).read_text())
+            self.meta = {k: v for k, v in manifest.items() if k != "exchanges"}
+            self.exchanges = [Exchange(**exchange) for exchange in manifest["exchanges"]]
+
+    @staticmethod
+    def exists(case_dir: Path) -> bool:
+        return (case_dir / MANIFEST).is_file()
+
+    def lookup(self, method: str, url: str, body: bytes | str | None = None) -> tuple[Exchange, bytes]:
+        method = method.upper()
+        wanted_url, wanted_body = normalize_url(url), _body_hash(body)
+        with self._lock:
+            self.requests += 1
+            candidates = [e for e in self.exchanges if e.method == method and e.url == wanted_url]
+            exact = [e for e in candidates if e.body_sha1 == wanted_body]
+            same_path = [e for e in self.exchanges if _path_key(e.method, e.url) == _path_key(method, url)]
+            exchange = next(
+                (e for group in (exact, candidates, same_path) for e in group if not e.used),
+                exact[-1] if exact else None,
+            )
+            if exchange is None:
+                raise MissingFixtureError(f"No fixture for {method} {url} in {self.case_dir}; re-record with --record")
+            exchange.used = True
+        return exchange, (self.case_dir / exchange.file).read_bytes()
+
+    def add(
+        self, method: str, url: str, body: bytes | str | None, status: int, headers: dict[str, str], content: bytes
+    ):
+        content_type = headers.get("Content-Type") or headers.get("content-type") or ""
+        extension = ".json" if content_type == CRAWL4AI_CONTENT_TYPE else None
+        extension = extension or mimetypes.guess_extension(content_type.split(";")[0].strip()) or ".bin"
+        with self._lock:
+            self.requests += 1
+            name = f"{len(self.exchanges) + 1:04d}{extension}"
+            (self.case_dir / name).write_bytes(content)
+            self.exchanges.append(
+                Exchange(
+                    method=method.upper(),
+                    url=normalize_url(url),
+                    status=status,
+                    headers={"Content-Type": content_type} if content_type else {},
+                    file=name,
+                    body_sha1=_body_hash(body),
+                )
+            )
+
+    def save(self) -> None:
+        self.case_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {**self.meta, "exchanges": [e.to_json() for e in self.exchanges]}
+        (self.case_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n")
+
+    def unused(self) -> list[str]:
+        return [f"{e.method} {e.url}" for e in self.exchanges if not e.used]
+
+
+def _patch(owner: Any, name: str, replacement: Callable, undo: list[Callable[[], None]]) -> Callable:
+    original = getattr(owner, name)
+    setattr(owner, name, replacement)
+    undo.append(lambda: setattr(owner, name, original))
+    return original
+
+
+def _install_requests(store: FixtureStore, timer_stage: Callable, undo: list[Callable[[], None]]) -> None:
+    from requests import Response
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    def send(adapter, request, **kwargs):
+        if urlsplit(request.url).hostname in PASSTHROUGH_HOSTS:
+            return original(adapter, request, **kwargs)
+        with timer_stage("fetch"):
+            if store.record:
+                response = original(adapter, request, **kwargs)
+                store.add(
+                    request.method, request.url, request.body, response.status_code, response.headers, response.content
+                )
+                return response
+            exchange, content = store.lookup(request.method, request.url, request.body)
+            response = Response()
+            response.status_code = exchange.status
+            response.headers = CaseInsensitiveDict(exchange.headers)
+            response._content = content
+            response.url = request.url
+            response.request = request
+            response.encoding = None
+            return response
+
+    original = _patch(HTTPAdapter, "send", send, undo)
+
+
+def _install_scrapy(store: FixtureStore, timer_stage: Callable, undo: list[Callable[[], None]]) -> None:
+    try:
+        from scrapy.core.downloader.handlers import DownloadHandlers
+        from scrapy.http import Headers
+        from scrapy.responsetypes import responsetypes
+        from twisted.internet import defer
+    except ImportError:
+        return
+
+    def download_request(handlers, request, spider):
+        if store.record:
+
+            def save(response):
+                headers = {"Content-Type": (response.headers.get("Content-Type") or b"").decode()}
+                store.add(request.method, request.url, request.body, response.status, headers, response.body)
+                return response
+
+            return original(handlers, request, spider).addCallback(save)
+
+        with timer_stage("fetch"):
+            exchange, content = store.lookup(request.method, request.url, request.body)
+            headers = Headers(exchange.headers)
+            response_cls = responsetypes.from_args(headers=headers, url=request.url, body=content)
+            response = response_cls(
+                url=request.url, status=exchange.status, headers=headers, body=content, request=request
+            )
+        return defer.succeed(response)
+
+    original = _patch(DownloadHandlers, "download_request", download_request, undo)
+
+
+def _install_crawl4ai(store: FixtureStore, timer_stage: Callable, undo: list[Callable[[], None]]) -> None:
+    try:
+        from crawl4ai import AsyncWebCrawler
+        from crawl4ai.models import CrawlResult
+    except ImportError:
+        return
+
+    if store.record:
+
+        async def arun_and_record(crawler, url: str, *args, **kwargs):
+            result = await original(crawler, url, *args, **kwargs)
+            content = result.model_dump_json().encode()
+            store.add("GET", url, None, result.status_code or 200, {"Content-Type": CRAWL4AI_CONTENT_TYPE}, content)
+            return result
+
+        original = _patch(AsyncWebCrawler, "arun", arun_and_record, undo)
+        return
+
+    async def arun(crawler, url: str, *args, **kwargs):
+        with timer_stage("fetch"):
+            _, content = store.lookup("GET", url)
+            return CrawlResult.model_validate_json(content)
+
+    async def enter(crawler):
+        # no browser is started when replaying
+        return crawler
+
+    async def leave(crawler, *args):
+        return None
+
+    _patch(AsyncWebCrawler, "arun", arun, undo)
+    _patch(AsyncWebCrawler, "__aenter__", enter, undo)
+    _patch(AsyncWebCrawler, "__aexit__", leave, undo)
+
+
+def install(store: FixtureStore, timer_stage: Callable) -> Callable[[], None]:
+    """Hook all supported HTTP transports into store. Returns a function that removes the hooks again."""
+    undo: list[Callable[[], None]] = []
+    _install_requests(store, timer_stage, undo)
+    _install_scrapy(store, timer_stage, undo)
+    _install_crawl4ai(store, timer_stage, undo)
+
+    def uninstall() -> None:
+        for restore in reversed(undo):
+            restore()
+
+    return uninstall
@@ -0,0 +1,310 @@
+"""Run the scraper benchmarks and write a JSON report.
+
+Usage::
+
+    python -m benchmarks.run                                  # all cases with recorded fixtures
+    python -m benchmarks.run mep_meetings --repeat 5 --output bench.json
+    python -m benchmarks.run mep_meetings --record            # record fixtures from the live sites
+    python -m benchmarks.run --baseline bench.json --max-regression 0.2
+
+Every repetition of a case runs in a fresh interpreter, so peak RSS is per case and Scrapy can start its reactor.
+The report contains per case: rows per second written to the scraper's table, Supabase round trips per row, peak
+RSS and wall time per stage ("fetch", "db", "embed", "translate", "topic", and "scrape" for everything else).
+Counters are deterministic for a given fixture set; timings are the median over the repetitions.
+With ``--baseline`` the run fails if rows per second drop or peak RSS grows by more than ``--max-regression``,
+or if any case needs more round trips per row than before.
+
+Only cases with a fixture set in ``benchmarks/fixtures`` run. Fixture sets marked ``"synthetic": true`` in their
+manifest are hand-written responses: they measure the scraper's own pipeline, not the pages of the live site.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.cases import CASES, BenchmarkCase
+from benchmarks.replay import FIXTURES_DIR, FixtureStore
+
+logger = logging.getLogger(__name__)
+
+STAGES = ["fetch", "db", "embed", "translate", "topic"]
+# placeholders so the clients can be constructed; every outbound call is replaced by a stand-in
+OFFLINE_ENV = {
+    "SUPABASE_PROJECT_URL": "http://127.0.0.1:54321",
+    "SUPABASE_API_KEY": "bench.bench.bench",
+    "OPENAI_API_KEY": "bench",
+    "COHERE_API_KEY": "bench",
+    "TWITTER_API_KEY": "bench",
+    "BUNDESTAG_KEY": "bench",
+    "BREVO_API_KEY": "bench",
+    "ENVIRONMENT": "development",
+    "IS_PULL_REQUEST": "false",
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _install_stand_ins(args: argparse.Namespace, timer) -> dict[str, Any]:
+    """Replace Supabase, OpenAI, LiteLLM, the topic model and failure mails before the scrapers are imported."""
+    from benchmarks.stand_ins import FakeCompletion, FakeOpenAI, FakeSentenceModel, FakeSupabase
+
+    import app.core.supabase_client as supabase_client
+
+    real_client = supabase_client.supabase
+    fake_supabase = FakeSupabase(timer, latency_ms=args.db_latency_ms)
+    supabase_client.supabase = fake_supabase
+
+    import app.core.openai_client as openai_client
+    import app.data_sources.scraper_base as scraper_base
+    import app.services.llm_service.llm_client as llm_client
+    from app.core.extract_topics import TopicExtractor
+
+    fake_openai = FakeOpenAI(timer, args.embed_latency_ms, args.embed_latency_per_input_ms)
+    fake_completion = FakeCompletion(timer, args.translate_latency_ms)
+    fake_model = FakeSentenceModel(timer, args.topic_latency_ms)
+    openai_client.openai = fake_openai
+    llm_client.completion = fake_completion
+    TopicExtractor._sentence_model = fake_model
+    failures: list[str] = []
+    scraper_base.notify_job_failure = lambda job_name, error: failures.append(f"{job_name}: {error}")
+
+    # modules imported before the swap still hold the real client
+    for module in list(sys.modules.values()):
+        if getattr(module, "supabase", None) is real_client:
+            module.supabase = fake_supabase
+
+    return {
+        "supabase": fake_supabase,
+        "openai": fake_openai,
+        "completion": fake_completion,
+        "topic_model": fake_model,
+        "failures": failures,
+    }
+
+
+def run_child(args: argparse.Namespace) -> dict[str, Any]:
+    """Run one repetition of one case in this process."""
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.pop("MODEL_SERVER_ADDRESS", None)
+
+    from benchmarks import replay
+    from benchmarks.stand_ins import StageTimer
+
+    case: BenchmarkCase = CASES[args.child]
+    case_dir = FIXTURES_DIR / case.name
+    timer = StageTimer()
+    stand_ins = _install_stand_ins(args, timer)
+    rss_after_import = _peak_rss_mb()
+
+    store = FixtureStore(case_dir, record=args.record)
+    if args.record:
+        case_dir.mkdir(parents=True, exist_ok=True)
+        start_date = date.fromisoformat(args.start_date) if args.start_date else date.today()
+        store.meta = {"case": case.name, "start_date": start_date.isoformat(), "recorded_at": date.today().isoformat()}
+    else:
+        start_date = date.fromisoformat(store.meta["start_date"])
+    uninstall = replay.install(store, timer.stage)
+
+    import multiprocessing
+
+    stop_event = multiprocessing.Event()
+    start, end = case.window(start_date)
+    started = time.perf_counter()
+    try:
+        result = case.run(start, end, stop_event)
+    finally:
+        wall = time.perf_counter() - started
+        uninstall()
+    if args.record:
+        store.save()
+
+    fake_supabase = stand_ins["supabase"]
+    rows = fake_supabase.rows_written[case.table]
+    round_trips = sum(fake_supabase.round_trips.values())
+    stages = {stage: round(timer.seconds.get(stage, 0.0), 4) for stage in STAGES}
+    stages["scrape"] = round(max(0.0, wall - sum(stages.values())), 4)
+    return {
+        "case": case.name,
+        "transport": case.transport,
+        "synthetic": bool(store.meta.get("synthetic")),
+        "success": bool(result.success),
+        "error": str(result.error) if result.error else None,
+        "rows": rows,
+        "rows_by_table": dict(fake_supabase.rows_written),
+        "wall_seconds": round(wall, 4),
+        "rows_per_second": round(rows / wall, 3) if wall else 0.0,
+        "round_trips": round_trips,
+        "round_trips_per_row": round(round_trips / rows, 3) if rows else None,
+        "round_trips_by_operation": dict(sorted(fake_supabase.round_trips.items())),
+        "http_requests": store.requests,
+        "unused_fixtures": len(store.unused()) if not args.record else 0,
+        "embedding_requests": stand_ins["openai"].requests,
+        "embedded_texts": stand_ins["openai"].inputs,
+        "translations": stand_ins["completion"].requests,
+        "topic_encodes": stand_ins["topic_model"].requests,
+        "failure_notifications": len(stand_ins["failures"]),
+        "stages_seconds": stages,
+        "rss_after_import_mb": round(rss_after_import, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _child_command(args: argparse.Namespace, case: str, result_file: str) -> list[str]:
+    command = [sys.executable, "-m", "benchmarks.run", "--child", case, "--result-file", result_file]
+    for option in (
+        "db_latency_ms",
+        "embed_latency_ms",
+        "embed_latency_per_input_ms",
+        "translate_latency_ms",
+        "topic_latency_ms",
+    ):
+        command += [f"--{option.replace('_', '-')}", str(getattr(args, option))]
+    if args.record:
+        command.append("--record")
+    if args.start_date:
+        command += ["--start-date", args.start_date]
+    return command
+
+
+def run_case(args: argparse.Namespace, case: str) -> dict[str, Any]:
+    runs: list[dict[str, Any]] = []
+    for repetition in range(1 if args.record else args.repeat):
+        with tempfile.NamedTemporaryFile(suffix=".json") as result_file:
+            completed = subprocess.run(_child_command(args, case, result_file.name), timeout=args.timeout)
+            if completed.returncode != 0:
+                return {
+                    "case": case,
+                    "success": False,
+                    "error": f"benchmark process exited with {completed.returncode}",
+                }
+            runs.append(json.loads(Path(result_file.name).read_text()))
+        logger.info(f"{case} run {repetition + 1}: {runs[-1]['rows']} rows in {runs[-1]['wall_seconds']:.2f}s")
+    return aggregate(runs)
+
+
+def aggregate(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    """Median timings over the repetitions; counters must be identical, otherwise the case is flagged unstable."""
+    first = runs[0]
+    counters = ("rows", "round_trips", "http_requests", "embedded_texts", "translations")
+    report = dict(first)
+    report["repetitions"] = len(runs)
+    report["stable"] = all(all(run[c] == first[c] for c in counters) for run in runs)
+    report["wall_seconds"] = round(statistics.median(run["wall_seconds"] for run in runs), 4)
+    report["rows_per_second"] = round(statistics.median(run["rows_per_second"] for run in runs), 3)
+    report["peak_rss_mb"] = max(run["peak_rss_mb"] for run in runs)
+    report["stages_seconds"] = {
+        stage: round(statistics.median(run["stages_seconds"][stage] for run in runs), 4)
+        for stage in first["stages_seconds"]
+    }
+    return report
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    regressions = []
+    for name, current in report["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous or not current.get("success") or not previous.get("success"):
+            continue
+        if current["rows_per_second"] < previous["rows_per_second"] * (1 - max_regression):
+            regressions.append(f"{name}: rows/s {previous['rows_per_second']} -> {current['rows_per_second']}")
+        if (current["round_trips_per_row"] or 0) > (previous["round_trips_per_row"] or 0):
+            regressions.append(
+                f"{name}: round trips/row {previous['round_trips_per_row']} -> {current['round_trips_per_row']}"
+            )
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + max_regression):
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']} MB -> {current['peak_rss_mb']} MB")
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against recorded fixtures.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all with fixtures): {', '.join(CASES)}")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per case, timings are the median")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="tolerated relative slowdown")
+    parser.add_argument("--record", action="store_true", help="record fixtures from the live sites")
+    parser.add_argument("--start-date", help="first day of the scraped window when recording (default: today)")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds per repetition")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=50.0)
+    parser.add_argument("--embed-latency-per-input-ms", type=float, default=0.5)
+    parser.add_argument("--translate-latency-ms", type=float, default=100.0)
+    parser.add_argument("--topic-latency-ms", type=float, default=5.0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if not args.child else logging.WARNING, stream=sys.stderr)
+
+    if args.child:
+        Path(args.result_file).write_text(json.dumps(run_child(args)))
+        return 0
+
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        logger.error(f"Unknown case(s): {', '.join(unknown)}")
+        return 2
+    names = args.cases or list(CASES)
+    if not args.record:
+        missing = [name for name in names if not FixtureStore.exists(FIXTURES_DIR / name)]
+        if missing:
+            logger.warning(f"No fixtures recorded for {', '.join(missing)}, skipping; record them with --record")
+        names = [name for name in names if name not in missing]
+
+    report = {
+        "generated_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {
+            key: getattr(args, key)
+            for key in (
+                "repeat",
+                "db_latency_ms",
+                "embed_latency_ms",
+                "embed_latency_per_input_ms",
+                "translate_latency_ms",
+                "topic_latency_ms",
+            )
+        },
+        "cases": {name: run_case(args, name) for name in names},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    failed = [name for name, case in report["cases"].items() if not case.get("success")]
+    if failed:
+        logger.error(f"Failed case(s): {', '.join(failed)}")
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.max_regression)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""In-process stand-ins for Supabase, OpenAI, LiteLLM and the topic model.
+
+Every stand-in reports the time spent in it to a shared ``StageTimer`` and can sleep for a configurable latency,
+so a benchmark run measures the scraper's own work and the number of round trips it makes, not the network.
+"""
+
+import hashlib
+import operator
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+
+# what get_meeting_tables returns; decides whether scraped rows are embedded into meeting_embeddings
+MEETING_TABLES = [
+    "austrian_parliament_meetings",
+    "belgian_parliament_meetings",
+    "ec_res_inno_meetings",
+    "ep_meetings",
+    "ipex_events",
+    "mec_prep_bodies_meeting",
+    "mec_summit_ministerial_meeting",
+    "mep_meetings",
+    "nl_twka_meetings",
+    "polish_presidency_meeting",
+    "spanish_commission_meetings",
+    "weekly_agenda",
+]
+EMBEDDING_TABLES = {"meeting_embeddings", "documents_embeddings"}
+SEED_TOPICS = ["Agriculture", "Digital", "Energy", "Health", "Transport", "Other"]
+
+
+class StageTimer:
+    """Accumulates wall time and call counts per pipeline stage. Stages must not be nested."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.seconds[name] += elapsed
+                self.calls[name] += 1
+
+
+def _sleep_ms(latency_ms: float) -> None:
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000)
+
+
+def _stable_vector(text: str, dim: int) -> np.ndarray:
+    """Deterministic unit vector per text, so repeated runs write identical rows."""
+    seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+# ─── Supabase ─────────────────────────────────────────────────────────────────────────────────────────────────────
+
+
+class FakeAPIError(Exception):
+    pass
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    return value
+
+
+def _compare(op: Callable[[Any, Any], bool], left: Any, right: Any) -> bool:
+    if left is None:
+        return False
+    left, right = _normalize(left), _normalize(right)
+    try:
+        return op(float(left), float(right))
+    except (TypeError, ValueError):
+        return op(str(left), str(right))
+
+
+def _matches(row: dict, column: str, op: str, value: Any) -> bool:
+    current = row.get(column)
+    if op == "eq":
+        return current is not None and str(_normalize(current)) == str(_normalize(value))
+    if op == "neq":
+        return current is not None and str(_normalize(current)) != str(_normalize(value))
+    if op == "in":
+        return current is not None and str(_normalize(current)) in {str(_normalize(v)) for v in value}
+    if op == "is":
+        return current is None if value in (None, "null") else current is value
+    if op in ("like", "ilike"):
+        pattern = str(value).replace("%", "")
+        text = str(current or "")
+        return pattern.lower() in text.lower() if op == "ilike" else pattern in text
+    comparisons = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+    return _compare(comparisons[op], current, value)
+
+
+class FakeQuery:
+    """Subset of the postgrest-py request builder used by the scrapers."""
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self.table = table
+        self.operation = "select"
+        self.payload: list[dict] | dict | None = None
+        self.columns = "*"
+        self.on_conflict: str | None = None
+        self.filters: list[tuple[str, str, Any, bool]] = []
+        self.order_by: list[tuple[str, bool]] = []
+        self.row_limit: int | None = None
+        self.offset = 0
+        self.single_row = False
+        self.maybe_single_row = False
+        self._negate = False
+
+    def select(self, *columns: str, count: str | None = None, **_: Any) -> "FakeQuery":
+        self.columns = ",".join(columns) or "*"
+        return self
+
+    def insert(self, json: list[dict] | dict, *, upsert: bool = False, on_conflict: str = "", **_: Any):
+        self.operation = "upsert" if upsert else "insert"
+        self.payload = json
+        self.on_conflict = on_conflict or None
+        return self
+
+    def upsert(self, json: list[dict] | dict, *, on_conflict: str = "", **_: Any) -> "FakeQuery":
+        self.operation = "upsert"
+        self.payload = json
+        self.on_conflict = on_conflict or None
+        return self
+
+    def update(self, json: dict, **_: Any) -> "FakeQuery":
+        self.operation = "update"
+        self.payload = json
+        return self
+
+    def delete(self, **_: Any) -> "FakeQuery":
+        self.operation = "delete"
+        return self
+
+    @property
+    def not_(self) -> "FakeQuery":
+        self._negate = True
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> "FakeQuery":
+        self.filters.append((column, op, value, self._negate))
+        self._negate = False
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: list[Any]) -> "FakeQuery":
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(column, "is", value)
+
+    def like(self, column: str, pattern: str) -> "FakeQuery":
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        return self._filter(column, "ilike", pattern)
+
+    def order(self, column: str, *, desc: bool = False, **_: Any) -> "FakeQuery":
+        self.order_by.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_: Any) -> "FakeQuery":
+        self.row_limit = size
+        return self
+
+    def range(self, start: int, end: int, **_: Any) -> "FakeQuery":
+        self.offset = start
+        self.row_limit = end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self.single_row = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self.maybe_single_row = True
+        return self
+
+    def execute(self) -> SimpleNamespace:
+        return self._client.execute(self)
+
+
+class FakeRpc:
+    def __init__(self, client: "FakeSupabase", name: str, params: dict | None):
+        self._client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> SimpleNamespace:
+        return self._client.execute_rpc(self)
+
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client that keeps rows per table and counts every round trip.
+
+    :param timer: Receives the time spent per round trip under the "db" stage.
+    :param latency_ms: Simulated network latency per round trip.
+    """
+
+    def __init__(self, timer: StageTimer, latency_ms: float = 0.0):
+        self.timer = timer
+        self.latency_ms = latency_ms
+        self.tables: dict[str, list[dict]] = defaultdict(list)
+        self.round_trips: Counter[str] = Counter()
+        self.rows_written: Counter[str] = Counter()
+        self.rpc_handlers: dict[str, Callable[[dict], Any]] = {
+            "get_meeting_tables": lambda _: [{"source_table": t} for t in MEETING_TABLES],
+        }
+        self._lock = threading.Lock()
+        self.tables["meeting_topics"] = [{"id": str(i), "topic": topic} for i, topic in enumerate(SEED_TOPICS, 1)]
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def from_(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: dict | None = None, **_: Any) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def execute(self, query: FakeQuery) -> SimpleNamespace:
+        with self.timer.stage("db"):
+            _sleep_ms(self.latency_ms)
+            with self._lock:
+                self.round_trips[f"{query.table}.{query.operation}"] += 1
+                data = getattr(self, f"_{query.operation}")(query)
+        if query.single_row or query.maybe_single_row:
+            if len(data) != 1 and query.single_row:
+                raise FakeAPIError(f"JSON object requested, multiple (or no) rows returned from {query.table}")
+            return SimpleNamespace(data=data[0] if data else None, count=len(data))
+        return SimpleNamespace(data=data, count=len(data))
+
+    def execute_rpc(self, rpc: FakeRpc) -> SimpleNamespace:
+        with self.timer.stage("db"):
+            _sleep_ms(self.latency_ms)
+            with self._lock:
+                self.round_trips[f"rpc.{rpc.name}"] += 1
+            handler = self.rpc_handlers.get(rpc.name)
+            data = handler(rpc.params) if handler else []
+        return SimpleNamespace(data=data, count=len(data) if isinstance(data, list) else None)
+
+    def _filtered(self, query: FakeQuery) -> list[dict]:
+        return [
+            row
+            for row in self.tables[query.table]
+            if all(_matches(row, column, op, value) != negate for column, op, value, negate in query.filters)
+        ]
+
+    @staticmethod
+    def _project(rows: list[dict], columns: str) -> list[dict]:
+        names = [c.strip() for c in columns.split(",") if c.strip()]
+        if not names or "*" in names:
+            return [dict(row) for row in rows]
+        return [{name: row.get(name) for name in names} for row in rows]
+
+    def _select(self, query: FakeQuery) -> list[dict]:
+        rows = self._filtered(query)
+        for column, desc in reversed(query.order_by):
+            rows.sort(key=lambda r, c=column: (r.get(c) is None, str(_normalize(r.get(c)))), reverse=desc)
+        end = None if query.row_limit is None else query.offset + query.row_limit
+        return self._project(rows[query.offset : end], query.columns)
+
+    def _payload_rows(self, query: FakeQuery) -> list[dict]:
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        return [{k: _normalize(v) for k, v in (row or {}).items()} for row in payload]
+
+    def _insert(self, query: FakeQuery) -> list[dict]:
+        rows = self.tables[query.table]
+        written = []
+        for new in self._payload_rows(query):
+            new.setdefault("id", str(uuid.uuid4()))
+            if any(str(row.get("id")) == str(new["id"]) for row in rows):
+                raise FakeAPIError(f'duplicate key value violates unique constraint "{query.table}_pkey"')
+            rows.append(new)
+            written.append(dict(new))
+        self.rows_written[query.table] += len(written)
+        return written
+
+    def _upsert(self, query: FakeQuery) -> list[dict]:
+        rows = self.tables[query.table]
+        keys = [k.strip() for k in (query.on_conflict or "id").split(",")]
+        written = []
+        for new in self._payload_rows(query):
+            existing = None
+            if all(new.get(k) is not None for k in keys):
+                existing = next((r for r in rows if all(str(r.get(k)) == str(new[k]) for k in keys)), None)
+            if existing is not None:
+                existing.update(new)
+                written.append(dict(existing))
+            else:
+                new.setdefault("id", str(uuid.uuid4()))
+                rows.append(new)
+                written.append(dict(new))
+        self.rows_written[query.table] += len(written)
+        return written
+
+    def _update(self, query: FakeQuery) -> list[dict]:
+        updated = []
+        for row in self._filtered(query):
+            row.update({k: _normalize(v) for k, v in (query.payload or {}).items()})
+            updated.append(dict(row))
+        self.rows_written[query.table] += len(updated)
+        return updated
+
+    def _delete(self, query: FakeQuery) -> list[dict]:
+        doomed = self._filtered(query)
+        doomed_ids = {id(row) for row in doomed}
+        self.tables[query.table] = [row for row in self.tables[query.table] if id(row) not in doomed_ids]
+        return [dict(row) for row in doomed]
+
+    def row_counts(self) -> dict[str, int]:
+        return {table: len(rows) for table, rows in self.tables.items() if rows}
+
+
+# ─── OpenAI embeddings ────────────────────────────────────────────────────────────────────────────────────────────
+
+
+class _RawEmbeddingResponse:
+    def __init__(self, data: list[SimpleNamespace]):
+        self._data = data
+        self.headers: dict[str, str] = {}
+
+    def parse(self) -> SimpleNamespace:
+        return SimpleNamespace(data=self._data)
+
+
+class _FakeEmbeddings:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+        self.with_raw_response = self
+
+    def create(self, *, model: str, input: list[str] | str, **_: Any):
+        texts = [input] if isinstance(input, str) else list(input)
+        with self._owner.timer.stage("embed"):
+            _sleep_ms(self._owner.latency_ms + self._owner.latency_ms_per_input * len(texts))
+            self._owner.requests += 1
+            self._owner.inputs += len(texts)
+            data = [SimpleNamespace(embedding=_stable_vector(t, self._owner.dim).tolist()) for t in texts]
+        return _RawEmbeddingResponse(data)
+
+
+class FakeOpenAI:
+    """
+    Stands in for the shared ``openai`` client of ``app.core.openai_client``; only embeddings are supported.
+
+    :param latency_ms: Fixed latency per request.
+    :param latency_ms_per_input: Additional latency per embedded text.
+    """
+
+    def __init__(self, timer: StageTimer, latency_ms: float = 0.0, latency_ms_per_input: float = 0.0, dim: int = 1536):
+        self.timer = timer
+        self.latency_ms = latency_ms
+        self.latency_ms_per_input = latency_ms_per_input
+        self.dim = dim
+        self.requests = 0
+        self.inputs = 0
+        self.embeddings = _FakeEmbeddings(self)
+
+
+# ─── LiteLLM translation ──────────────────────────────────────────────────────────────────────────────────────────
+
+
+class FakeCompletion:
+    """
+    Replaces ``litellm.completion`` as used by ``LLMClient``. Echoes the text after the translator's prompt,
+    so translated rows keep a realistic size.
+    """
+
+    def __init__(self, timer: StageTimer, latency_ms: float = 0.0):
+        self.timer = timer
+        self.latency_ms = latency_ms
+        self.requests = 0
+
+    def __call__(self, *, messages: list[dict], **_: Any) -> SimpleNamespace:
+        with self.timer.stage("translate"):
+            _sleep_ms(self.latency_ms)
+            self.requests += 1
+            content = messages[-1]["content"].split("\n\n", 1)[-1]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+# ─── Topic model ──────────────────────────────────────────────────────────────────────────────────────────────────
+
+
+class FakeSentenceModel:
+    """Replaces the SentenceTransformer behind ``TopicExtractor``."""
+
+    def __init__(self, timer: StageTimer, latency_ms: float = 0.0, dim: int = 384):
+        self.timer = timer
+        self.latency_ms = latency_ms
+        self.dim = dim
+        self.requests = 0
+
+    def encode(self, texts: list[str], normalize_embeddings: bool = True, **_: Any) -> np.ndarray:
+        with self.timer.stage("topic"):
+            _sleep_ms(self.latency_ms)
+            self.requests += 1
+            return np.stack([_stable_vector(text, self.dim) for text in texts])
@@ -1,34 +1,28 @@
 import logging
-import re
+import threading
 from typing import AsyncIterator
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Request, status
-from fastapi.responses import JSONResponse, PlainTextResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi import FastAPI
 
 from app.api import profile
 from app.api.alerts import router as api_alerts
 from app.api.chat import router as api_chat
 from app.api.legislative_files import router as api_legislative_files  # <- make sure this import is correct
 from app.api.meetings import router as api_meetings
+from app.api.metrics import router as api_metrics
 from app.api.notifications import router as notifications_router
 from app.api.scheduler import router as api_scheduler
 from app.api.topics import router as api_topics
 from app.api.countries import router as api_countries
 from app.api.subscriber import router as api_subscriber
 
-from app.core.auth import User, decode_supabase_jwt
+from app.core.cache import response_cache
+from app.core.change_events import start_cache_invalidation
 from app.core.config import Settings
-from app.core.jobs import setup_scheduled_jobs
-from app.core.scheduling import scheduler
-
-
-setup_scheduled_jobs()
-scheduler.start()
+from app.core.lexical_index import start_lexical_indexes
+from app.core.meeting_index import start_meeting_index
+from app.core.middleware import CustomCORSMiddleware, JWTMiddleware
 
 settings = Settings()
 
@@ -44,9 +38,27 @@ logging.getLogger("hpack").setLevel(logging.INFO)
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    FastAPICache.init(InMemoryBackend())
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # the static namespaces are computed once per deployment, not on the first request of every worker
+    threading.Thread(target=response_cache.warm_up, daemon=True, name="CacheWarmUp").start()
+    start_cache_invalidation()
+    if settings.get_meeting_index_enabled():
+        start_meeting_index()
+    if settings.get_lexical_index_enabled():
+        start_lexical_indexes()
+    if settings.should_run_scheduler():
+        # imported here: the job stack pulls in every scraper, Scrapy, Playwright and the topic models.
+        # API-only instances set RUN_SCHEDULER=false and leave the jobs to worker.py
+        from app.core.jobs import setup_scheduled_jobs
+        from app.core.scheduling import scheduler
+
+        setup_scheduled_jobs()
+        scheduler.start()
+        app.state.scheduler = scheduler
     yield
+    if getattr(app.state, "scheduler", None) is not None:
+        # store buffered job runs and hand leadership over right away instead of after the lease expired
+        app.state.scheduler.stop()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -61,88 +73,7 @@ app.include_router(api_subscriber)
 
 app.include_router(notifications_router)
 app.include_router(api_alerts)
-
-
-class JWTMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.public_paths = [
-            r"^/$",
-            r"^/docs$",
-            r"^/redoc$",
-            r"^/openapi.json$",
-            r"^/topics",
-            r"^/countries",
-        ]
-
-    async def dispatch(self, request: Request, call_next):
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        for pattern in self.public_paths:
-            if re.match(pattern, request.url.path):
-                response = await call_next(request)
-                return response
-
-        auth_header = request.headers.get("Authorization")
-        if not auth_header:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": "Authentication required. Missing Authorization header."},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        try:
-            scheme, token = auth_header.split()
-            if scheme.lower() != "bearer":
-                raise ValueError("Invalid authentication scheme. Must be Bearer.")
-
-            payload = decode_supabase_jwt(token)
-            # Store the decoded user information in request.state
-            # This makes the user object available to any endpoint via `request.state.user`
-            # or through the `get_current_user` dependency.
-            request.state.user = User(id=payload.get("sub"), email=payload.get("email"))
-
-        except (ValueError, HTTPException) as e:
-            detail = getattr(e, "detail", str(e))
-
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"detail": f"Invalid authentication token: {detail}"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        except Exception as e:
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={"detail": f"An unexpected error occurred during authentication: {e}"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        response = await call_next(request)
-        return response
-
-
-class CustomCORSMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        origin = request.headers.get("origin")
-        is_allowed_origin = origin and (
-            origin.startswith("http://localhost")
-            or origin.endswith("netlify.app")
-            or origin.endswith("openeu.csee.tech")
-        )
-
-        if request.method == "OPTIONS" and is_allowed_origin:
-            response = PlainTextResponse("Preflight OK", status_code=200)
-        else:
-            response = await call_next(request)
-
-        if is_allowed_origin:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            response.headers["Access-Control-Allow-Credentials"] = "true"
-            response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS,PATCH"
-            response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
-
-        return response
+app.include_router(api_metrics)
 
 
 if not settings.get_disable_auth():
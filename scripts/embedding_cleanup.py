@@ -1,89 +1,137 @@
 import logging
 import multiprocessing
-from pydantic import BaseModel
+from collections.abc import Iterator
+
+from postgrest.exceptions import APIError
 
 from app.core.supabase_client import supabase
 
 logger = logging.getLogger(__name__)
 
 
-class EmbeddingEntry(BaseModel):
-    id: str
-    source_table: str
-    source_id: str
-    content_column: str
-    content_text: str
-    embedding: str
-    created_at: str
+EMBEDDING_TABLES = ["documents_embeddings", "meeting_embeddings"]
+PAGE_SIZE = 1000
+# ids per `in.(...)` filter, keeps the request URL short enough for PostgREST
+ID_CHUNK_SIZE = 200
+# PostgreSQL / PostgREST error codes for a source table that does not exist (anymore)
+MISSING_TABLE_CODES = {"42P01", "PGRST205"}
 
 
-EMBEDDING_TABLE_NAME = "documents_embeddings"
-BATCH_SIZE = 500
+def _chunks(items: list[str], size: int = ID_CHUNK_SIZE) -> Iterator[list[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
 
 
-def fetch_embeddings_batch(offset: int) -> list[EmbeddingEntry]:
+def fetch_embedding_refs_page(embedding_table: str, after_id: str | None) -> list[dict]:
     """
-    Fetch a batch of embedding records from the database.
+    Fetch the next page of (id, source_table, source_id) references, ordered by id.
+    Keyset pagination: deleting rows of earlier pages does not shift later pages.
+    Vectors and texts are never selected.
     """
-    response = supabase.table(EMBEDDING_TABLE_NAME).select("*").range(offset, offset + BATCH_SIZE - 1).execute()
-    data = response.data
-    return [EmbeddingEntry(**entry) for entry in data]
+    query = supabase.table(embedding_table).select("id, source_table, source_id").order("id").limit(PAGE_SIZE)
+    if after_id is not None:
+        query = query.gt("id", after_id)
+    return query.execute().data or []
 
 
-def record_exists(table: str, id_: str) -> bool:
+def fetch_existing_source_ids(source_table: str, source_ids: set[str]) -> set[str] | None:
     """
-    Check if a record with the given id exists in the specified table.
+    Return the subset of source_ids that still exist in source_table.
+    Returns None if existence could not be determined, in which case nothing must be deleted.
     """
+    existing: set[str] = set()
     try:
-        response = supabase.table(table).select("id").eq("id", id_).limit(1).execute()
-        exists = bool(response.data and len(response.data) > 0)
-        return exists
+        for chunk in _chunks(sorted(source_ids)):
+            response = supabase.table(source_table).select("id").in_("id", chunk).execute()
+            existing.update(str(row["id"]) for row in response.data or [])
+    except APIError as e:
+        if e.code in MISSING_TABLE_CODES:
+            logger.warning(f"Source table '{source_table}' does not exist, treating its embeddings as orphans")
+            return set()
+        logger.error(f"Error checking existence of {len(source_ids)} id(s) in {source_table}: {e}")
+        return None
     except Exception as e:
-        logger.error(f"Error checking existence of {table}/{id_}: {e}")
-        return False
+        logger.error(f"Error checking existence of {len(source_ids)} id(s) in {source_table}: {e}")
+        return None
+    return existing
 
 
-def delete_embedding(row_id: str) -> None:
+def delete_embeddings(embedding_table: str, row_ids: list[str]) -> int:
     """
-    Delete the embedding entry with the given id.
+    Delete the embedding rows with the given ids in bulk and return the number of deleted rows.
     """
-    try:
-        supabase.table(EMBEDDING_TABLE_NAME).delete().eq("id", row_id).execute()
-        logger.info(f"Deleted embedding with id={row_id}")
-    except Exception as e:
-        logger.error(f"Error deleting embedding with id={row_id}: {e}")
+    deleted = 0
+    for chunk in _chunks(row_ids):
+        try:
+            supabase.table(embedding_table).delete().in_("id", chunk).execute()
+            deleted += len(chunk)
+        except Exception as e:
+            logger.error(f"Error deleting {len(chunk)} embedding(s) from {embedding_table}: {e}")
+    return deleted
+
+
+def find_orphans(refs: list[dict]) -> list[str]:
+    """
+    Anti-join one page of embedding references against their source tables, one query per source table.
+    Returns the ids of the embedding rows whose source record no longer exists.
+    """
+    by_source_table: dict[str, list[dict]] = {}
+    for ref in refs:
+        by_source_table.setdefault(ref["source_table"], []).append(ref)
+
+    orphan_ids: list[str] = []
+    for source_table, table_refs in by_source_table.items():
+        existing = fetch_existing_source_ids(source_table, {str(ref["source_id"]) for ref in table_refs})
+        if existing is None:
+            continue
+        orphan_ids.extend(ref["id"] for ref in table_refs if str(ref["source_id"]) not in existing)
+    return orphan_ids
+
+
+def sweep_embedding_table(embedding_table: str, stop_event: multiprocessing.synchronize.Event) -> tuple[int, int]:
+    """
+    Sweep a single embedding table and return (processed, deleted).
+    """
+    after_id: str | None = None
+    processed = 0
+    deleted = 0
+
+    while not stop_event.is_set():
+        refs = fetch_embedding_refs_page(embedding_table, after_id)
+        if not refs:
+            break
+
+        orphan_ids = find_orphans(refs)
+        if orphan_ids:
+            deleted += delete_embeddings(embedding_table, orphan_ids)
+
+        processed += len(refs)
+        after_id = refs[-1]["id"]
+
+    if stop_event.is_set():
+        logger.error(f"Sweep of {embedding_table} stopped by stop event.")
+    logger.info(f"Swept {embedding_table}: processed {processed}, deleted {deleted} orphaned embedding(s)")
+    return processed, deleted
 
 
 def embedding_cleanup(stop_event: multiprocessing.synchronize.Event) -> None:
     """
-    Fetches all embeddings in batches and deletes any whose source
-    record no longer exists.
+    Deletes all embeddings in documents_embeddings and meeting_embeddings whose
+    source record no longer exists.
     """
-    offset = 0
     total_processed = 0
+    total_deleted = 0
 
-    while True:
+    for embedding_table in EMBEDDING_TABLES:
         if stop_event.is_set():
             logger.error("Embedding cleanup stopped by stop event.")
             break
 
-        batch = fetch_embeddings_batch(offset)
-        if not batch:
-            break
-
-        for entry in batch:
-            source_table = entry.source_table
-            source_id = entry.source_id
-            row_id = entry.id
-
-            if not record_exists(source_table, source_id):
-                logger.info(f"Deleting embedding for missing record {source_table}/{source_id}")
-                delete_embedding(row_id)
-
-        total_processed += len(batch)
-        offset += BATCH_SIZE
+        processed, deleted = sweep_embedding_table(embedding_table, stop_event)
+        total_processed += processed
+        total_deleted += deleted
 
-    logger.info(f"Completed embedding cleanup. Total processed: {total_processed}")
+    logger.info(f"Completed embedding cleanup. Total processed: {total_processed}, deleted: {total_deleted}")
 
 
 if __name__ == "__main__":
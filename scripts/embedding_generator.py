@@ -1,30 +1,72 @@
 import logging
 from typing import Optional
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import tiktoken
 from postgrest.exceptions import APIError
 
 from app.core.config import Settings
-from app.core.openai_client import BATCH_SZ, EMBED_MODEL, MAX_TOKENS, openai
+from app.core.model_server import get_model_client
+from app.core.openai_client import (
+    EMBED_MODEL,
+    MAX_INPUTS_PER_REQUEST,
+    MAX_TOKENS,
+    MAX_TOKENS_PER_REQUEST,
+    create_embeddings,
+)
+from app.core.rate_limits import Priority
 from app.core.supabase_client import supabase
 
 
+def pack_by_tokens(
+    token_counts: list[int],
+    max_tokens: int = MAX_TOKENS_PER_REQUEST,
+    max_inputs: int = MAX_INPUTS_PER_REQUEST,
+) -> list[list[int]]:
+    """
+    Greedily packs inputs into as few embedding requests as possible.
+
+    Args:
+        token_counts: Token count of each input, in input order.
+        max_tokens: Upper bound of tokens per request.
+        max_inputs: Upper bound of inputs per request.
+
+    Returns:
+        One list of input indices per request.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    current_tokens = 0
+    for i, count in enumerate(token_counts):
+        if current and (current_tokens + count > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += count
+    if current:
+        batches.append(current)
+    return batches
+
+
 class EmbeddingGenerator:
+    # shared by all instances of a process, every scraper creates its own generator
+    _known_meeting_sources: Optional[list[str]] = None
+
     def __init__(self, max_tokens: int = MAX_TOKENS, overlap: int = 100):
-        try:
-            response = supabase.rpc("get_meeting_tables").execute().data
-            self.known_meeting_sources = [row["source_table"] for row in response]
+        self.model_client = get_model_client()
 
+        try:
+            self.known_meeting_sources = self._load_known_meeting_sources()
         except Exception as e:
             logging.error(f"Failed to init EmbeddingGenerator with exception: {e}")
             raise e
 
         self.settings = Settings()
 
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=max_tokens,
-            chunk_overlap=overlap,
-        )
+        # chunk sizes are measured in tokens of the embedding model, not in characters
+        self.encoding = tiktoken.encoding_for_model(EMBED_MODEL)
+        self.max_tokens = max_tokens
+        self.overlap = overlap
+        self._text_splitter = None
 
         self.META_DELIM = "::META::"
 
@@ -33,9 +75,65 @@ class EmbeddingGenerator:
             "meeting_embeddings": "source_table, source_id",
         }
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        resp = openai.embeddings.create(model=EMBED_MODEL, input=texts)
-        return [d.embedding for d in resp.data]
+    def _load_known_meeting_sources(self) -> list[str]:
+        if EmbeddingGenerator._known_meeting_sources is None:
+            if self.model_client is not None:
+                EmbeddingGenerator._known_meeting_sources = self.model_client.get_meeting_sources()
+            else:
+                response = supabase.rpc("get_meeting_tables").execute().data
+                EmbeddingGenerator._known_meeting_sources = [row["source_table"] for row in response]
+        return EmbeddingGenerator._known_meeting_sources
+
+    def embed_batch(self, texts: list[str], via_model_server: bool = True) -> list[list[float]]:
+        """
+        :param via_model_server: Send small requests through the model server, which coalesces those of
+            concurrently running jobs. Requests already packed to the API limits are sent directly, the server would
+            split them up again and run them one after another. Falls back to direct requests if the server is
+            unreachable.
+        """
+        if via_model_server and self.model_client is not None:
+            try:
+                return self.model_client.embed(texts).tolist()
+            except Exception as e:
+                logging.warning(f"Model server embed failed, falling back to direct requests: {e}")
+                self.model_client = None
+        return create_embeddings(texts, caller="embedding_generator", priority=Priority.BATCH)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text))
+
+    @property
+    def text_splitter(self):
+        # langchain is only needed for chunking long documents, not for meetings; import it on first use
+        if self._text_splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+            self._text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+                model_name=EMBED_MODEL,
+                chunk_size=self.max_tokens,
+                chunk_overlap=self.overlap,
+            )
+        return self._text_splitter
+
+    def split_content(self, content_text: str) -> tuple[str, list[str]]:
+        """
+        Splits off the optional metadata prefix and chunks the remaining text.
+
+        Returns:
+            The metadata prefix (empty if there is none) and the list of chunks.
+        """
+        if self.META_DELIM in content_text:
+            base_meta, content_text = content_text.split(self.META_DELIM, 1)
+        else:
+            base_meta = ""
+        return base_meta, self.text_splitter.split_text(content_text)
+
+    def prepare_meeting_text(self, content_text: str) -> str:
+        """
+        Returns the text that is embedded for a meeting: the metadata prefix and the first chunk only.
+        """
+        base_meta, chunks = self.split_content(content_text)
+        return base_meta + (chunks[0] if chunks else "")
 
     def embed_row(
         self,
@@ -57,11 +155,6 @@ class EmbeddingGenerator:
             destination_table: Optional override for where to store embeddings.
         """
 
-        if self.META_DELIM in content_text:
-            base_meta, content_text = content_text.split(self.META_DELIM, 1)
-        else:
-            base_meta = ""
-
         if not destination_table:
             destination_table = (
                 "meeting_embeddings" if source_table in self.known_meeting_sources else "documents_embeddings"
@@ -69,9 +162,9 @@ class EmbeddingGenerator:
 
         conflicts = self.conflict_map.get(destination_table, "")
 
-        chunks = self.text_splitter.split_text(content_text)
+        base_meta, chunks = self.split_content(content_text)
 
-        chunks = [chunks[0]] if destination_table == "meeting_embeddings" else chunks
+        chunks = chunks[:1] if destination_table == "meeting_embeddings" else chunks
         upsert_rows: list[dict] = []
 
         for chunk in chunks:
@@ -88,8 +181,10 @@ class EmbeddingGenerator:
 
         logging.info(f"Embedding {source_table}")
 
-        for i in range(0, len(upsert_rows), BATCH_SZ):
-            batch = upsert_rows[i : i + BATCH_SZ]
+        token_counts = [self.count_tokens(r["content_text"]) for r in upsert_rows]
+
+        for batch_no, indices in enumerate(pack_by_tokens(token_counts), start=1):
+            batch = [upsert_rows[i] for i in indices]
             texts = [r["content_text"] for r in batch]
 
             try:
@@ -97,7 +192,7 @@ class EmbeddingGenerator:
                 for rec, vec in zip(batch, vectors):
                     rec["embedding"] = vec
             except Exception as e:
-                logging.error(f"Embedding failed on batch {i // BATCH_SZ + 1}: {e}")
+                logging.error(f"Embedding failed on batch {batch_no}: {e}")
                 continue
 
             try:
@@ -105,4 +200,4 @@ class EmbeddingGenerator:
             except APIError as e:
                 logging.error(f"Supabase APIError: {e}")
             except Exception as e:
-                logging.error(f"Unexpected error during upsert for batch {i // BATCH_SZ + 1}: {e}")
+                logging.error(f"Unexpected error during upsert for batch {batch_no}: {e}")
@@ -1,61 +1,150 @@
 import logging
+import multiprocessing
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from postgrest.exceptions import APIError
+
+from app.core.change_events import meeting_id, publish_change
 from app.core.supabase_client import supabase
-from scripts.embedding_generator import EmbeddingGenerator
+from app.data_sources.scraper_base import ScraperResult
+from scripts.embedding_generator import EmbeddingGenerator, pack_by_tokens
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-generator = EmbeddingGenerator()
+DESTINATION_TABLE = "meeting_embeddings"
+CONCURRENCY = 4  # embedding requests in flight at the same time
+ID_CHUNK_SIZE = 200  # ids per `in.(...)` filter when loading source texts
+# PostgreSQL / PostgREST error codes for a source table without an embedding_input column
+MISSING_COLUMN_CODES = {"42703", "PGRST204"}
+
+
+def load_missing_rows(meetings: list[dict], generator: EmbeddingGenerator) -> list[dict]:
+    """
+    Bulk-loads the embedding input of all meetings without embedding, one query per source table and id chunk.
+    Falls back to the meeting title if the source row or table has no embedding input. Meetings whose input could
+    not be loaded are left out, they are still without embedding on the next run.
+    """
+    titles_by_table: dict[str, dict[str, str]] = {}
+    for meeting in meetings:
+        titles_by_table.setdefault(meeting["source_table"], {})[str(meeting["source_id"])] = meeting.get("title") or ""
+
+    rows: list[dict] = []
+    for source_table, titles in titles_by_table.items():
+        inputs: dict[str, str] = {}
+        unloaded: set[str] = set()
+        ids = list(titles)
+        for i in range(0, len(ids), ID_CHUNK_SIZE):
+            chunk = ids[i : i + ID_CHUNK_SIZE]
+            try:
+                response = supabase.table(source_table).select("id, embedding_input").in_("id", chunk).execute()
+                inputs.update({str(r["id"]): r["embedding_input"] for r in response.data or [] if r["embedding_input"]})
+            except APIError as e:
+                if e.code in MISSING_COLUMN_CODES:
+                    logger.warning(f"{source_table} has no embedding input, using titles: {e}")
+                    break
+                logger.error(f"Could not load embedding input of {len(chunk)} meeting(s) from {source_table}: {e}")
+                unloaded.update(chunk)
+            except Exception as e:
+                logger.error(f"Could not load embedding input of {len(chunk)} meeting(s) from {source_table}: {e}")
+                unloaded.update(chunk)
+
+        for source_id, title in titles.items():
+            if source_id in unloaded:
+                continue
+            content_text = generator.prepare_meeting_text(inputs.get(source_id) or title)
+            if not content_text.strip():
+                continue
+            rows.append(
+                {
+                    "source_table": source_table,
+                    "source_id": source_id,
+                    "content_column": "embedding_input",
+                    "content_text": content_text,
+                }
+            )
+    return rows
+
+
+def embed_and_store(
+    rows: list[dict],
+    tokens: int,
+    generator: EmbeddingGenerator,
+    stop_event: multiprocessing.synchronize.Event | None,
+) -> int:
+    """
+    Embeds one packed request and bulk-upserts the vectors. Returns the number of stored embeddings.
+    The request goes to OpenAI directly, rate limits and 429 retries are handled by the shared limiter; a batch
+    that still fails is left for the next run.
+    """
+    if stop_event is not None and stop_event.is_set():
+        return 0
+    try:
+        vectors = generator.embed_batch([r["content_text"] for r in rows], via_model_server=False)
+        payload = [{**row, "embedding": vector} for row, vector in zip(rows, vectors, strict=True)]
+        supabase.table(DESTINATION_TABLE).upsert(
+            payload, on_conflict=generator.conflict_map[DESTINATION_TABLE]
+        ).execute()
+        publish_change(DESTINATION_TABLE, [meeting_id(row["source_table"], row["source_id"]) for row in rows])
+        return len(payload)
+    except Exception:
+        logger.exception(f"Failed to embed a batch of {len(rows)} meeting(s) ({tokens} tokens).")
+        return 0
 
 
-def embedd_missing_entries():
+def embedd_missing_entries(
+    stop_event: multiprocessing.synchronize.Event | None = None,
+    concurrency: int = CONCURRENCY,
+) -> ScraperResult:
     """
-    Fetch meetings without embeddings and attempt to generate embeddings
-    with up to 3 retries per meeting before giving up.
+    Backfills embeddings for all meetings without one.
+    Texts are bulk-loaded per source table, packed into requests by token count and
+    embedded by several concurrent requests within the shared embedding rate limits.
     """
+    started = time.monotonic()
     try:
         response = supabase.rpc("get_meetings_without_embeddings").execute()
         meetings = response.data or []
         logger.info(f"Fetched {len(meetings)} meetings without embeddings.")
-    except Exception:
+    except Exception as e:
         logger.exception("Failed to fetch meetings without embeddings.")
-        return
+        return ScraperResult(success=False, error=e)
 
-    for meeting in meetings:
-        meeting_id = meeting.get("source_id")
-        source_table = meeting.get("source_table")
+    if not meetings:
+        return ScraperResult(success=True)
 
-        for attempt in range(1, 4):  # Try up to 3 times
-            try:
-                # Fetch source content
-                src_resp = supabase.table(source_table).select("*").eq("id", meeting_id).single().execute()
-                content_text = src_resp.data.get("embedding_input") or meeting.get("title")
-
-                # Generate and store embedding
-                generator.embed_row(
-                    source_table=source_table,
-                    row_id=meeting_id,
-                    content_column="embedding_input",
-                    content_text=content_text,
-                    destination_table="meeting_embeddings",
-                )
-
-                logger.info(
-                    f"Successfully embedded meeting id={meeting_id} "
-                    f"from table='{source_table}' on attempt {attempt}."
-                )
-                break  # Exit retry loop on success
-
-            except Exception:
-                logger.exception(f"Attempt {attempt} failed for meeting id={meeting_id} from table='{source_table}'.")
-                if attempt < 3:
-                    wait_time = attempt * 2
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Giving up on meeting id={meeting_id} from table='{source_table}' after 3 attempts.")
+    generator = EmbeddingGenerator()
+    rows = load_missing_rows(meetings, generator)
+    token_counts = [generator.count_tokens(row["content_text"]) for row in rows]
+    batches = pack_by_tokens(token_counts)
+
+    embedded = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(
+                embed_and_store,
+                [rows[i] for i in batch],
+                sum(token_counts[i] for i in batch),
+                generator,
+                stop_event,
+            )
+            for batch in batches
+        ]
+        for future in as_completed(futures):
+            embedded += future.result()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Embedded {embedded}/{len(rows)} meeting(s) with {sum(token_counts)} tokens in {len(batches)} request(s) "
+        f"in {elapsed:.1f}s ({embedded / elapsed if elapsed else 0:.1f} embeddings/s)."
+    )
+    missing = len(rows) - embedded
+    return ScraperResult(
+        success=missing == 0,
+        lines_added=embedded,
+        error=Exception(f"{missing} meeting(s) could not be embedded") if missing else None,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+"""Memory use and recall of the quantized vector stores on our own embeddings.
+
+Usage::
+
+    python -m scripts.quantization_report                          # profile and alert embeddings as queries
+    python -m scripts.quantization_report --queries meetings --sample 500 --k 10 100 --output quantization.json
+
+Loads all meeting embeddings into every store of ``app/core/quantization.py`` and searches them with the query
+embeddings. Per store the report lists the memory per vector and in total, the median and p95 search latency, and
+recall@k: the share of the exact float32 top k that the store returns as well.
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+
+import numpy as np
+
+from app.core.openai_client import EMBED_DIM
+from app.core.quantization import QUANTIZATION_MODES, make_vector_store, parse_vector
+from app.core.supabase_client import supabase
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def load_embeddings(table: str) -> np.ndarray:
+    vectors: list[np.ndarray] = []
+    while True:
+        page = (
+            supabase.table(table)
+            .select("embedding")
+            .not_.is_("embedding", "null")
+            .range(len(vectors), len(vectors) + PAGE_SIZE - 1)
+            .execute()
+            .data
+            or []
+        )
+        vectors.extend(parse_vector(row["embedding"]) for row in page)
+        if len(page) < PAGE_SIZE:
+            break
+    logger.info(f"Loaded {len(vectors)} embeddings from {table}")
+    return np.stack(vectors) if vectors else np.zeros((0, EMBED_DIM), dtype=np.float32)
+
+
+def query_embeddings(source: str, corpus: np.ndarray, sample: int, seed: int) -> np.ndarray:
+    if source == "meetings":
+        queries = corpus
+    else:
+        queries = np.concatenate([load_embeddings("profiles"), load_embeddings("alerts")])
+    rows = random.Random(seed).sample(range(len(queries)), min(sample, len(queries)))
+    return queries[rows]
+
+
+def evaluate(corpus: np.ndarray, queries: np.ndarray, ks: list[int]) -> dict:
+    rows = np.arange(len(corpus))
+    stores = {}
+    for mode in QUANTIZATION_MODES:
+        store = make_vector_store(mode, corpus.shape[1], len(corpus))
+        for row, vector in enumerate(corpus):
+            store.set(row, vector)
+        stores[mode] = store
+
+    exact = stores["float32"]
+    report = {}
+    for mode, store in stores.items():
+        latencies = []
+        recalls: dict[int, list[float]] = {k: [] for k in ks}
+        for query in queries:
+            for k in ks:
+                started = time.perf_counter()
+                found, _ = store.search(query, rows, k)
+                latencies.append(time.perf_counter() - started)
+                expected, _ = exact.search(query, rows, k)
+                recalls[k].append(len(set(found.tolist()) & set(expected.tolist())) / max(1, len(expected)))
+        latencies.sort()
+        report[mode] = {
+            "bytes_per_vector": store.nbytes / max(1, store.capacity),
+            "total_mb": store.nbytes / 2**20,
+            "latency_p50_ms": 1000 * latencies[len(latencies) // 2] if latencies else None,
+            "latency_p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            if latencies
+            else None,
+            **{f"recall@{k}": statistics.fmean(values) if values else None for k, values in recalls.items()},
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", choices=["profiles", "meetings"], default="profiles")
+    parser.add_argument("--sample", type=int, default=200, help="number of query embeddings")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    corpus = load_embeddings("meeting_embeddings")
+    queries = query_embeddings(args.queries, corpus, args.sample, args.seed)
+    report = {
+        "vectors": len(corpus),
+        "queries": len(queries),
+        "query_source": args.queries,
+        "stores": evaluate(corpus, queries, args.k),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
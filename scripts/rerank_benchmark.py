@@ -0,0 +1,136 @@
+"""Latency, throughput and agreement of the rerank backends on recorded search queries.
+
+Usage::
+
+    python -m scripts.rerank_benchmark                             # 50 meeting searches, 1000 candidates each
+    python -m scripts.rerank_benchmark --corpus legislative_files --sample 20 --remote-top-n 50 --output rerank.json
+
+Replays reformulated search queries from ``query_reformulations`` against their vector search candidates, the same
+candidates the API reranks. Every backend of ``app/core/rerank.py`` scores all candidates of a query, bypassing the
+score cache and the pruning. Per backend the report lists the median and p95 latency per query, the documents
+scored per second, the Cohere search units billed, and overlap@k: the share of Cohere's top k it ranks in its top k.
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+
+from app.core.config import Settings
+from app.core.rate_limits import Priority
+from app.core.reformulation import REFORMULATIONS_TABLE
+from app.core.rerank import CohereRerankBackend, CrossEncoderRerankBackend, HybridRerankBackend, RerankBackend
+from app.core.supabase_client import supabase
+from app.core.vector_search import get_top_k_neighbors
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROMPTS = {
+    "meetings": ["meeting_search"],
+    "legislative_files": ["legislative_search", "legislative_search_with_profile"],
+}
+CALLER = "rerank_benchmark"
+
+
+def recorded_queries(corpus: str, sample: int, seed: int) -> list[str]:
+    rows = supabase.table(REFORMULATIONS_TABLE).select("output").in_("prompt", PROMPTS[corpus]).execute().data or []
+    queries = sorted({row["output"] for row in rows if row["output"]})
+    return random.Random(seed).sample(queries, min(sample, len(queries)))
+
+
+def candidates(corpus: str, query: str, k: int) -> list[str]:
+    if corpus == "meetings":
+        neighbors = get_top_k_neighbors(query=query, k=k, sources=["meeting_embeddings"], priority=Priority.BATCH)
+    else:
+        neighbors = get_top_k_neighbors(
+            query=query,
+            k=k,
+            sources=["document_embeddings"],
+            allowed_sources={"legislative_files": "embedding_input"},
+            priority=Priority.BATCH,
+        )
+    return [neighbor.get("content_text") or "" for neighbor in neighbors]
+
+
+def ranking(scores: list[float | None]) -> list[int]:
+    scored = [i for i, score in enumerate(scores) if score is not None]
+    return sorted(scored, key=lambda i: scores[i], reverse=True)
+
+
+def evaluate(backends: dict[str, RerankBackend], workload: list[tuple[str, list[str]]], ks: list[int]) -> dict:
+    rankings: dict[str, list[list[int]]] = {name: [] for name in backends}
+    report = {}
+    for name, backend in backends.items():
+        latencies = []
+        documents = 0
+        search_units = 0
+        for query, texts in workload:
+            started = time.perf_counter()
+            scores, units = backend.score(query, texts, CALLER, Priority.BATCH)
+            latencies.append(time.perf_counter() - started)
+            documents += len(texts)
+            search_units += units
+            rankings[name].append(ranking(scores))
+        latencies.sort()
+        report[name] = {
+            "latency_p50_ms": 1000 * latencies[len(latencies) // 2] if latencies else None,
+            "latency_p95_ms": 1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            if latencies
+            else None,
+            "documents_per_second": documents / sum(latencies) if latencies and sum(latencies) else None,
+            "search_units": search_units,
+        }
+
+    reference = rankings["remote"]
+    for name in backends:
+        for k in ks:
+            overlaps = [
+                len(set(found[:k]) & set(expected[:k])) / max(1, min(k, len(expected)))
+                for found, expected in zip(rankings[name], reference, strict=True)
+            ]
+            report[name][f"overlap@{k}"] = statistics.fmean(overlaps) if overlaps else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", choices=list(PROMPTS), default="meetings")
+    parser.add_argument("--sample", type=int, default=50, help="number of recorded queries")
+    parser.add_argument("--candidates", type=int, default=1000, help="vector search candidates per query")
+    parser.add_argument("--remote-top-n", type=int, default=Settings().get_rerank_remote_top_n())
+    parser.add_argument("--model", default=Settings().get_rerank_local_model(), help="local cross-encoder")
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10, 50])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    queries = recorded_queries(args.corpus, args.sample, args.seed)
+    workload = [(query, candidates(args.corpus, query, args.candidates)) for query in queries]
+    logger.info(f"Benchmarking {len(workload)} queries with {sum(len(t) for _, t in workload)} candidates")
+
+    remote = CohereRerankBackend()
+    local = CrossEncoderRerankBackend(args.model)
+    local.score("warm-up", ["load the model before timing"], CALLER, Priority.BATCH)
+    backends = {
+        "remote": remote,
+        "local": local,
+        "hybrid": HybridRerankBackend(local, remote, args.remote_top_n),
+    }
+    report = {
+        "corpus": args.corpus,
+        "queries": len(workload),
+        "candidates": args.candidates,
+        "backends": {name: backend.name for name, backend in backends.items()},
+        "results": evaluate(backends, workload, args.k),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
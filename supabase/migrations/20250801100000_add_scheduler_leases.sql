@@ -0,0 +1,80 @@
+create table "public"."scheduler_leases" (
+    "name" text not null,
+    "holder" text not null,
+    "address" text,
+    "acquired_at" timestamp with time zone not null default now(),
+    "expires_at" timestamp with time zone not null
+);
+
+CREATE UNIQUE INDEX scheduler_leases_pkey ON public.scheduler_leases USING btree (name);
+
+alter table "public"."scheduler_leases" add constraint "scheduler_leases_pkey" PRIMARY KEY using index "scheduler_leases_pkey";
+
+grant delete on table "public"."scheduler_leases" to "anon";
+
+grant insert on table "public"."scheduler_leases" to "anon";
+
+grant references on table "public"."scheduler_leases" to "anon";
+
+grant select on table "public"."scheduler_leases" to "anon";
+
+grant trigger on table "public"."scheduler_leases" to "anon";
+
+grant truncate on table "public"."scheduler_leases" to "anon";
+
+grant update on table "public"."scheduler_leases" to "anon";
+
+grant delete on table "public"."scheduler_leases" to "authenticated";
+
+grant insert on table "public"."scheduler_leases" to "authenticated";
+
+grant references on table "public"."scheduler_leases" to "authenticated";
+
+grant select on table "public"."scheduler_leases" to "authenticated";
+
+grant trigger on table "public"."scheduler_leases" to "authenticated";
+
+grant truncate on table "public"."scheduler_leases" to "authenticated";
+
+grant update on table "public"."scheduler_leases" to "authenticated";
+
+grant delete on table "public"."scheduler_leases" to "service_role";
+
+grant insert on table "public"."scheduler_leases" to "service_role";
+
+grant references on table "public"."scheduler_leases" to "service_role";
+
+grant select on table "public"."scheduler_leases" to "service_role";
+
+grant trigger on table "public"."scheduler_leases" to "service_role";
+
+grant truncate on table "public"."scheduler_leases" to "service_role";
+
+grant update on table "public"."scheduler_leases" to "service_role";
+
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.acquire_scheduler_lease(lease_name text, lease_holder text, lease_address text, ttl_seconds integer)
+ RETURNS SETOF scheduler_leases
+ LANGUAGE sql
+AS $function$
+    INSERT INTO scheduler_leases AS l (name, holder, address, acquired_at, expires_at)
+    VALUES (lease_name, lease_holder, lease_address, now(), now() + make_interval(secs => ttl_seconds))
+    ON CONFLICT (name) DO UPDATE
+        SET holder = excluded.holder,
+            address = excluded.address,
+            acquired_at = CASE WHEN l.holder = excluded.holder THEN l.acquired_at ELSE now() END,
+            expires_at = excluded.expires_at
+        WHERE l.holder = excluded.holder OR l.expires_at < now();
+
+    SELECT * FROM scheduler_leases WHERE name = lease_name;
+$function$
+;
+
+CREATE OR REPLACE FUNCTION public.release_scheduler_lease(lease_name text, lease_holder text)
+ RETURNS void
+ LANGUAGE sql
+AS $function$
+    DELETE FROM scheduler_leases WHERE name = lease_name AND holder = lease_holder;
+$function$
+;
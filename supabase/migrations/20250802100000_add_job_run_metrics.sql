@@ -0,0 +1,19 @@
+alter table "public"."scheduled_job_runs" add column "started_at" timestamp without time zone;
+
+alter table "public"."scheduled_job_runs" add column "finished_at" timestamp without time zone;
+
+alter table "public"."scheduled_job_runs" add column "duration_seconds" double precision;
+
+alter table "public"."scheduled_job_runs" add column "rows_scraped" bigint;
+
+alter table "public"."scheduled_job_runs" add column "rows_written" bigint;
+
+alter table "public"."scheduled_job_runs" add column "rows_skipped" bigint;
+
+alter table "public"."scheduled_job_runs" add column "external_calls" bigint;
+
+alter table "public"."scheduled_job_runs" add column "peak_rss_mb" double precision;
+
+alter table "public"."scheduled_job_runs" add column "exit_reason" text;
+
+CREATE INDEX scheduled_job_runs_started_at_idx ON public.scheduled_job_runs USING btree (started_at);
@@ -0,0 +1,8 @@
+CREATE INDEX scheduled_job_runs_name_last_run_at_idx ON public.scheduled_job_runs USING btree (name, last_run_at DESC);
+
+create or replace view "public"."v_latest_job_runs" as  SELECT DISTINCT ON (scheduled_job_runs.name) scheduled_job_runs.name,
+    scheduled_job_runs.last_run_at,
+    scheduled_job_runs.success,
+    scheduled_job_runs.exit_reason
+   FROM scheduled_job_runs
+  ORDER BY scheduled_job_runs.name, scheduled_job_runs.last_run_at DESC NULLS LAST;
@@ -0,0 +1,98 @@
+create table "public"."query_reformulations" (
+    "prompt" text not null,
+    "prompt_version" integer not null,
+    "input_hash" text not null,
+    "output" text not null,
+    "created_at" timestamp with time zone not null default now(),
+    "last_used_at" timestamp with time zone not null default now()
+);
+
+CREATE UNIQUE INDEX query_reformulations_pkey ON public.query_reformulations USING btree (prompt, prompt_version, input_hash);
+
+CREATE INDEX query_reformulations_last_used_at_idx ON public.query_reformulations USING btree (last_used_at);
+
+alter table "public"."query_reformulations" add constraint "query_reformulations_pkey" PRIMARY KEY using index "query_reformulations_pkey";
+
+alter table "public"."profiles" add column "query_reformulations" jsonb not null default '{}'::jsonb;
+
+grant delete on table "public"."query_reformulations" to "anon";
+
+grant insert on table "public"."query_reformulations" to "anon";
+
+grant references on table "public"."query_reformulations" to "anon";
+
+grant select on table "public"."query_reformulations" to "anon";
+
+grant trigger on table "public"."query_reformulations" to "anon";
+
+grant truncate on table "public"."query_reformulations" to "anon";
+
+grant update on table "public"."query_reformulations" to "anon";
+
+grant delete on table "public"."query_reformulations" to "authenticated";
+
+grant insert on table "public"."query_reformulations" to "authenticated";
+
+grant references on table "public"."query_reformulations" to "authenticated";
+
+grant select on table "public"."query_reformulations" to "authenticated";
+
+grant trigger on table "public"."query_reformulations" to "authenticated";
+
+grant truncate on table "public"."query_reformulations" to "authenticated";
+
+grant update on table "public"."query_reformulations" to "authenticated";
+
+grant delete on table "public"."query_reformulations" to "service_role";
+
+grant insert on table "public"."query_reformulations" to "service_role";
+
+grant references on table "public"."query_reformulations" to "service_role";
+
+grant select on table "public"."query_reformulations" to "service_role";
+
+grant trigger on table "public"."query_reformulations" to "service_role";
+
+grant truncate on table "public"."query_reformulations" to "service_role";
+
+grant update on table "public"."query_reformulations" to "service_role";
+
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.prune_query_reformulations(max_rows integer)
+ RETURNS integer
+ LANGUAGE sql
+AS $function$
+    WITH evicted AS (
+        DELETE FROM query_reformulations
+        WHERE (prompt, prompt_version, input_hash) IN (
+            SELECT prompt, prompt_version, input_hash
+            FROM query_reformulations
+            ORDER BY last_used_at DESC
+            OFFSET max_rows
+        )
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM evicted;
+$function$
+;
+
+drop view if exists "public"."v_profiles";
+
+create or replace view "public"."v_profiles" as  SELECT p.id,
+    p.name,
+    p.surname,
+    p.user_type,
+    p.countries,
+    p.newsletter_frequency,
+    p.embedding_input,
+    p.embedding,
+    p.query_reformulations,
+    row_to_json(c.*) AS company,
+    row_to_json(pol.*) AS politician,
+    array_remove(array_agg(DISTINCT top.topic_id), NULL::text) AS topic_ids
+   FROM (((profiles p
+     LEFT JOIN companies c ON ((p.company_id = c.id)))
+     LEFT JOIN politicians pol ON ((p.politician_id = pol.id)))
+     LEFT JOIN profiles_to_topics top ON ((p.id = top.profile_id)))
+  GROUP BY p.id, p.name, p.surname, p.user_type, p.countries, p.newsletter_frequency, p.embedding_input, p.embedding, p.query_reformulations, c.id, pol.id;
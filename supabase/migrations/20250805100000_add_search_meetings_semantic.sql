@@ -0,0 +1,68 @@
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.search_meetings_semantic(
+    query_embedding vector,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    content_columns text[] DEFAULT NULL,
+    allowed_topics text[] DEFAULT NULL,
+    allowed_topic_ids text[] DEFAULT NULL,
+    allowed_countries text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    content_text text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $function$
+SELECT
+    vm.meeting_id::text,
+    m.source_table,
+    m.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    m.content_text,
+    m.similarity
+FROM public.match_filtered_meetings(
+         query_embedding, match_count, src_tables, content_columns, allowed_topics, allowed_topic_ids,
+         allowed_countries, start_date, end_date
+     ) AS m
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = m.source_table
+      AND v.source_id = m.source_id
+    LIMIT 1
+    ) AS vm
+ORDER BY m.similarity DESC;
+$function$
+;
@@ -0,0 +1,89 @@
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.search_meetings_for_profile(
+    profile_id uuid,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL,
+    countries text[] DEFAULT NULL,
+    topics text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    content_text text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $function$
+WITH profile AS (
+    SELECT
+        p.embedding,
+        (SELECT array_agg(lower(c)) FROM unnest(p.countries) AS c) AS profile_countries,
+        (SELECT array_agg(pt.topic_id) FROM public.profiles_to_topics pt WHERE pt.profile_id = p.id) AS profile_topic_ids
+    FROM public.profiles p
+    WHERE p.id = search_meetings_for_profile.profile_id
+)
+SELECT
+    vm.meeting_id::text,
+    e.source_table,
+    e.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    e.content_text,
+    ((1 - (e.embedding <#> profile.embedding)) / 2) AS similarity
+FROM profile
+         CROSS JOIN public.meeting_embeddings e
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = e.source_table
+      AND v.source_id = e.source_id
+      AND (topics IS NULL OR v.topic = ANY (topics))
+    LIMIT 1
+    ) AS vm
+WHERE (src_tables IS NULL OR e.source_table = ANY (src_tables))
+  -- profiles without topics or countries are not restricted by them
+  AND (profile.profile_topic_ids IS NULL OR EXISTS (
+    SELECT 1
+    FROM public.meeting_topic_assignments mta
+    WHERE mta.source_table = e.source_table
+      AND mta.source_id = e.source_id
+      AND mta.topic_id = ANY (profile.profile_topic_ids)
+    ))
+  AND (profile.profile_countries IS NULL OR lower(vm.location) = ANY (profile.profile_countries))
+  AND (countries IS NULL OR EXISTS (
+    SELECT 1 FROM unnest(countries) AS c WHERE vm.location ILIKE '%' || c || '%'
+    ))
+  AND (end_date IS NULL OR vm.meeting_start_datetime <= end_date)
+  AND (start_date IS NULL OR COALESCE(vm.meeting_end_datetime, vm.meeting_start_datetime) >= start_date)
+ORDER BY e.embedding <#> profile.embedding
+LIMIT match_count;
+$function$
+;
@@ -0,0 +1,235 @@
+create table "public"."user_recommendations" (
+    "profile_id" uuid not null,
+    "source_table" text not null,
+    "source_id" text not null,
+    "bucket" date,
+    "score" double precision not null,
+    "computed_at" timestamp with time zone not null default now()
+);
+
+create table "public"."recommendation_watermarks" (
+    "corpus" text not null,
+    "embedded_until" timestamp with time zone not null
+);
+
+alter table "public"."profiles" add column "recommendations_hash" text;
+
+CREATE UNIQUE INDEX user_recommendations_pkey ON public.user_recommendations USING btree (profile_id, source_table, source_id);
+
+CREATE INDEX user_recommendations_profile_score_idx ON public.user_recommendations USING btree (profile_id, score DESC);
+
+CREATE UNIQUE INDEX recommendation_watermarks_pkey ON public.recommendation_watermarks USING btree (corpus);
+
+alter table "public"."user_recommendations" add constraint "user_recommendations_pkey" PRIMARY KEY using index "user_recommendations_pkey";
+
+alter table "public"."recommendation_watermarks" add constraint "recommendation_watermarks_pkey" PRIMARY KEY using index "recommendation_watermarks_pkey";
+
+alter table "public"."user_recommendations" add constraint "user_recommendations_profile_id_fkey" FOREIGN KEY (profile_id) REFERENCES profiles(id) ON DELETE CASCADE not valid;
+
+alter table "public"."user_recommendations" validate constraint "user_recommendations_profile_id_fkey";
+
+grant delete on table "public"."recommendation_watermarks" to "anon";
+
+grant insert on table "public"."recommendation_watermarks" to "anon";
+
+grant references on table "public"."recommendation_watermarks" to "anon";
+
+grant select on table "public"."recommendation_watermarks" to "anon";
+
+grant trigger on table "public"."recommendation_watermarks" to "anon";
+
+grant truncate on table "public"."recommendation_watermarks" to "anon";
+
+grant update on table "public"."recommendation_watermarks" to "anon";
+
+grant delete on table "public"."recommendation_watermarks" to "authenticated";
+
+grant insert on table "public"."recommendation_watermarks" to "authenticated";
+
+grant references on table "public"."recommendation_watermarks" to "authenticated";
+
+grant select on table "public"."recommendation_watermarks" to "authenticated";
+
+grant trigger on table "public"."recommendation_watermarks" to "authenticated";
+
+grant truncate on table "public"."recommendation_watermarks" to "authenticated";
+
+grant update on table "public"."recommendation_watermarks" to "authenticated";
+
+grant delete on table "public"."recommendation_watermarks" to "service_role";
+
+grant insert on table "public"."recommendation_watermarks" to "service_role";
+
+grant references on table "public"."recommendation_watermarks" to "service_role";
+
+grant select on table "public"."recommendation_watermarks" to "service_role";
+
+grant trigger on table "public"."recommendation_watermarks" to "service_role";
+
+grant truncate on table "public"."recommendation_watermarks" to "service_role";
+
+grant update on table "public"."recommendation_watermarks" to "service_role";
+
+grant delete on table "public"."user_recommendations" to "anon";
+
+grant insert on table "public"."user_recommendations" to "anon";
+
+grant references on table "public"."user_recommendations" to "anon";
+
+grant select on table "public"."user_recommendations" to "anon";
+
+grant trigger on table "public"."user_recommendations" to "anon";
+
+grant truncate on table "public"."user_recommendations" to "anon";
+
+grant update on table "public"."user_recommendations" to "anon";
+
+grant delete on table "public"."user_recommendations" to "authenticated";
+
+grant insert on table "public"."user_recommendations" to "authenticated";
+
+grant references on table "public"."user_recommendations" to "authenticated";
+
+grant select on table "public"."user_recommendations" to "authenticated";
+
+grant trigger on table "public"."user_recommendations" to "authenticated";
+
+grant truncate on table "public"."user_recommendations" to "authenticated";
+
+grant update on table "public"."user_recommendations" to "authenticated";
+
+grant delete on table "public"."user_recommendations" to "service_role";
+
+grant insert on table "public"."user_recommendations" to "service_role";
+
+grant references on table "public"."user_recommendations" to "service_role";
+
+grant select on table "public"."user_recommendations" to "service_role";
+
+grant trigger on table "public"."user_recommendations" to "service_role";
+
+grant truncate on table "public"."user_recommendations" to "service_role";
+
+grant update on table "public"."user_recommendations" to "service_role";
+
+set check_function_bodies = off;
+
+CREATE OR REPLACE FUNCTION public.prune_user_recommendations(per_day integer, per_profile integer, keep_after date)
+RETURNS integer
+LANGUAGE sql
+AS $function$
+    WITH ranked AS (
+        SELECT
+            profile_id,
+            source_table,
+            source_id,
+            bucket,
+            row_number() OVER (PARTITION BY profile_id, bucket ORDER BY score DESC) AS rank
+        FROM user_recommendations
+    ),
+    pruned AS (
+        DELETE FROM user_recommendations ur
+        USING ranked r
+        WHERE ur.profile_id = r.profile_id
+          AND ur.source_table = r.source_table
+          AND ur.source_id = r.source_id
+          AND (
+            r.rank > CASE WHEN r.bucket IS NULL THEN per_profile ELSE per_day END
+            OR r.bucket < keep_after
+          )
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM pruned;
+$function$
+;
+
+CREATE OR REPLACE FUNCTION public.get_recommended_meetings(
+    profile_id uuid,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL,
+    countries text[] DEFAULT NULL,
+    topics text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $function$
+SELECT
+    vm.meeting_id::text,
+    ur.source_table,
+    ur.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    ur.score
+FROM public.user_recommendations ur
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = ur.source_table
+      AND v.source_id = ur.source_id
+      AND (topics IS NULL OR v.topic = ANY (topics))
+    LIMIT 1
+    ) AS vm
+WHERE ur.profile_id = get_recommended_meetings.profile_id
+  AND ur.bucket IS NOT NULL
+  AND (src_tables IS NULL OR ur.source_table = ANY (src_tables))
+  AND (countries IS NULL OR EXISTS (
+    SELECT 1 FROM unnest(countries) AS c WHERE vm.location ILIKE '%' || c || '%'
+    ))
+  AND (end_date IS NULL OR vm.meeting_start_datetime <= end_date)
+  AND (start_date IS NULL OR COALESCE(vm.meeting_end_datetime, vm.meeting_start_datetime) >= start_date)
+ORDER BY ur.score DESC
+LIMIT match_count;
+$function$
+;
+
+drop view if exists "public"."v_profiles";
+
+create or replace view "public"."v_profiles" as  SELECT p.id,
+    p.name,
+    p.surname,
+    p.user_type,
+    p.countries,
+    p.newsletter_frequency,
+    p.embedding_input,
+    p.embedding,
+    p.query_reformulations,
+    p.recommendations_hash,
+    row_to_json(c.*) AS company,
+    row_to_json(pol.*) AS politician,
+    array_remove(array_agg(DISTINCT top.topic_id), NULL::text) AS topic_ids
+   FROM (((profiles p
+     LEFT JOIN companies c ON ((p.company_id = c.id)))
+     LEFT JOIN politicians pol ON ((p.politician_id = pol.id)))
+     LEFT JOIN profiles_to_topics top ON ((p.id = top.profile_id)))
+  GROUP BY p.id, p.name, p.surname, p.user_type, p.countries, p.newsletter_frequency, p.embedding_input, p.embedding, p.query_reformulations, p.recommendations_hash, c.id, pol.id;
@@ -31,7 +31,11 @@ CREATE TABLE IF NOT EXISTS profiles (
     countries  TEXT[] NOT NULL DEFAULT '{}'::text[],
     newsletter_frequency TEXT NOT NULL DEFAULT 'none',
     embedding_input TEXT NOT NULL DEFAULT '',
-    embedding VECTOR(1536) NOT NULL
+    embedding VECTOR(1536) NOT NULL,
+    -- LLM reformulations of embedding_input per prompt: {"<prompt>": {"version", "input_hash", "output"}}
+    query_reformulations JSONB NOT NULL DEFAULT '{}'::jsonb,
+    -- hash of the inputs user_recommendations were built from, see app/core/recommendations.py
+    recommendations_hash TEXT
 );
 
 CREATE TABLE IF NOT EXISTS profiles_to_topics (
@@ -4,5 +4,28 @@ CREATE TABLE "scheduled_job_runs" (
   "last_run_at" TIMESTAMP,
   "success" BOOLEAN,
   "inserted_rows" BIGINT,
-  "error_msg" TEXT
+  "error_msg" TEXT,
+  "started_at" TIMESTAMP,
+  "finished_at" TIMESTAMP,
+  "duration_seconds" DOUBLE PRECISION,
+  "rows_scraped" BIGINT,
+  "rows_written" BIGINT,
+  "rows_skipped" BIGINT,
+  "external_calls" BIGINT,
+  "peak_rss_mb" DOUBLE PRECISION,
+  "exit_reason" TEXT
 );
+
+CREATE INDEX "scheduled_job_runs_started_at_idx" ON "scheduled_job_runs" ("started_at");
+
+CREATE INDEX "scheduled_job_runs_name_last_run_at_idx" ON "scheduled_job_runs" ("name", "last_run_at" DESC);
+
+-- latest run per job, loaded by the scheduler for all jobs at once on start
+CREATE OR REPLACE VIEW public.v_latest_job_runs AS
+SELECT DISTINCT ON (name)
+    name,
+    last_run_at,
+    success,
+    exit_reason
+FROM scheduled_job_runs
+ORDER BY name, last_run_at DESC NULLS LAST;
@@ -379,6 +379,175 @@ WHERE (start_date IS NULL OR vm.meeting_start_datetime::date <= end_date::date)
 $$;
 
 
+-- ------------------------------------------------------------
+-- Function: public.search_meetings_semantic(...)
+-- Description: the nearest meetings of match_filtered_meetings, with the same filters, joined with their v_meetings
+--              rows in one round trip. Returns only the columns the API serialises, plus the embedded content_text
+--              for the reranker, best first.
+-- Usage (RPC): SELECT * FROM search_meetings_semantic(query_embedding, 1000, allowed_countries => ARRAY['Germany']);
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.search_meetings_semantic(
+    query_embedding vector,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    content_columns text[] DEFAULT NULL,
+    allowed_topics text[] DEFAULT NULL,
+    allowed_topic_ids text[] DEFAULT NULL,
+    allowed_countries text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    content_text text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+SELECT
+    vm.meeting_id::text,
+    m.source_table,
+    m.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    m.content_text,
+    m.similarity
+FROM public.match_filtered_meetings(
+         query_embedding, match_count, src_tables, content_columns, allowed_topics, allowed_topic_ids,
+         allowed_countries, start_date, end_date
+     ) AS m
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = m.source_table
+      AND v.source_id = m.source_id
+    LIMIT 1
+    ) AS vm
+ORDER BY m.similarity DESC;
+$$;
+
+
+-- ------------------------------------------------------------
+-- Function: public.search_meetings_for_profile(...)
+-- Description: the meetings nearest to a profile's stored embedding, restricted to its topics and countries (if
+--              any) and to the request filters: source tables, a date window the meeting overlaps, country
+--              substrings and topic names. Returns the columns of search_meetings_semantic, best first.
+-- Usage (RPC): SELECT * FROM search_meetings_for_profile('<profile uuid>', 300, start_date => now());
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.search_meetings_for_profile(
+    profile_id uuid,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL,
+    countries text[] DEFAULT NULL,
+    topics text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    content_text text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+WITH profile AS (
+    SELECT
+        p.embedding,
+        (SELECT array_agg(lower(c)) FROM unnest(p.countries) AS c) AS profile_countries,
+        (SELECT array_agg(pt.topic_id) FROM public.profiles_to_topics pt WHERE pt.profile_id = p.id) AS profile_topic_ids
+    FROM public.profiles p
+    WHERE p.id = search_meetings_for_profile.profile_id
+)
+SELECT
+    vm.meeting_id::text,
+    e.source_table,
+    e.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    e.content_text,
+    ((1 - (e.embedding <#> profile.embedding)) / 2) AS similarity
+FROM profile
+         CROSS JOIN public.meeting_embeddings e
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = e.source_table
+      AND v.source_id = e.source_id
+      AND (topics IS NULL OR v.topic = ANY (topics))
+    LIMIT 1
+    ) AS vm
+WHERE (src_tables IS NULL OR e.source_table = ANY (src_tables))
+  -- profiles without topics or countries are not restricted by them
+  AND (profile.profile_topic_ids IS NULL OR EXISTS (
+    SELECT 1
+    FROM public.meeting_topic_assignments mta
+    WHERE mta.source_table = e.source_table
+      AND mta.source_id = e.source_id
+      AND mta.topic_id = ANY (profile.profile_topic_ids)
+    ))
+  AND (profile.profile_countries IS NULL OR lower(vm.location) = ANY (profile.profile_countries))
+  AND (countries IS NULL OR EXISTS (
+    SELECT 1 FROM unnest(countries) AS c WHERE vm.location ILIKE '%' || c || '%'
+    ))
+  AND (end_date IS NULL OR vm.meeting_start_datetime <= end_date)
+  AND (start_date IS NULL OR COALESCE(vm.meeting_end_datetime, vm.meeting_start_datetime) >= start_date)
+ORDER BY e.embedding <#> profile.embedding
+LIMIT match_count;
+$$;
+
+
 -- ------------------------------------------------------------
 -- Function: public.get_meeting_tables()
 -- Description: returns all distinct source_table names in v_meetings
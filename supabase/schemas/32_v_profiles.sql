@@ -8,6 +8,8 @@ SELECT
     p.newsletter_frequency,
     p.embedding_input,
     p.embedding,
+    p.query_reformulations,
+    p.recommendations_hash,
 
     -- Company-related fields (for entrepreneurs)
     row_to_json(c) AS company,
@@ -30,5 +32,7 @@ GROUP BY
     p.newsletter_frequency,
     p.embedding_input,
     p.embedding,
+    p.query_reformulations,
+    p.recommendations_hash,
     c.id,
     pol.id;
@@ -0,0 +1,48 @@
+-- Lease of the job scheduler: only the replica holding the lease runs scheduled jobs.
+CREATE TABLE IF NOT EXISTS "scheduler_leases" (
+  "name" TEXT PRIMARY KEY,
+  "holder" TEXT NOT NULL,
+  "address" TEXT,
+  "acquired_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+  "expires_at" TIMESTAMPTZ NOT NULL
+);
+
+
+-- ------------------------------------------------------------
+-- Function: public.acquire_scheduler_lease(lease_name, lease_holder, lease_address, ttl_seconds)
+-- Description: takes over or renews the lease if it is free, expired, or already held by lease_holder,
+--              and returns the current lease row either way
+-- Usage (RPC): SELECT * FROM acquire_scheduler_lease('job_scheduler', 'host-123', 'http://10.0.0.5:8000', 60);
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.acquire_scheduler_lease(
+    lease_name text,
+    lease_holder text,
+    lease_address text,
+    ttl_seconds integer
+)
+RETURNS SETOF scheduler_leases
+LANGUAGE sql
+AS $$
+    INSERT INTO scheduler_leases AS l (name, holder, address, acquired_at, expires_at)
+    VALUES (lease_name, lease_holder, lease_address, now(), now() + make_interval(secs => ttl_seconds))
+    ON CONFLICT (name) DO UPDATE
+        SET holder = excluded.holder,
+            address = excluded.address,
+            acquired_at = CASE WHEN l.holder = excluded.holder THEN l.acquired_at ELSE now() END,
+            expires_at = excluded.expires_at
+        WHERE l.holder = excluded.holder OR l.expires_at < now();
+
+    SELECT * FROM scheduler_leases WHERE name = lease_name;
+$$;
+
+
+-- ------------------------------------------------------------
+-- Function: public.release_scheduler_lease(lease_name, lease_holder)
+-- Description: gives up the lease on shutdown so another replica can take over without waiting for the TTL
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.release_scheduler_lease(lease_name text, lease_holder text)
+RETURNS void
+LANGUAGE sql
+AS $$
+    DELETE FROM scheduler_leases WHERE name = lease_name AND holder = lease_holder;
+$$;
@@ -0,0 +1,35 @@
+-- LLM reformulations of search queries, keyed by prompt version and a hash of the input text.
+CREATE TABLE IF NOT EXISTS "query_reformulations" (
+  "prompt" TEXT NOT NULL,
+  "prompt_version" INTEGER NOT NULL,
+  "input_hash" TEXT NOT NULL,
+  "output" TEXT NOT NULL,
+  "created_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+  "last_used_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY ("prompt", "prompt_version", "input_hash")
+);
+
+CREATE INDEX IF NOT EXISTS "query_reformulations_last_used_at_idx" ON "query_reformulations" ("last_used_at");
+
+
+-- ------------------------------------------------------------
+-- Function: public.prune_query_reformulations(max_rows)
+-- Description: evicts the least recently used reformulations beyond max_rows, returns the number of deleted rows
+-- Usage (RPC): SELECT prune_query_reformulations(50000);
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.prune_query_reformulations(max_rows integer)
+RETURNS integer
+LANGUAGE sql
+AS $$
+    WITH evicted AS (
+        DELETE FROM query_reformulations
+        WHERE (prompt, prompt_version, input_hash) IN (
+            SELECT prompt, prompt_version, input_hash
+            FROM query_reformulations
+            ORDER BY last_used_at DESC
+            OFFSET max_rows
+        )
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM evicted;
+$$;
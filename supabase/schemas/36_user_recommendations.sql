@@ -0,0 +1,131 @@
+-- Precomputed recommendations per profile, written by the update_recommendations job.
+-- Meetings are kept per meeting day (bucket), legislative files per profile (bucket NULL).
+CREATE TABLE IF NOT EXISTS "user_recommendations" (
+  "profile_id" UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+  "source_table" TEXT NOT NULL,
+  "source_id" TEXT NOT NULL,
+  "bucket" DATE,
+  "score" DOUBLE PRECISION NOT NULL,
+  "computed_at" TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY ("profile_id", "source_table", "source_id")
+);
+
+CREATE INDEX IF NOT EXISTS "user_recommendations_profile_score_idx" ON "user_recommendations" ("profile_id", "score" DESC);
+
+-- Embeddings created up to embedded_until are scored against all profiles, per corpus.
+CREATE TABLE IF NOT EXISTS "recommendation_watermarks" (
+  "corpus" TEXT PRIMARY KEY,
+  "embedded_until" TIMESTAMPTZ NOT NULL
+);
+
+
+-- ------------------------------------------------------------
+-- Function: public.prune_user_recommendations(per_day, per_profile, keep_after)
+-- Description: keeps the per_day best meetings per profile and day, the per_profile best legislative files per
+--              profile and no meetings of days before keep_after; returns the number of deleted rows
+-- Usage (RPC): SELECT prune_user_recommendations(20, 200, current_date - 30);
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.prune_user_recommendations(per_day integer, per_profile integer, keep_after date)
+RETURNS integer
+LANGUAGE sql
+AS $$
+    WITH ranked AS (
+        SELECT
+            profile_id,
+            source_table,
+            source_id,
+            bucket,
+            row_number() OVER (PARTITION BY profile_id, bucket ORDER BY score DESC) AS rank
+        FROM user_recommendations
+    ),
+    pruned AS (
+        DELETE FROM user_recommendations ur
+        USING ranked r
+        WHERE ur.profile_id = r.profile_id
+          AND ur.source_table = r.source_table
+          AND ur.source_id = r.source_id
+          AND (
+            r.rank > CASE WHEN r.bucket IS NULL THEN per_profile ELSE per_day END
+            OR r.bucket < keep_after
+          )
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM pruned;
+$$;
+
+
+-- ------------------------------------------------------------
+-- Function: public.get_recommended_meetings(...)
+-- Description: the stored meeting recommendations of a profile that pass the request filters (those of
+--              search_meetings_for_profile), best first, with their v_meetings columns. A key lookup on
+--              user_recommendations instead of a vector search.
+-- Usage (RPC): SELECT * FROM get_recommended_meetings('<profile uuid>', 10, start_date => now());
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.get_recommended_meetings(
+    profile_id uuid,
+    match_count integer,
+    src_tables text[] DEFAULT NULL,
+    start_date timestamp with time zone DEFAULT NULL,
+    end_date timestamp with time zone DEFAULT NULL,
+    countries text[] DEFAULT NULL,
+    topics text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    meeting_id text,
+    source_table text,
+    source_id text,
+    title text,
+    topic text,
+    status text,
+    meeting_url text,
+    meeting_start_datetime timestamp with time zone,
+    meeting_end_datetime timestamp with time zone,
+    location text,
+    exact_location text,
+    description text,
+    tags text[],
+    member json,
+    attendees text,
+    similarity double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+SELECT
+    vm.meeting_id::text,
+    ur.source_table,
+    ur.source_id,
+    vm.title::text,
+    vm.topic::text,
+    vm.status::text,
+    vm.meeting_url::text,
+    vm.meeting_start_datetime,
+    vm.meeting_end_datetime,
+    vm.location::text,
+    vm.exact_location::text,
+    vm.description::text,
+    vm.tags,
+    vm.member,
+    vm.attendees::text,
+    ur.score
+FROM public.user_recommendations ur
+         -- v_meetings has a row per assigned topic, one is enough
+         CROSS JOIN LATERAL (
+    SELECT v.*
+    FROM v_meetings v
+    WHERE v.source_table = ur.source_table
+      AND v.source_id = ur.source_id
+      AND (topics IS NULL OR v.topic = ANY (topics))
+    LIMIT 1
+    ) AS vm
+WHERE ur.profile_id = get_recommended_meetings.profile_id
+  AND ur.bucket IS NOT NULL
+  AND (src_tables IS NULL OR ur.source_table = ANY (src_tables))
+  AND (countries IS NULL OR EXISTS (
+    SELECT 1 FROM unnest(countries) AS c WHERE vm.location ILIKE '%' || c || '%'
+    ))
+  AND (end_date IS NULL OR vm.meeting_start_datetime <= end_date)
+  AND (start_date IS NULL OR COALESCE(vm.meeting_end_datetime, vm.meeting_start_datetime) >= start_date)
+ORDER BY ur.score DESC
+LIMIT match_count;
+$$;
@@ -0,0 +1,156 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import fakeredis
+
+from app.core import cache
+from app.core.cache import InMemoryCacheBackend, RedisCacheBackend, ResponseCache, skip_caching
+from app.core.change_events import ChangeEvent, invalidate_cached_responses
+
+
+def noop():
+    pass
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(InMemoryCacheBackend())
+        self.cache._ttls["test"] = 60
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"data": [1, 2]}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_compute("test", "k", compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"data": [1, 2]}] * 5)
+
+    def test_stale_entry_is_served_while_refreshing(self):
+        self.cache.get_or_compute("test", "k", lambda: "old")
+        with mock.patch.object(cache.time, "time", return_value=time.time() + 61):
+            self.assertEqual(self.cache.get_or_compute("test", "k", lambda: "new"), "old")
+        self.cache._refresher.shutdown(wait=True)
+        self.assertEqual(self.cache.get_or_compute("test", "k", lambda: "unused"), "new")
+        stats = self.cache.metrics()["namespaces"]["test"]
+        self.assertEqual((stats["misses"], stats["stale_hits"], stats["refreshes"]), (1, 1, 1))
+
+    def test_miss_after_invalidation_does_not_wait_for_a_refresh(self):
+        key = ResponseCache.key("test", noop, {})
+        self.cache.get_or_compute("test", key, lambda: "old")
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(5)
+            return "refreshed"
+
+        with mock.patch.object(cache.time, "time", return_value=time.time() + 61):
+            self.assertEqual(self.cache.get_or_compute("test", key, slow_refresh), "old")
+        self.cache.clear("test")
+        try:
+            self.assertEqual(self.cache.get_or_compute("test", key, lambda: "new"), "new")
+        finally:
+            release.set()
+            self.cache._refresher.shutdown(wait=True)
+
+    def test_skipped_responses_are_not_stored(self):
+        def degraded():
+            skip_caching()
+            return "raw"
+
+        self.assertEqual(self.cache.get_or_compute("test", "k", degraded), "raw")
+        self.assertEqual(self.cache.get_or_compute("test", "k", lambda: "reformulated"), "reformulated")
+        self.assertEqual(self.cache.get_or_compute("test", "k", lambda: "unused"), "reformulated")
+
+    def test_key_ignores_argument_order(self):
+        self.assertEqual(
+            ResponseCache.key("test", noop, {"a": 1, "b": [2]}),
+            ResponseCache.key("test", noop, {"b": [2], "a": 1}),
+        )
+        self.assertNotEqual(ResponseCache.key("test", noop, {"a": 1}), ResponseCache.key("test", noop, {"a": 2}))
+
+    def test_change_event_drops_namespaces_of_the_table(self):
+        self.cache.get_or_compute("meetings", ResponseCache.key("meetings", noop, {}), lambda: 1)
+        self.cache.get_or_compute("topics", ResponseCache.key("topics", noop, {}), lambda: 1)
+        with mock.patch.object(cache, "response_cache", self.cache):
+            invalidate_cached_responses(ChangeEvent(table="mep_meetings", ids=["1"]))
+
+        remaining = list(self.cache.backend._entries)
+        self.assertEqual([key.split(":")[1] for key in remaining], ["topics"])
+
+    def test_new_meeting_embeddings_drop_the_meeting_lists(self):
+        key = ResponseCache.key("meetings_list", noop, {"user_id": "u1"}, partition="u1")
+        self.cache.get_or_compute("meetings_list", key, lambda: 1)
+        with mock.patch.object(cache, "response_cache", self.cache):
+            invalidate_cached_responses(ChangeEvent(table="meeting_embeddings", ids=["1"]))
+
+        self.assertEqual(list(self.cache.backend._entries), [])
+
+    def test_profile_change_drops_only_that_users_responses(self):
+        for user_id in ("u1", "u2"):
+            key = ResponseCache.key("meetings_list", noop, {"user_id": user_id}, partition=user_id)
+            self.cache.get_or_compute("meetings_list", key, lambda: 1)
+        with mock.patch.object(cache, "response_cache", self.cache):
+            invalidate_cached_responses(ChangeEvent(table="profiles", ids=["u1"]))
+
+        remaining = list(self.cache.backend._entries)
+        self.assertEqual([key.split(":")[2] for key in remaining], ["@u2"])
+
+
+class TestRedisCacheBackend(unittest.TestCase):
+    """Two ResponseCache instances on one fake Redis server stand for two processes."""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.caches = [ResponseCache(RedisCacheBackend(client=fakeredis.FakeRedis(server=server))) for _ in range(2)]
+        for response_cache in self.caches:
+            response_cache._ttls["test"] = 60
+        self.key = ResponseCache.key("test", noop, {})
+
+    def test_entries_are_shared_between_processes(self):
+        first, second = self.caches
+        self.assertEqual(first.get_or_compute("test", self.key, lambda: {"data": [1]}), {"data": [1]})
+        self.assertEqual(second.get_or_compute("test", self.key, lambda: "unused"), {"data": [1]})
+
+        second.clear("test")
+        self.assertEqual(first.get_or_compute("test", self.key, lambda: "new"), "new")
+
+    def test_waits_for_the_process_computing_the_entry(self):
+        first, second = self.caches
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return "computed once"
+
+        thread = threading.Thread(target=lambda: first.get_or_compute("test", self.key, slow))
+        thread.start()
+        while not second.backend.get(f"{self.key}:lock"):
+            time.sleep(0.01)
+        threading.Timer(0.2, release.set).start()
+        calls = []
+        result = second.get_or_compute("test", self.key, lambda: calls.append(1) or "computed twice")
+        thread.join()
+
+        self.assertEqual(result, "computed once")
+        self.assertEqual(calls, [])
+
+    def test_invalidation_is_claimed_by_one_process(self):
+        first, second = self.caches
+        self.assertTrue(first.claim_invalidation("event-1"))
+        self.assertFalse(second.claim_invalidation("event-1"))
+        self.assertTrue(second.claim_invalidation("event-2"))
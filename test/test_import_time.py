@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# cumulative import time of `main`, raise it deliberately if the API really needs a heavier import
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "4.0"))
+
+# only needed by the scheduled jobs (worker.py) or imported lazily on first use
+HEAVY_MODULES = {
+    "app.core.jobs",
+    "app.core.scheduling",
+    "crawl4ai",
+    "keybert",
+    "langchain",
+    "langchain_community",
+    "litellm",
+    "playwright",
+    "scrapy",
+    "sentence_transformers",
+    "sklearn",
+    "torch",
+}
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from `python -X importtime`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env={**os.environ, "RUN_SCHEDULER": "false"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+    def test_api_does_not_import_the_job_stack(self):
+        imported = import_times("main")
+        self.assertEqual(sorted(HEAVY_MODULES & imported.keys()), [])
+
+    def test_api_import_time_within_budget(self):
+        seconds = import_times("main")["main"] / 1_000_000
+        self.assertLess(seconds, IMPORT_BUDGET_SECONDS, f"importing main took {seconds:.2f}s")
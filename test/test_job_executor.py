@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+from app.core.job_executor import JobExecutor, JobPriority, ResourceClass
+
+
+class FakeJob:
+    def __init__(self, name, resource_class=ResourceClass.API, priority=JobPriority.NORMAL, run_in_process=False):
+        self.name = name
+        self.resource_class = resource_class
+        self.priority = priority
+        self.run_in_process = run_in_process
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.done = threading.Event()
+
+    def execute(self):
+        self.started.set()
+        self.release.wait(5)
+        self.done.set()
+
+
+class TestJobExecutor(unittest.TestCase):
+    def test_class_limit_and_no_overlap(self):
+        executor = JobExecutor(max_threads=4, class_limits={ResourceClass.BROWSER: 1})
+        first, second = FakeJob("a", ResourceClass.BROWSER), FakeJob("b", ResourceClass.BROWSER)
+
+        self.assertTrue(executor.submit(first))
+        self.assertTrue(executor.submit(second))
+        self.assertFalse(executor.submit(first))  # already running
+        self.assertTrue(first.started.wait(1))
+        time.sleep(0.05)
+        self.assertFalse(second.started.is_set())
+
+        first.release.set()
+        self.assertTrue(second.started.wait(1))
+        second.release.set()
+        self.assertTrue(second.done.wait(1))
+
+    def test_saturated_class_does_not_block_other_classes(self):
+        executor = JobExecutor(max_threads=4, class_limits={ResourceClass.BROWSER: 1})
+        browser_jobs = [FakeJob(f"browser_{i}", ResourceClass.BROWSER) for i in range(2)]
+        mail_job = FakeJob("mail", ResourceClass.MAIL)
+        for job in [*browser_jobs, mail_job]:
+            executor.submit(job)
+
+        self.assertTrue(mail_job.started.wait(1))
+        for job in [*browser_jobs, mail_job]:
+            job.release.set()
+
+    def test_higher_priority_starts_first(self):
+        executor = JobExecutor(max_threads=1)
+        blocker = FakeJob("blocker")
+        executor.submit(blocker)
+        self.assertTrue(blocker.started.wait(1))
+
+        order = []
+        low, high = FakeJob("low", priority=JobPriority.LOW), FakeJob("high", priority=JobPriority.HIGH)
+        for job in (low, high):
+            job.execute = lambda job=job: order.append(job.name)
+            executor.submit(job)
+        blocker.release.set()
+
+        deadline = time.time() + 1
+        while len(order) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(order, ["high", "low"])
@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+
+from app.core import lexical_index
+from app.core.change_events import ChangeEvent, meeting_id
+from app.core.lexical_index import BM25Index, fuse, refresh_documents, tokenize
+
+
+class TestLexicalIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.upsert(("ep_meetings", "1"), "Meeting of the AGRI committee on farm subsidies")
+        self.index.upsert(("ep_meetings", "2"), "Exchange of views on 2023/0001(COD) with the rapporteur")
+        self.index.upsert(("mep_meetings", "3"), "Committee meeting on the energy market")
+
+    def test_procedure_references_are_kept_whole(self):
+        self.assertIn("2023/0001(cod)", tokenize("Vote on 2023/0001(COD)"))
+
+    def test_exact_terms_rank_first(self):
+        self.assertEqual(self.index.search("AGRI committee", k=3)[0][0], ("ep_meetings", "1"))
+        self.assertEqual(self.index.search("2023/0001(COD)", k=1)[0][0], ("ep_meetings", "2"))
+        only_mep = self.index.search("committee", k=3, allowed=lambda key: key[0] == "mep_meetings")
+        self.assertEqual([key for key, _ in only_mep], [("mep_meetings", "3")])
+
+    def test_upsert_replaces_the_document(self):
+        self.index.upsert(("ep_meetings", "1"), "Plenary session")
+        self.assertEqual([key for key, _ in self.index.search("AGRI", k=3)], [])
+
+    def test_backfilled_embeddings_become_searchable(self):
+        documents = mock.Mock(return_value=[(("mep_meetings", "4"), "Hearing on fisheries quotas")])
+        with (
+            mock.patch.object(lexical_index, "_indexes", {"meetings": self.index}),
+            mock.patch.object(lexical_index, "_meeting_documents", documents),
+        ):
+            refresh_documents(ChangeEvent(table="meeting_embeddings", ids=[meeting_id("mep_meetings", "4")]))
+        documents.assert_called_once_with("mep_meetings", ["4"])
+        self.assertEqual(self.index.search("fisheries", k=1)[0][0], ("mep_meetings", "4"))
+
+    def test_fusion_adds_lexical_matches_to_the_vector_results(self):
+        vector = [
+            {"source_table": "mep_meetings", "source_id": "3", "content_text": "...", "similarity": 0.8},
+            {"source_table": "ep_meetings", "source_id": "1", "content_text": "...", "similarity": 0.7},
+        ]
+        lexical = self.index.search("AGRI 2023/0001(COD)", k=3)
+        fused = fuse(vector, lexical, self.index.texts, k=10)
+        self.assertEqual(fused[0]["source_id"], "1")  # found by both
+        self.assertIn("2", [n["source_id"] for n in fused])
+        self.assertTrue(all("fusion_score" in n for n in fused))
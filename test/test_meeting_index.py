@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime
+
+from app.core.change_events import ChangeEvent, changed_meetings, meeting_id
+from app.core.meeting_index import MeetingIndex
+
+
+def embedding_row(source_id: str, vector: list[float], source_table: str = "ep_meetings") -> dict:
+    return {
+        "source_table": source_table,
+        "source_id": source_id,
+        "content_column": "embedding_input",
+        "content_text": f"meeting {source_id}",
+        "embedding": str(vector),
+    }
+
+
+class TestMeetingIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = MeetingIndex(dim=2, capacity=2)
+        self.index.set_topics([{"id": "t1", "topic": "Energy"}])
+        self.index.upsert(
+            embedding_row("a", [1.0, 0.0]),
+            {"location": "Austria", "meeting_start_datetime": "2025-06-01T10:00:00"},
+            ["t1"],
+        )
+        self.index.upsert(
+            embedding_row("b", [0.6, 0.8], "mep_meetings"),
+            {"location": "Belgium", "meeting_start_datetime": "2025-07-01T10:00:00"},
+            [],
+        )
+        self.index.upsert(embedding_row("c", [0.0, 1.0]), None, [])
+
+    def test_results_are_ordered_like_the_rpc(self):
+        results = self.index.search([1.0, 0.0], k=2)
+        self.assertEqual([r["source_id"] for r in results], ["a", "b"])
+        self.assertAlmostEqual(results[1]["similarity"], 0.8)
+
+    def test_filters(self):
+        def ids(**filters):
+            return [r["source_id"] for r in self.index.search([1.0, 0.0], k=10, **filters)]
+
+        self.assertEqual(ids(src_tables=["mep_meetings"]), ["b"])
+        self.assertEqual(ids(allowed_topics=["Energy"]), ["a"])
+        self.assertEqual(ids(allowed_countries=["belgium"]), ["b"])
+        # meetings without a v_meetings row never pass a date filter
+        self.assertEqual(ids(start_date=datetime(2025, 6, 15)), ["b"])
+        self.assertEqual(ids(end_date=datetime(2025, 6, 1, 23)), ["a"])
+
+    def test_upsert_replaces_and_remove_hides(self):
+        self.index.upsert(embedding_row("a", [0.0, 1.0]), None, [])
+        self.assertEqual(self.index.search([1.0, 0.0], k=10, allowed_topics=["Energy"]), [])
+        self.index.remove("mep_meetings", "b")
+        self.assertEqual(len(self.index), 2)
+
+    def test_enrichment_events_name_the_meetings_by_source_table(self):
+        event = ChangeEvent(
+            table="meeting_embeddings",
+            ids=[meeting_id("ep_meetings", "1"), meeting_id("mep_meetings", "x:2"), "unknown_table:3"],
+        )
+        self.assertEqual(changed_meetings(event), {"ep_meetings": ["1"], "mep_meetings": ["x:2"]})
+        self.assertEqual(changed_meetings(ChangeEvent(table="ep_meetings", ids=["1"])), {"ep_meetings": ["1"]})
+        self.assertEqual(changed_meetings(ChangeEvent(table="profiles", ids=["u1"])), {})
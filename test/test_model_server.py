@@ -0,0 +1,43 @@
+import threading
+import unittest
+
+import numpy as np
+
+from app.core.model_server import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_concurrent_requests_are_coalesced(self):
+        batch_sizes = []
+
+        def handler(key, texts):
+            batch_sizes.append(len(texts))
+            return np.array([[float(text[1:])] for text in texts], dtype=np.float32)
+
+        batcher = MicroBatcher(handler, max_wait_ms=200)
+        results = {}
+
+        def submit(i):
+            results[i] = batcher.submit(("model",), [f"t{i}"])
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLess(len(batch_sizes), 8)
+        for i, vectors in results.items():
+            self.assertEqual(vectors.tolist(), [[float(i)]])
+
+    def test_handler_error_is_raised_for_every_request(self):
+        def handler(key, texts):
+            raise RuntimeError("model failed")
+
+        batcher = MicroBatcher(handler, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            batcher.submit(("model",), ["text"])
+
+
+if __name__ == "__main__":
+    unittest.main()
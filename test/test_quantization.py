@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from app.core.quantization import QUANTIZATION_MODES, make_vector_store, quantize_int8
+
+
+def unit_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestQuantization(unittest.TestCase):
+    def test_int8_codes_reconstruct_the_vector(self):
+        vector = unit_vectors(1, 64, seed=1)
+        codes, scales = quantize_int8(vector)
+        np.testing.assert_allclose(codes * scales[:, None], vector, atol=float(scales[0]))
+
+    def test_quantized_stores_find_the_exact_neighbors(self):
+        # clustered like text embeddings, queries close to known meetings
+        centers = unit_vectors(20, 128, seed=2)
+        corpus = centers[np.arange(2000) % 20] + 0.5 * unit_vectors(2000, 128, seed=3)
+        corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+        queries = corpus[:20] + 0.2 * unit_vectors(20, 128, seed=4)
+        rows = np.arange(len(corpus))
+        exact = make_vector_store("float32", 128, len(corpus))
+        for row, vector in enumerate(corpus):
+            exact.set(row, vector)
+
+        for mode in QUANTIZATION_MODES[1:]:
+            store = make_vector_store(mode, 128, len(corpus))
+            for row, vector in enumerate(corpus):
+                store.set(row, vector)
+            self.assertLess(store.nbytes, exact.nbytes)
+            recall = np.mean(
+                [
+                    len(set(store.search(q, rows, 10)[0]) & set(exact.search(q, rows, 10)[0])) / 10
+                    for q in queries
+                ]
+            )
+            self.assertGreater(recall, 0.8, mode)
@@ -0,0 +1,46 @@
+import unittest
+
+import fakeredis
+
+from app.core.rate_limits import BATCH_SHARE, ModelLimiter, ModelLimits, Priority, SharedLimits
+
+
+class TestSharedLimits(unittest.TestCase):
+    def setUp(self):
+        self.limits = ModelLimits(requests_per_minute=1000, tokens_per_minute=None, max_concurrency=4)
+        self.client = fakeredis.FakeRedis()
+
+    def limiter(self) -> ModelLimiter:
+        return ModelLimiter("test-model", self.limits, SharedLimits(self.client, "test-model", self.limits))
+
+    def test_processes_share_the_concurrency_limit(self):
+        first, second = self.limiter(), self.limiter()
+        leases = [first.acquire(Priority.INTERACTIVE, 1) for _ in range(2)]
+        leases += [second.acquire(Priority.INTERACTIVE, 1) for _ in range(2)]
+
+        shared = second.shared
+        assert shared is not None
+        self.assertIsNone(shared.try_acquire(Priority.INTERACTIVE, 1, "extra"))
+        first.release(False, None, leases[0])
+        self.assertEqual(shared.try_acquire(Priority.INTERACTIVE, 1, "extra"), 0)
+
+    def test_batch_callers_leave_a_reserve_for_interactive_ones(self):
+        shared = SharedLimits(self.client, "test-model", self.limits)
+        batch_slots = int(self.limits.max_concurrency * BATCH_SHARE)
+        for i in range(batch_slots):
+            self.assertEqual(shared.try_acquire(Priority.BATCH, 1, f"batch-{i}"), 0)
+
+        self.assertIsNone(shared.try_acquire(Priority.BATCH, 1, "batch"))
+        self.assertEqual(shared.try_acquire(Priority.INTERACTIVE, 1, "interactive"), 0)
+
+    def test_rate_limited_response_drains_the_shared_buckets(self):
+        first, second = self.limiter(), self.limiter()
+        first.release(True, None, first.acquire(Priority.INTERACTIVE, 1))
+
+        shared = second.shared
+        assert shared is not None
+        self.assertGreater(shared.try_acquire(Priority.INTERACTIVE, 1, "next") or 0, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
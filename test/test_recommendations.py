@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from app.core.recommendations import (
+    Items,
+    Profile,
+    eligibility,
+    profile_hash,
+    recommendations_current,
+    top_per_bucket,
+)
+
+
+def profile(topic_ids: list[str], countries: list[str]) -> Profile:
+    return Profile(
+        id="p", embedding=np.zeros(2), topic_ids=topic_ids, countries=countries, input_hash="", stored_hash=None
+    )
+
+
+def items(topic_ids: list[set[str]], locations: list[set[str]]) -> Items:
+    size = len(topic_ids)
+    return Items(
+        keys=[("ep_meetings", str(i)) for i in range(size)],
+        vectors=np.zeros((size, 2), dtype=np.float32),
+        buckets=np.zeros(size, dtype=np.int64),
+        topic_ids=topic_ids,
+        locations=locations,
+    )
+
+
+class TestRecommendations(unittest.TestCase):
+    def test_top_per_bucket_keeps_the_best_eligible_items_of_each_day(self):
+        scores = np.array([[0.9, 0.1, 0.8, 0.7, 0.2], [0.1, 0.9, 0.2, 0.3, 0.4]])
+        mask = np.array([[False, True, True, True, True], [True, True, True, True, True]])
+        buckets = np.array([1, 1, 1, 2, 2])
+
+        picks = top_per_bucket(scores, mask, buckets, limit=2)
+
+        by_profile = {row: sorted(column for r, column, _ in picks if r == row) for row in (0, 1)}
+        # profile 0 may not get item 0, its best score
+        self.assertEqual(by_profile[0], [1, 2, 3, 4])
+        self.assertEqual(by_profile[1], [1, 2, 3, 4])
+        self.assertIn((0, 2, 0.8), picks)
+
+    def test_ineligible_items_are_never_picked_to_fill_a_day(self):
+        scores = np.array([[0.5, 0.6]])
+        picks = top_per_bucket(scores, np.array([[True, False]]), np.array([1, 1]), limit=5)
+        self.assertEqual(picks, [(0, 0, 0.5)])
+
+    def test_eligibility_applies_topics_and_countries_unless_the_profile_has_none(self):
+        meetings = items([{"t1"}, {"t2"}, set()], [{"germany"}, {"france"}, {"germany"}])
+        profiles = [profile(["t1"], []), profile([], ["Germany"]), profile([], []), profile(["t2"], ["germany"])]
+
+        mask = eligibility(profiles, meetings)
+
+        np.testing.assert_array_equal(
+            mask,
+            [
+                [True, False, False],
+                [True, False, True],
+                [True, True, True],
+                [False, False, False],
+            ],
+        )
+
+    def test_recommendations_are_current_until_an_input_changes(self):
+        row = {"embedding_input": "farming", "topic_ids": ["b", "a"], "countries": ["Germany"]}
+        row["recommendations_hash"] = profile_hash("farming", ["a", "b"], ["germany"])
+        self.assertTrue(recommendations_current(row))
+        self.assertFalse(recommendations_current({**row, "topic_ids": ["a"]}))
+        self.assertFalse(recommendations_current({**row, "recommendations_hash": None}))
+
+
+if __name__ == "__main__":
+    unittest.main()
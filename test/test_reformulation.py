@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+from app.core import reformulation
+from app.core.reformulation import PROFILE_MEETINGS, input_hash, reformulate, reformulate_profile
+
+
+class TestReformulation(unittest.TestCase):
+    def setUp(self):
+        reformulation._lru.clear()
+        for name, value in [("_load", None), ("_store", None)]:
+            patcher = mock.patch.object(reformulation, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(reformulation, "supabase")
+        self.supabase = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @mock.patch.object(reformulation, "_complete", return_value="Meeting on Transport")
+    def test_same_text_is_reformulated_once(self, complete):
+        self.assertEqual(reformulate(PROFILE_MEETINGS, "CEO of a logistics company", "test"), "Meeting on Transport")
+        self.assertEqual(reformulate(PROFILE_MEETINGS, "CEO of a logistics company", "test"), "Meeting on Transport")
+        complete.assert_called_once()
+
+    @mock.patch.object(reformulation, "_complete", return_value="new")
+    def test_profile_reformulation_is_refreshed_only_when_its_input_changed(self, complete):
+        stored = {PROFILE_MEETINGS.name: {"version": 1, "input_hash": input_hash("text"), "output": "stored"}}
+        self.assertEqual(reformulate_profile("u1", "text", stored, PROFILE_MEETINGS, "test"), "stored")
+        complete.assert_not_called()
+
+        self.assertEqual(reformulate_profile("u1", "changed text", stored, PROFILE_MEETINGS, "test"), "new")
+        self.supabase.table.assert_any_call("profiles")
@@ -0,0 +1,73 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core import rerank
+from app.core.rerank import candidate_budget, prune_candidates, rerank_neighbors
+
+
+def neighbor(source_id: str, similarity: float) -> dict:
+    return {"source_table": "ep_meetings", "source_id": source_id, "content_text": source_id, "similarity": similarity}
+
+
+def fake_rerank(query, documents, top_n, caller, priority):
+    # relevance grows with the document's number, results ordered like Cohere's
+    results = [SimpleNamespace(index=i, relevance_score=int(doc) / 100) for i, doc in enumerate(documents)]
+    results.sort(key=lambda r: r.relevance_score, reverse=True)
+    return SimpleNamespace(results=results[:top_n], meta=None)
+
+
+class TestRerank(unittest.TestCase):
+    def setUp(self):
+        rerank._scores.clear()
+        rerank._stats.clear()
+
+    def test_budget_drops_candidates_far_below_the_distribution(self):
+        similarities = [0.9] * 150 + [0.1] * 850
+        self.assertEqual(candidate_budget(similarities), 150)
+        self.assertEqual(candidate_budget([0.9] * 20 + [0.1] * 980), rerank.MIN_CANDIDATES)
+        self.assertEqual(candidate_budget([0.5] * 50), 50)
+
+    def test_pruning_keeps_at_least_the_requested_results(self):
+        neighbors = [neighbor(str(i), 0.9 if i < 150 else 0.1) for i in range(1000)]
+        self.assertEqual(len(prune_candidates(neighbors)), 150)
+        kept = prune_candidates(neighbors, top_n=800)
+        self.assertEqual(len(kept), 800)
+        self.assertEqual(set(kept[:150]), set(range(150)))
+
+    @mock.patch.object(rerank, "rerank", side_effect=fake_rerank)
+    def test_only_unseen_documents_are_sent(self, cohere):
+        neighbors = [neighbor(str(i), 0.5) for i in range(10)]
+        first = rerank_neighbors("query", neighbors, top_n=3, caller="test")
+        self.assertEqual([hit.index for hit in first.results], [9, 8, 7])
+
+        neighbors.append(neighbor("42", 0.5))
+        second = rerank_neighbors("query", neighbors, top_n=3, caller="test")
+        self.assertEqual([hit.index for hit in second.results], [10, 9, 8])
+        self.assertEqual(cohere.call_args.kwargs["documents"], ["42"])
+        self.assertEqual(rerank.get_rerank_metrics()["callers"]["test"]["cache_hits"], 10)
+
+
+class FakeLocalBackend(rerank.RerankBackend):
+    name = "fake-local"
+
+    def score(self, query, documents, caller, priority):
+        # prefers short documents, the opposite of the remote fake
+        return [1 / len(doc) for doc in documents], 0
+
+
+class TestHybridRerankBackend(unittest.TestCase):
+    def setUp(self):
+        rerank._scores.clear()
+        rerank._stats.clear()
+
+    @mock.patch.object(rerank, "rerank", side_effect=fake_rerank)
+    def test_only_the_local_top_n_are_scored_remotely_the_rest_ranks_below(self, cohere):
+        backend = rerank.HybridRerankBackend(FakeLocalBackend(), rerank.CohereRerankBackend(), remote_top_n=3)
+        neighbors = [neighbor(str(i), 0.5) for i in (5, 10, 1, 200, 7)]
+        with mock.patch.object(rerank, "_backend", backend):
+            response = rerank_neighbors("query", neighbors, top_n=5, caller="test")
+        self.assertEqual(cohere.call_args.kwargs["documents"], ["5", "1", "7"])
+        # the documents not sent follow in the local backend's order, so top_n is still filled
+        self.assertEqual([hit.index for hit in response.results], [4, 0, 2, 1, 3])
+        self.assertTrue(all(hit.relevance_score < 0 for hit in response.results[3:]))
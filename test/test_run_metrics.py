@@ -0,0 +1,33 @@
+import unittest
+
+from app.core.run_metrics import summarize_runs
+
+
+def run(day: int, duration: float, rows: int = 100, exit_reason: str = "success") -> dict:
+    return {
+        "name": "scrape",
+        "started_at": f"2025-08-{day:02d}T02:00:00",
+        "duration_seconds": duration,
+        "rows_written": rows,
+        "exit_reason": exit_reason,
+    }
+
+
+class TestSummarizeRuns(unittest.TestCase):
+    def test_percentiles_and_throughput(self):
+        summary = summarize_runs([run(day, 10.0 * day) for day in range(1, 11)])["scrape"]
+        self.assertEqual(summary["runs"], 10)
+        self.assertEqual(summary["duration_p50_seconds"], 60.0)
+        self.assertEqual(summary["duration_p95_seconds"], 100.0)
+        self.assertEqual(summary["rows_per_second_by_day"]["2025-08-02"], 5.0)
+
+    def test_flags_run_slower_than_baseline(self):
+        runs = [run(day, 60.0) for day in range(1, 6)]
+        self.assertFalse(summarize_runs([*runs, run(6, 90.0)])["scrape"]["slow"])
+        self.assertTrue(summarize_runs([*runs, run(6, 200.0)])["scrape"]["slow"])
+
+    def test_no_baseline_from_failed_runs(self):
+        runs = [run(day, 5.0, exit_reason="error") for day in range(1, 6)]
+        summary = summarize_runs([*runs, run(6, 200.0)])["scrape"]
+        self.assertIsNone(summary["baseline_duration_seconds"])
+        self.assertFalse(summary["slow"])
@@ -0,0 +1,61 @@
+import threading
+import unittest
+from unittest import mock
+
+from app.core import speculative_retrieval
+from app.core.reformulation import MEETING_SEARCH
+from app.core.speculative_retrieval import merge_candidates, speculative_search
+
+
+def neighbor(source_id: str) -> dict:
+    return {"source_table": "ep_meetings", "source_id": source_id, "content_text": source_id}
+
+
+def search(text: str) -> list[dict]:
+    return [neighbor(f"{text}-1"), neighbor("shared")]
+
+
+class TestSpeculativeRetrieval(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(speculative_retrieval, "cached_reformulation", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_merge_keeps_reformulated_candidates_first(self):
+        merged = merge_candidates([neighbor("a"), neighbor("b")], [neighbor("b"), neighbor("c"), neighbor("d")], k=3)
+        self.assertEqual([n["source_id"] for n in merged], ["a", "b", "c"])
+
+    @mock.patch.object(speculative_retrieval, "reformulate", return_value="better")
+    def test_reformulation_within_budget_is_merged_with_raw_candidates(self, _):
+        result = speculative_search(MEETING_SEARCH, "raw", search, k=10, caller="test", budget_seconds=5)
+        self.assertEqual(result.query, "better")
+        self.assertEqual(result.path, "merged")
+        self.assertEqual(
+            [(n["source_id"], n["retrieval_path"]) for n in result.neighbors],
+            [("better-1", "reformulated"), ("shared", "reformulated"), ("raw-1", "raw")],
+        )
+
+    def test_slow_reformulation_falls_back_to_raw_candidates(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_reformulate(*args):
+            release.wait(5)
+            return "better"
+
+        with mock.patch.object(speculative_retrieval, "reformulate", side_effect=slow_reformulate):
+            result = speculative_search(MEETING_SEARCH, "raw", search, k=10, caller="test", budget_seconds=0.05)
+        self.assertEqual(result.query, "raw")
+        self.assertEqual(result.path, "raw")
+        self.assertEqual({n["retrieval_path"] for n in result.neighbors}, {"raw"})
+
+    @mock.patch.object(speculative_retrieval, "reformulate", return_value="better")
+    def test_failed_raw_search_contributes_no_candidates(self, _):
+        def search_failing_raw(text: str) -> list[dict]:
+            if text == "raw":
+                raise RuntimeError("vector search failed")
+            return search(text)
+
+        result = speculative_search(MEETING_SEARCH, "raw", search_failing_raw, k=10, caller="test", budget_seconds=5)
+        self.assertEqual(result.path, "reformulated")
+        self.assertEqual([n["source_id"] for n in result.neighbors], ["better-1", "shared"])
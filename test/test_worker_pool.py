@@ -0,0 +1,52 @@
+import os
+import time
+import unittest
+
+from app.core.worker_pool import WorkerPool
+
+
+def report_pid(stop_event):
+    return os.getpid()
+
+
+def sleep_forever(stop_event):
+    time.sleep(60)
+
+
+def fail(stop_event):
+    raise RuntimeError("job failed")
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(size=1, max_jobs=2, preload=[])
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_worker_is_reused_and_recycled_after_max_jobs(self):
+        pids = [self.pool.run("job", report_pid, timeout_seconds=30).value for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertEqual(self.pool.snapshot()["recycled"], 1)
+
+    def test_single_use_worker_is_not_reused(self):
+        first = self.pool.run("scrapy_job", report_pid, timeout_seconds=30, single_use=True).value
+        second = self.pool.run("job", report_pid, timeout_seconds=30).value
+        self.assertNotEqual(first, second)
+
+    def test_timeout_kills_worker(self):
+        outcome = self.pool.run("stuck", sleep_forever, timeout_seconds=0.5)
+        self.assertTrue(outcome.timed_out)
+        self.assertEqual(self.pool.snapshot()["killed"], 1)
+        self.assertTrue(self.pool.run("job", report_pid, timeout_seconds=30).ok)
+
+    def test_job_error_is_reported(self):
+        outcome = self.pool.run("failing", fail, timeout_seconds=30)
+        self.assertFalse(outcome.ok)
+        self.assertIn("job failed", outcome.error)
+
+    def test_jobs_must_be_importable_by_module_path(self):
+        with self.assertRaises(ValueError):
+            self.pool.run("lambda", lambda stop_event: None, timeout_seconds=30)
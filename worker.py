@@ -0,0 +1,48 @@
+"""Worker entry point: runs the job scheduler without the public API.
+
+    uvicorn worker:app --host 0.0.0.0 --port 3001 --log-config log_conf.yaml
+
+Only the scheduler endpoints are served, so API instances (started with RUN_SCHEDULER=false) can forward
+manual job runs to the worker that currently leads; advertise its URL with SCHEDULER_ADVERTISE_URL.
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.api.scheduler import router as api_scheduler
+from app.core.config import Settings
+from app.core.jobs import setup_scheduled_jobs
+from app.core.middleware import JWTMiddleware
+from app.core.scheduling import scheduler
+
+settings = Settings()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    setup_scheduled_jobs()
+    scheduler.start()
+    app.state.scheduler = scheduler
+    yield
+    scheduler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+app.include_router(api_scheduler)
+
+if not settings.get_disable_auth():
+    app.add_middleware(JWTMiddleware)
+
+
+@app.get("/")
+async def root() -> dict[str, str | bool]:
+    return {"role": "worker", "is_leader": scheduler.is_leader}